@@ -0,0 +1,17 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import argparse
+from industrial_forecasting.benchmark import main, METHODS
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Banc d'essai précision / débit des détecteurs d'anomalies (NAB / SKAB)")
+    ap.add_argument("--config", required=True)
+    ap.add_argument("--nab", default="data/raw/nab/*.csv", help="Glob des fichiers NAB")
+    ap.add_argument("--skab", default="data/raw/skab/*.csv", help="Glob des fichiers SKAB (fetch_skab.py --series files)")
+    ap.add_argument("--methods", nargs="+", choices=METHODS, default=None, help="Défaut : toutes les méthodes")
+    ap.add_argument("--workers", type=int, default=None, help="Taille du pool de processus (défaut : nb de cœurs)")
+    ap.add_argument("--out-dir", default="reports")
+    args = ap.parse_args()
+    main(args.config, nab_glob=args.nab, skab_glob=args.skab, methods=args.methods,
+         workers=args.workers, out_dir=args.out_dir)
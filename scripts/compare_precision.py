@@ -0,0 +1,73 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import argparse, glob
+import numpy as np
+import pandas as pd
+from industrial_forecasting.utils.config import load_config
+from industrial_forecasting.data import load_series
+from industrial_forecasting.features import rolling_features, create_supervised_from_series
+from industrial_forecasting.anomaly import zscore_anomaly
+
+def _diff(a64, a32):
+    # Écarts float32 vs float64 (absolu et relatif à l'amplitude du signal)
+    a64 = np.asarray(a64, dtype=np.float64)
+    a32 = np.asarray(a32, dtype=np.float64)
+    err = np.abs(a64 - a32)
+    scale = np.nanmax(np.abs(a64)) if a64.size else 0.0
+    max_abs = float(np.nanmax(err)) if err.size else 0.0
+    return max_abs, max_abs / scale if scale > 0 else 0.0
+
+def compare_file(path, cfg, window):
+    rows = []
+    series = {}
+    for dtype in (np.float64, np.float32):
+        s = load_series(path, cfg.data.datetime_col, cfg.data.value_col,
+                        getattr(cfg.data, "freq", None), dtype=dtype).interpolate()
+        X, y = create_supervised_from_series(s, window)
+        feats = rolling_features(s)
+        labels = zscore_anomaly(s.values, threshold=float(getattr(cfg.anomaly, "zscore_threshold", 3.0)))
+        series[np.dtype(dtype).name] = (s, X, feats, labels)
+
+    s64, X64, f64, l64 = series["float64"]
+    s32, X32, f32, l32 = series["float32"]
+    for stage, a64, a32 in (("series", s64.values, s32.values),
+                            ("windows", X64, X32),
+                            ("features", f64.values, f32.values)):
+        max_abs, max_rel = _diff(a64, a32)
+        rows.append({
+            "file": os.path.basename(path), "stage": stage,
+            "bytes_float64": a64.nbytes, "bytes_float32": a32.nbytes,
+            "max_abs_diff": max_abs, "max_rel_diff": max_rel,
+        })
+    rows.append({
+        "file": os.path.basename(path), "stage": "zscore_labels",
+        "bytes_float64": l64.nbytes, "bytes_float32": l32.nbytes,
+        "max_abs_diff": float(np.sum(l64 != l32)), "max_rel_diff": float(np.mean(l64 != l32)),
+    })
+    return rows
+
+def main(cfg_path, files, out_path):
+    cfg = load_config(cfg_path)
+    paths = sorted(p for pattern in (files or [cfg.data.raw_path]) for p in glob.glob(pattern))
+    window = int(cfg.lstm.window_size)
+    report = pd.DataFrame([row for p in paths for row in compare_file(p, cfg, window)])
+
+    print("\n" + "="*50)
+    print(" PRÉCISION float32 vs float64")
+    print("="*50)
+    print(report.to_string(index=False))
+    total64, total32 = report["bytes_float64"].sum(), report["bytes_float32"].sum()
+    print(f"\nMémoire : {total64 / 1e6:.1f} Mo (float64) → {total32 / 1e6:.1f} Mo (float32)")
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    report.to_csv(out_path, index=False)
+    print(f"Rapport sauvegardé → {out_path}")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Écarts numériques float32 vs float64 sur les données de référence")
+    ap.add_argument("--config", required=True)
+    ap.add_argument("--files", nargs="*", help="Fichiers CSV (glob), ex. 'data/raw/nab/*.csv'")
+    ap.add_argument("--out", default="reports/precision_report.csv")
+    args = ap.parse_args()
+    main(args.config, args.files, args.out)
@@ -3,31 +3,35 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
 import argparse
 from industrial_forecasting.utils.config import load_config
-from industrial_forecasting.data import load_series
-from industrial_forecasting.anomaly import detect_anomalies_series
+from industrial_forecasting.utils.resources import setup_resources
+from industrial_forecasting.anomaly import (
+    anomaly_params, detect_anomalies, load_anomaly_input, output_settings, run_incremental, save_anomalies,
+)
 
-def main(cfg_path: str, override_method: str | None = None):
+def main(cfg_path: str, override_method: str | None = None, processed: bool = False,
+         incremental: bool = False, refit: bool = False):
     cfg = load_config(cfg_path)
-    s = load_series(
-        cfg["data"]["raw_path"],
-        cfg["data"]["datetime_col"],
-        cfg["data"]["value_col"],
-        cfg["data"].get("freq"),
-    )
-    method = override_method or cfg.get("anomaly", {}).get("method", "zscore")
-    out = detect_anomalies_series(
-        s,
-        method=method,
-        contamination=cfg.get("anomaly", {}).get("contamination", 0.03),
-        zscore_threshold=cfg.get("anomaly", {}).get("zscore_threshold", 3.0),
-    )
-    os.makedirs("data/processed", exist_ok=True)
-    out.to_csv("data/processed/anomalies.csv", index=True)
-    print("Anomalies sauvegardées dans data/processed/anomalies.csv")
+    setup_resources(cfg)
+    anomaly_cfg = getattr(cfg, "anomaly", None)
+    method = override_method or getattr(anomaly_cfg, "method", "zscore")
+    if incremental:
+        # Cron : seuls les points postérieurs au dernier passage sont scorés puis ajoutés
+        run_incremental(cfg, method, processed=processed, refit=refit)
+        return
+    # mahalanobis : toutes les voies capteurs du fichier sont scorées en un seul passage
+    # changepoint / discord : segments de régime / sous-séquences anormales écrits à côté de anomalies.csv
+    data = load_anomaly_input(cfg, method, processed=processed)
+    out = detect_anomalies(data, method, **anomaly_params(cfg, method))
+    # Événements compacts (début, fin, pic) dans <anomalies>_events/ ; CSV dense si anomaly.dense_output
+    save_anomalies(out, method=method, **output_settings(cfg))
 
 if __name__ == "__main__":
     ap = argparse.ArgumentParser(description="Détection d'anomalies")
     ap.add_argument("--config", required=True)
-    ap.add_argument("--method", choices=["zscore", "isolation_forest"])
+    ap.add_argument("--method", choices=["zscore", "isolation_forest", "mahalanobis", "changepoint", "discord"])
+    ap.add_argument("--processed", action="store_true", help="Utilise la série nettoyée par preprocess.py")
+    ap.add_argument("--incremental", action="store_true", help="Ne score que les points postérieurs au watermark")
+    ap.add_argument("--refit", action="store_true", help="Ré-ajuste le détecteur (mode incrémental)")
     args = ap.parse_args()
-    main(args.config, override_method=args.method)
+    main(args.config, override_method=args.method, processed=args.processed,
+         incremental=args.incremental, refit=args.refit)
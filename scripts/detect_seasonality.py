@@ -0,0 +1,15 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import argparse
+from industrial_forecasting.seasonality import main
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Détection des périodes saisonnières par FFT")
+    ap.add_argument("--config", required=True)
+    ap.add_argument("--files", nargs="*", help="CSV à analyser (glob), défaut : data.raw_path")
+    ap.add_argument("--max-period", type=int, default=None)
+    ap.add_argument("--top-k", type=int, default=3)
+    ap.add_argument("--freq", default=None, help="Pas imposé à tous les fichiers (défaut : inféré par fichier)")
+    args = ap.parse_args()
+    main(args.config, args.files, max_period=args.max_period, top_k=args.top_k, freq=args.freq)
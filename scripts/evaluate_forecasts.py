@@ -1,34 +1,73 @@
-import argparse, pandas as pd, os, joblib, torch
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import argparse, pandas as pd, joblib, torch
 from industrial_forecasting.utils.config import load_config
 from industrial_forecasting.data import load_series, train_test_split_series
 from industrial_forecasting.evaluate import mae, rmse
-from industrial_forecasting.models.arima import ARIMAForecaster
+from industrial_forecasting.artifacts import (
+    LeanSARIMA, artifact_path, load_cached, load_lstm_artifact,
+)
 from industrial_forecasting.features import create_supervised_from_series
-from industrial_forecasting.models.lstm import LSTMRegressor, predict_lstm
+from industrial_forecasting.resolution import aggregate, artifact_plan, to_output
 import numpy as np
 
+def _legacy_arima(path):
+    from industrial_forecasting.models.arima import ARIMAForecaster
+    return ARIMAForecaster.load(path)
+
+def _legacy_lstm(path, hidden_size, num_layers, window):
+    # Ancien format : state_dict + scaler joblib à côté (<modèle>_scaler.pkl)
+    from industrial_forecasting.models.lstm import LSTMRegressor
+    model = LSTMRegressor(1, hidden_size, num_layers)
+    model.load_state_dict(torch.load(path, map_location='cpu'))
+    model.eval()
+    scaler_path = path.replace('.pkl', '_scaler.pkl')
+    scaler = joblib.load(scaler_path) if os.path.exists(scaler_path) else None
+    return model, scaler, {"window": window}
+
 def eval_arima(cfg, s):
-    train, test = train_test_split_series(s, cfg['data']['train_ratio'])
-    model = ARIMAForecaster.load('models/arima_model.pkl')
-    yhat = model.forecast(len(test))
+    # Artefact compact si présent (memmap, quelques ms), sinon pickle ; chargements mémorisés
+    lean_path = artifact_path(cfg.output.model_path)
+    if os.path.exists(lean_path):
+        model = load_cached(lean_path, LeanSARIMA.load)
+        plan = artifact_plan(model.meta, cfg)
+    else:
+        model, plan = load_cached(cfg.output.model_path, _legacy_arima), None
+    # Modèle ajusté à une résolution plus grossière : prévision à son pas, puis ramenée à la
+    # résolution de sortie (même découpage et même comparaison que train_arima.py)
+    series = aggregate(s, plan["freq"])["mean"] if plan else s
+    train, test = train_test_split_series(series, cfg.data.train_ratio)
+    yhat = pd.Series(np.asarray(model.forecast(len(test))), index=test.index)
+    if plan:
+        test, yhat = to_output(yhat, plan, s)
+        test = test.interpolate()
     return test.values, yhat.values
 
 def eval_lstm(cfg, s):
-  
-    train, test = train_test_split_series(s, cfg['data']['train_ratio'])
-    window = int(cfg['lstm']['window_size'])
-    X_all, y_all = create_supervised_from_series(train.append(test), window)
+    from industrial_forecasting.models.lstm import predict_lstm
+    train, test = train_test_split_series(s, cfg.data.train_ratio)
+    lean_path = artifact_path(cfg.output.model_path_lstm)
+    if os.path.exists(lean_path):
+        model, scaler, meta = load_cached(lean_path, load_lstm_artifact)
+    else:
+        model, scaler, meta = load_cached(cfg.output.model_path_lstm, _legacy_lstm, cfg.lstm.hidden_size,
+                                          cfg.lstm.num_layers, int(cfg.lstm.window_size))
+    full = pd.concat([train, test]).interpolate()
+    values = full.values.reshape(-1, 1)
+    if scaler is not None:
+        values = scaler.transform(values)
+    X_all, y_all = create_supervised_from_series(pd.Series(values.ravel(), index=full.index), int(meta["window"]))
     y_test = y_all[-len(test):]
-    X_test = X_all[-len(test):]
-    model = LSTMRegressor(1, cfg['lstm']['hidden_size'], cfg['lstm']['num_layers'])
-    model.load_state_dict(torch.load('models/lstm_model.pt', map_location='cpu'))
-    model.eval()
-    yhat = predict_lstm(model, X_test)
+    yhat = predict_lstm(model, X_all[-len(test):])
+    if scaler is not None:
+        y_test = scaler.inverse_transform(y_test.reshape(-1, 1)).ravel()
+        yhat = scaler.inverse_transform(np.asarray(yhat).reshape(-1, 1)).ravel()
     return y_test, yhat
 
 def main(cfg_path, model_name):
     cfg = load_config(cfg_path)
-    s = load_series(cfg['data']['raw_path'], cfg['data']['datetime_col'], cfg['data']['value_col'], cfg['data']['freq'])
+    s = load_series(cfg.data.raw_path, cfg.data.datetime_col, cfg.data.value_col, cfg.data.freq)
 
     if model_name == 'arima':
         y_true, y_pred = eval_arima(cfg, s)
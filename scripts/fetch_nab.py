@@ -7,11 +7,13 @@ Sources :
 
 Ce script télécharge le dépôt complet au format ZIP,
 et copie les fichiers CSV du dossier 'data/realKnownCause' 
-vers le répertoire local 'data/raw/nab/'.
+vers le répertoire local 'data/raw/nab/', ainsi que leurs fenêtres
+d'anomalies étiquetées ('labels/combined_windows.json', utilisé par
+scripts/benchmark_anomalies.py).
 """
 
 # Importation des modules nécessaires
-import os, io, zipfile, requests, tempfile, shutil, glob
+import os, io, json, zipfile, requests, tempfile, shutil, glob
 
 # -----------------------------------------------------------
 # Fonction principale exécutée lorsque le script est lancé
@@ -49,8 +51,15 @@ def main():
         for p in csvs:
             shutil.copy(p, dst)
         
+        # Fenêtres d'anomalies connues, indexées par nom de fichier (clé "realKnownCause/x.csv" dans NAB)
+        with open(os.path.join(td, 'NAB-master', 'labels', 'combined_windows.json')) as f:
+            windows = json.load(f)
+        windows = {os.path.basename(k): v for k, v in windows.items() if k.startswith('realKnownCause/')}
+        with open(os.path.join(dst, 'combined_windows.json'), 'w') as f:
+            json.dump(windows, f, indent=2)
+
         # Message récapitulatif indiquant le nombre de fichiers copiés
-        print(f'Copied {len(csvs)} files to {dst}')
+        print(f'Copied {len(csvs)} files to {dst} (+ combined_windows.json)')
 
 # -----------------------------------------------------------
 # Point d’entrée du script : exécute main() si lancé directement
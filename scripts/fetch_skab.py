@@ -8,6 +8,8 @@ Ce script :
 - Télécharge les fichiers CSV du dépôt SKAB ;
 - Peut soit :
     - enregistrer **une seule série temporelle** dans `data/raw/skab_single.csv`,  
+    - enregistrer **toutes les voies capteurs** d'un fichier dans `data/raw/skab_multi.csv`,  
+    - copier **chaque fichier** (canaux + étiquettes) dans `data/raw/skab/` (banc d'essai),  
     - ou fusionner **toutes les séries** en un grand fichier unique `data/raw/skab_all.csv`.
 """
 
@@ -59,7 +61,40 @@ def main(series='single'):
             print('Saved data/raw/skab_single.csv')
         
         # ---------------------------------------------------
-        # CAS 2 : On veut fusionner toutes les séries ("all")
+        # CAS 2 : Toutes les voies capteurs d'un fichier ("multi")
+        # ---------------------------------------------------
+        elif series == 'multi':
+            # Les fichiers SKAB sont rangés par sous-dossier (valve1/, other/, ...) et séparés par ';'
+            paths = csvs or sorted(glob.glob(os.path.join(root, '**', '*.csv'), recursive=True))
+            df = pd.read_csv(paths[0], sep=';')
+            if 'datetime' in df.columns:
+                df = df.rename(columns={'datetime': 'timestamp'})
+
+            # On conserve les 8 canaux (accéléromètres, courant, pression, température, débit, tension)
+            # ainsi que les étiquettes pour l'évaluation
+            df.to_csv('data/raw/skab_multi.csv', index=False)
+            print(f'Saved data/raw/skab_multi.csv ({df.shape[1] - 1} colonnes)')
+
+        # ---------------------------------------------------
+        # CAS 3 : Chaque fichier tel quel ("files"), pour le banc d'essai des détecteurs
+        # ---------------------------------------------------
+        elif series == 'files':
+            paths = sorted(glob.glob(os.path.join(root, '**', '*.csv'), recursive=True))
+            os.makedirs('data/raw/skab', exist_ok=True)
+            n = 0
+            for path in paths:
+                df = pd.read_csv(path, sep=';')
+                # Seuls les fichiers étiquetés servent à l'évaluation (anomaly-free/ n'en a pas)
+                if 'anomaly' not in df.columns:
+                    continue
+                # Nom unique : sous-dossier + fichier (ex. valve1_0.csv)
+                name = f"{os.path.basename(os.path.dirname(path))}_{os.path.basename(path)}"
+                df.to_csv(os.path.join('data/raw/skab', name), sep=';', index=False)
+                n += 1
+            print(f'Saved {n} files to data/raw/skab/')
+
+        # ---------------------------------------------------
+        # CAS 4 : On veut fusionner toutes les séries ("all")
         # ---------------------------------------------------
         else:
             frames = []  # liste pour stocker les DataFrames
@@ -95,8 +130,9 @@ def main(series='single'):
 # -----------------------------------------------------------
 if __name__ == '__main__':
     ap = argparse.ArgumentParser()
-    # Option --series : permet de choisir entre "single" (une série) ou "all" (toutes les séries)
-    ap.add_argument('--series', choices=['single','all'], default='single')
+    # Option --series : "single" (une série), "multi" (tous les canaux d'un fichier),
+    # "files" (chaque fichier étiqueté dans data/raw/skab/) ou "all" (toutes les séries)
+    ap.add_argument('--series', choices=['single','multi','files','all'], default='single')
     args = ap.parse_args()
     
     # Exécute la fonction principale avec le paramètre choisi
@@ -0,0 +1,102 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import argparse, glob, time
+import numpy as np
+import pandas as pd
+from industrial_forecasting.utils.config import load_config
+from industrial_forecasting.utils.resources import setup_resources
+from industrial_forecasting.store import read_meta, read_store
+from industrial_forecasting.resolution import aggregate, freq_delta
+from industrial_forecasting.kalman_batch import BatchSARIMA, bank_path, group_by_order
+
+def fleet_settings(cfg) -> dict:
+    fcfg = getattr(cfg, "fleet_forecast", None)
+    return {
+        "models": getattr(fcfg, "models", None) or ["data/queue/work/*/models/arima_model.ifa"],
+        "bank_dir": getattr(fcfg, "bank_dir", "models/fleet"),
+        "horizon": int(getattr(fcfg, "horizon", 24)),
+        "forecast_path": getattr(fcfg, "forecast_path", "data/processed/forecast_fleet.csv"),
+        "z_alert": float(getattr(fcfg, "z_alert", 4.0)),
+    }
+
+def build_banks(patterns, bank_dir) -> list:
+    # Un lot par ordre SARIMA et fréquence : les artefacts par série (train_arima.py) sont empilés
+    paths = sorted(p for pattern in patterns for p in glob.glob(pattern))
+    written = []
+    for (order, seasonal_order, freq), group in group_by_order(paths).items():
+        bank = BatchSARIMA.from_artifacts(group)
+        path = bank_path(bank_dir, order, seasonal_order, freq)
+        bank.save(path)
+        print(f" Lot {order} x {seasonal_order} ({freq}) : {len(bank)} séries → {path}")
+        written.append(path)
+    return written
+
+def new_points(cfg, bank) -> pd.DataFrame:
+    # Points postérieurs au dernier horodatage filtré de chaque série, lus dans son store nettoyé
+    # (preprocess.py) par recherche dichotomique : seule la fin est lue, sur la grille commune
+    freq = (bank.meta.get("freq") or cfg.data.freq or "").lower() or None
+    store_paths = bank.meta.get("store_paths") or [None] * len(bank)
+    columns, missing = {}, 0
+    for name, store_dir, last in zip(bank.names, store_paths, bank.last):
+        meta = read_meta(store_dir) if store_dir else None
+        if meta is None:
+            missing += 1
+            continue
+        s = read_store(store_dir, start=pd.Timestamp(int(last)) if last >= 0 else None)
+        base = meta.get("freq")
+        if freq and base and len(s) and freq_delta(freq) > freq_delta(base):
+            # Modèle ajusté à une résolution plus grossière : moyennes des seuls buckets complets
+            coarse = aggregate(s, freq)["mean"]
+            s = coarse[coarse.index + freq_delta(freq) - freq_delta(base) <= s.index[-1]]
+        columns[name] = s
+    if missing:
+        print(f" {missing} série(s) sans store nettoyé (store_path) : relancer preprocess.py et train_arima.py, puis --build")
+    frame = pd.DataFrame(columns)
+    return frame.asfreq(freq) if freq and len(frame) else frame
+
+def refresh(cfg, path, horizon, z_alert) -> pd.DataFrame:
+    bank = BatchSARIMA.load(path)
+    frame = new_points(cfg, bank)
+    t0 = time.perf_counter()
+    z = bank.update(frame) if len(frame) else pd.DataFrame(columns=bank.names)
+    yhat, std = bank.forecast(horizon, return_std=True)
+    elapsed = time.perf_counter() - t0
+    bank.save(path)
+    alerts = int((np.abs(z.to_numpy(dtype=float)) > z_alert).sum())
+    print(f" {os.path.basename(path)} : {len(bank)} séries, {int(z.notna().to_numpy().sum())} points intégrés, "
+          f"{horizon} pas prévus "
+          f"en {elapsed:.2f} s | {alerts} innovations > {z_alert:g} σ")
+    # Format long : une ligne par (série, horodatage prévu)
+    freq = bank.meta.get("freq") or cfg.data.freq
+    rows = []
+    for i, name in enumerate(bank.names):
+        start = pd.Timestamp(int(bank.last[i])) if bank.last[i] >= 0 else None
+        index = pd.date_range(start, periods=horizon + 1, freq=freq.lower())[1:] if start is not None and freq \
+            else pd.RangeIndex(1, horizon + 1)
+        rows.append(pd.DataFrame({"series": name, "timestamp": index, "y_pred": yhat[i], "std": std[i]}))
+    return pd.concat(rows, ignore_index=True) if rows else pd.DataFrame()
+
+def main(cfg_path, build=None):
+    cfg = load_config(cfg_path)
+    setup_resources(cfg)
+    settings = fleet_settings(cfg)
+    if build is not None:
+        build_banks(build or settings["models"], settings["bank_dir"])
+    banks = sorted(glob.glob(os.path.join(settings["bank_dir"], "sarima_*.ifa")))
+    if not banks:
+        raise FileNotFoundError(f"Aucun lot dans {settings['bank_dir']} : lancer avec --build")
+    forecasts = pd.concat([refresh(cfg, p, settings["horizon"], settings["z_alert"]) for p in banks],
+                          ignore_index=True)
+    os.makedirs(os.path.dirname(settings["forecast_path"]) or ".", exist_ok=True)
+    forecasts.to_csv(settings["forecast_path"], index=False)
+    print(f" Prévisions de la flotte → {settings['forecast_path']}")
+    return forecasts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rafraîchit en lot les prévisions SARIMA de toute la flotte")
+    parser.add_argument("--config", required=True, help="Chemin vers le fichier config.yaml")
+    parser.add_argument("--build", nargs="*", default=None,
+                        help="(Re)construit les lots depuis les artefacts .ifa par série (glob, défaut : fleet_forecast.models)")
+    args = parser.parse_args()
+    main(args.config, build=args.build)
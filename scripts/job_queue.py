@@ -0,0 +1,23 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import argparse
+from industrial_forecasting.jobqueue import main, STAGES
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="File de travaux sur répertoire partagé (sans broker)")
+    ap.add_argument("--config", required=True)
+    ap.add_argument("--queue", default=None, help="Répertoire partagé (remplace jobqueue.queue_dir)")
+    sub = ap.add_subparsers(dest="command", required=True)
+    enq = sub.add_parser("enqueue", help="Ajoute des travaux (série × étape)")
+    enq.add_argument("--files", nargs="+", required=True, help="CSV des séries (glob)")
+    enq.add_argument("--stages", nargs="+", default=["detect"], choices=sorted(STAGES))
+    wrk = sub.add_parser("work", help="Lance des workers sur ce nœud")
+    wrk.add_argument("--processes", type=int, default=1)
+    wrk.add_argument("--max-jobs", type=int, default=None, help="Travaux maximum par worker")
+    wrk.add_argument("--forever", action="store_true", help="Continue à attendre quand la file est vide")
+    sub.add_parser("status", help="État de la file et débit")
+    args = ap.parse_args()
+    main(args.config, args.command, queue_dir=args.queue, files=getattr(args, "files", None),
+         stages=getattr(args, "stages", ("detect",)), processes=getattr(args, "processes", 1),
+         max_jobs=getattr(args, "max_jobs", None), forever=getattr(args, "forever", False))
@@ -0,0 +1,13 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import argparse
+from industrial_forecasting.preprocess import main
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Prétraitement incrémental de la série brute")
+    ap.add_argument("--config", required=True)
+    ap.add_argument("--rebuild", action="store_true", help="Reconstruit le store depuis zéro")
+    ap.add_argument("--no-csv", action="store_true", help="N'exporte pas data.processed_path")
+    args = ap.parse_args()
+    main(args.config, rebuild=args.rebuild, export_csv=not args.no_csv)
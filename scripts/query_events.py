@@ -0,0 +1,28 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import argparse
+from industrial_forecasting.utils.config import load_config
+from industrial_forecasting.anomaly import output_settings
+from industrial_forecasting.events import events_in_range
+
+def main(cfg_path: str, start=None, end=None, events_dir=None):
+    cfg = load_config(cfg_path)
+    events_dir = events_dir or output_settings(cfg)["events_dir"]
+    if events_dir is None:
+        raise ValueError("anomaly.events_output est désactivé : aucun store d'événements")
+    # Recherche dichotomique dans l'index : le CSV n'est lu que sur la plage demandée
+    events = events_in_range(events_dir, start, end)
+    print(f"{len(events)} événements entre {start or 'le début'} et {end or 'la fin'}")
+    if len(events):
+        print(events.to_string(index=False))
+    return events
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Événements d'anomalie recouvrant une plage de temps")
+    ap.add_argument("--config", required=True)
+    ap.add_argument("--start", default=None, help="ex. 2024-01-01 00:00")
+    ap.add_argument("--end", default=None)
+    ap.add_argument("--events-dir", default=None, help="Défaut : anomaly.events_path")
+    args = ap.parse_args()
+    main(args.config, args.start, args.end, args.events_dir)
@@ -0,0 +1,15 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import argparse
+from industrial_forecasting.visualize_batch import main
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Rendu headless de tous les graphiques de prévision")
+    ap.add_argument("--config", required=True)
+    ap.add_argument("--out-dir", default="reports/figures")
+    ap.add_argument("--workers", type=int, default=None, help="Taille du pool de processus (défaut : nb de cœurs)")
+    ap.add_argument("--dpi", type=int, default=None)
+    ap.add_argument("--fleet", default=None, help="Glob des CSV de prévision par série (y_true, y_pred)")
+    args = ap.parse_args()
+    main(args.config, out_dir=args.out_dir, workers=args.workers, dpi=args.dpi, fleet_glob=args.fleet)
@@ -0,0 +1,22 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import argparse
+from industrial_forecasting.replay import main, HANDLERS
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Générateur de charge par rejeu de flux capteurs")
+    ap.add_argument("--config", required=True)
+    ap.add_argument("--files", nargs="*", default=["data/raw/nab/*.csv"], help="CSV à rejouer (glob)")
+    ap.add_argument("--synthetic", type=int, default=0, help="Nombre de flux synthétiques (remplace --files)")
+    ap.add_argument("--target", choices=sorted(HANDLERS), default="anomaly")
+    ap.add_argument("--speedup", type=float, default=3600.0, help="Facteur d'accélération (<= 0 : débit maximal)")
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--batch-size", type=int, default=64)
+    ap.add_argument("--max-points", type=int, default=None)
+    ap.add_argument("--duration", type=float, default=None, help="Durée maximale de rejeu (s)")
+    ap.add_argument("--out", default=None, help="CSV où ajouter le rapport")
+    args = ap.parse_args()
+    main(args.config, files=args.files, synthetic=args.synthetic, target=args.target, speedup=args.speedup,
+         concurrency=args.concurrency, batch_size=args.batch_size, max_points=args.max_points,
+         duration=args.duration, out_path=args.out)
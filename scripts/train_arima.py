@@ -2,28 +2,36 @@
 import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
 
-import argparse
+import argparse, time
+import numpy as np
 import pandas as pd
 from industrial_forecasting.utils.config import load_config
-from industrial_forecasting.data import train_test_split_series
+from industrial_forecasting.utils.resources import setup_resources
+from industrial_forecasting.data import train_test_split_series, load_processed_series
+from industrial_forecasting.store import read_meta
 from industrial_forecasting.models.arima import ARIMAForecaster
+from industrial_forecasting.artifacts import LeanSARIMA, artifact_path, compare_artifacts
+from industrial_forecasting.sarima import (
+    as_forecaster, fit_info, load_params, log_fit, params_path, reestimate_sarima, sarimax_results, save_params,
+)
+from industrial_forecasting.seasonality import suggest_seasonality, apply_to_seasonal_order
+from industrial_forecasting.resolution import freq_delta, plan_resolution, rescale_period, to_output
 from industrial_forecasting.evaluate import mae, rmse
 
-def main(cfg_path):
+def main(cfg_path, reestimate=False):
     print(" Début exécution MAIN")
     print(f" Chemin config reçu : {cfg_path}")
 
     # --- Charger la configuration ---
     cfg = load_config(cfg_path)
+    setup_resources(cfg)  # threads BLAS (statsmodels) bornés au budget du processus
     print(" Configuration chargée ")
 
-    # --- Charger la série nettoyée ---
-    print(f" Chargement série depuis : {cfg.data.processed_path}")
-    s = pd.read_csv(
-        cfg.data.processed_path,
-        parse_dates=[cfg.data.datetime_col],
-        index_col=cfg.data.datetime_col
-    )[cfg.data.value_col].astype(float).sort_index()
+    # --- Charger la série nettoyée (store binaire de preprocess.py, sinon processed_path) ---
+    store_dir = getattr(cfg.data, "store_path", None)
+    store_dir = store_dir if store_dir and read_meta(store_dir) is not None else None
+    print(f" Chargement série nettoyée depuis : {store_dir or cfg.data.processed_path}")
+    s = load_processed_series(cfg).sort_index()
     print(f"Série chargée : {len(s)} lignes")
 
     # --- Forcer la fréquence (si fournie) ---
@@ -31,6 +39,12 @@ def main(cfg_path):
         s = s.asfreq(cfg.data.freq.lower())
         print(f"Fréquence forcée à : {cfg.data.freq.lower()}")
 
+    # --- Résolution d'entraînement : niveau le plus grossier de la pyramide d'agrégats (optionnel) ---
+    freq = cfg.data.freq.lower() if cfg.data.freq else None
+    fine, plan = s, plan_resolution(s, freq, cfg, cfg.data.train_ratio)
+    if plan:
+        s, freq = plan["series"], plan["freq"]
+
     # --- Split train/test ---
     train, test = train_test_split_series(s, cfg.data.train_ratio)
     print(f"Train : {len(train)} obs | Test : {len(test)} obs")
@@ -44,16 +58,73 @@ def main(cfg_path):
 
 
     # --- Entraînement ARIMA ---
-    print(f" ARIMA order = {cfg.arima.order} / seasonal = {cfg.arima.seasonal_order}")
-    arima = ARIMAForecaster(
-        order=cfg.arima.order,
-        seasonal_order=cfg.arima.seasonal_order
-    ).fit(train.values)
-    print(" Entraînement ARIMA terminé ")
+    # --- Saisonnalité détectée par FFT avant l'ajustement (optionnel) ---
+    # Périodes (config, plafond) exprimées en pas de data.freq → pas de la résolution retenue, avant
+    # toute décision : à 6 h, s=24 de la config désignerait sinon six jours
+    seasonal_order = list(cfg.arima.seasonal_order)
+    season_cfg = getattr(cfg, "seasonality", None)
+    max_period = getattr(season_cfg, "max_arima_period", None)
+    if plan:
+        period = rescale_period(seasonal_order[3], plan["base_freq"], freq)
+        if seasonal_order[3] and not period:
+            print(f" Période {seasonal_order[3]} sans équivalent entier à {freq} : pas de terme saisonnier")
+        seasonal_order = seasonal_order[:3] + [period] if period else [0, 0, 0, 0]
+        if max_period:
+            max_period = max_period * freq_delta(plan["base_freq"]) / freq_delta(freq)
+    if getattr(season_cfg, "auto", False) and freq:
+        # Détection sur la série d'entraînement (à la résolution retenue) : période trouvée en pas
+        # de ``freq`` avec les (P, D, Q) configurés, sinon aucun terme saisonnier
+        found = suggest_seasonality(train, freq, min_strength=getattr(season_cfg, "min_strength", 0.05),
+                                    max_arima_period=max_period)
+        seasonal_order = apply_to_seasonal_order(cfg.arima.seasonal_order, found["arima_period"])
+        print(" Forces saisonnières :", {k: round(v, 3) for k, v in found["strengths"].items()})
+
+    print(f" ARIMA order = {cfg.arima.order} / seasonal = {seasonal_order}")
+    saved = load_params(params_path(cfg.output.model_path))
+    previous = load_params(params_path(cfg.output.model_path), cfg.arima.order, seasonal_order)
+    if saved and not previous:
+        # Période saisonnière changée (seasonality.auto, résolution) : mêmes (P, D, Q) → même
+        # nombre de paramètres, on repart des anciens ; sinon ajustement à froid, signalé
+        same_terms = saved["order"] == list(cfg.arima.order) \
+            and saved["seasonal_order"][:3] == list(seasonal_order)[:3]
+        print(f" Paramètres sauvegardés pour {saved['order']} x {saved['seasonal_order']}, "
+              f"modèle courant {list(cfg.arima.order)} x {list(seasonal_order)} : "
+              + ("départ depuis ces paramètres" if same_terms else "pas de départ à chaud possible"))
+        previous = saved if same_terms else None
+    if reestimate:
+        # Ré-estimation à chaud : départ des paramètres sauvegardés, fenêtre et itérations bornées
+        re_cfg = getattr(cfg.arima, "reestimate", None)
+        print(f" Ré-estimation {'à chaud' if previous else 'à froid (aucun paramètre sauvegardé utilisable)'}")
+        results, info = reestimate_sarima(
+            train.values, cfg.arima.order, seasonal_order,
+            start_params=previous["params"] if previous else None,
+            window=getattr(re_cfg, "window", None),
+            maxiter=getattr(re_cfg, "maxiter", 50),
+            tol=float(getattr(re_cfg, "tol", 1e-5)),
+        )
+        # Sauvegardé comme un entraînement standard : ARIMAForecaster.load renvoie toujours ce type
+        arima = as_forecaster(results, cfg.arima.order, seasonal_order)
+    else:
+        t0 = time.perf_counter()
+        arima = ARIMAForecaster(
+            order=cfg.arima.order,
+            seasonal_order=seasonal_order
+        ).fit(train.values)
+        info = fit_info(sarimax_results(arima), time.perf_counter() - t0, warm=False)
+    print(f" Entraînement ARIMA terminé en {info['fit_time_s']:.2f} s ({info['iterations']} itérations)")
+    if previous:
+        delta = np.max(np.abs(np.asarray(sarimax_results(arima).params) - np.asarray(previous["params"])))
+        print(f" Écart max. des paramètres vs ajustement précédent : {delta:.4g}"
+              f" | log-vraisemblance : {previous['llf']:.2f} → {info['llf']:.2f}")
 
     # --- Prévisions ---
     yhat = arima.forecast(steps=len(test))
     yhat = pd.Series(yhat, index=test.index)
+    if plan:
+        # Évaluation (et sauvegarde) à la résolution de sortie : prévision désagrégée si besoin
+        test, yhat = to_output(yhat, plan, fine)
+        test = test.interpolate()
+        print(f" Prévisions {freq} comparées sur {len(test)} points à la résolution de sortie")
     print("Nombre de NaN dans les prévisions :", pd.isna(yhat).sum())
     print(" Prévisions générées")
 
@@ -87,13 +158,27 @@ def main(cfg_path):
         
     #  RESULTATS FINAUX
     print(f"\n RESULTATS FINAUX ")
-    print(f"    ARIMA   - MAE: {m_mae:.3f} | RMSE: {m_rmse:.3f} | Variabilité: {variability_ratio:.3f}")")
+    print(f"    ARIMA   - MAE: {m_mae:.3f} | RMSE: {m_rmse:.3f} | Variabilité: {variability_ratio:.3f}")
 
     # --- Sauvegardes ---
     os.makedirs(os.path.dirname(cfg.output.model_path), exist_ok=True)
     os.makedirs(os.path.dirname(cfg.data.forecast), exist_ok=True)
 
     arima.save(cfg.output.model_path)
+    save_params(params_path(cfg.output.model_path), sarimax_results(arima),
+                cfg.arima.order, seasonal_order, **info)
+    print(f"Historique des ajustements → {log_fit(cfg.output.model_path, info)}")
+    # Artefact compact (.ifa) : état final du filtre, relu par memmap sans statsmodels
+    lean_path = artifact_path(cfg.output.model_path)
+    LeanSARIMA.from_results(sarimax_results(arima), cfg.arima.order, seasonal_order,
+                            freq=freq, last_timestamp=str(train.index[-1]),
+                            series=os.path.splitext(os.path.basename(cfg.data.raw_path))[0],
+                            raw_path=os.path.abspath(cfg.data.raw_path),
+                            store_path=os.path.abspath(store_dir) if store_dir else None,
+                            # Résolution de sortie : evaluate_forecasts.py / replay ramènent la prévision à output_freq
+                            **({k: plan[k] for k in ("base_freq", "output_freq", "disaggregate")} if plan else {})
+                            ).save(lean_path)
+    compare_artifacts(lean_path, LeanSARIMA.load, [cfg.output.model_path], ARIMAForecaster.load)
     pd.DataFrame({
         "y_true": test.values,
         "y_pred": yhat.values
@@ -106,5 +191,7 @@ def main(cfg_path):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Entraînement ARIMA")
     parser.add_argument("--config", required=True, help="Chemin vers le fichier config.yaml")
+    parser.add_argument("--reestimate", action="store_true",
+                        help="Ré-estimation à chaud depuis les paramètres sauvegardés (voir arima.reestimate)")
     args = parser.parse_args()
-    main(args.config)
+    main(args.config, reestimate=args.reestimate)
@@ -0,0 +1,103 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import argparse, time
+import numpy as np
+import pandas as pd
+from industrial_forecasting.utils.config import load_config, get_dtype
+from industrial_forecasting.utils.resources import setup_resources
+from industrial_forecasting.data import train_test_split_series, load_processed_series, load_series
+from industrial_forecasting.shards import load_fleet
+from industrial_forecasting.models.harmonic import HarmonicForecaster, detect_periods
+from industrial_forecasting.evaluate import mae, rmse
+
+def harmonic_settings(cfg) -> dict:
+    hcfg = getattr(cfg, "harmonic", None)
+    return {
+        "harmonics": getattr(hcfg, "harmonics", 4),
+        "min_strength": float(getattr(hcfg, "min_strength", 0.05)),
+        "ridge": float(getattr(hcfg, "ridge", 1e-6)),
+        "model_path": getattr(hcfg, "model_path", "models/harmonic_model.ifa"),
+        "forecast_path": getattr(hcfg, "forecast_path", "data/processed/forecast_harmonic.csv"),
+        "metrics_path": getattr(hcfg, "metrics_path", "reports/harmonic_metrics.csv"),
+    }
+
+def fit_fleet(cfg, files, settings):
+    """Un ajustement en lot par classe de longueur ; métriques MAE / RMSE sur la partie test.
+
+    Les historiques de longueurs différentes sont alignés à droite (bourrage NaN au début,
+    masque des points valides dans l'ajustement) : chaque classe (longueurs entre deux
+    puissances de 2, bourrage < 2x) partage un seul ajustement.
+    """
+    freq = (cfg.data.freq or "h").lower()
+    by_size = {}
+    for name, values in load_fleet(files, cfg.data.datetime_col, dtype=get_dtype(cfg)):
+        split = int(len(values) * cfg.data.train_ratio)
+        if 2 <= split < len(values):
+            by_size.setdefault(1 << int(np.ceil(np.log2(split))), []).append((name, values, split))
+    rows, t0 = [], time.perf_counter()
+    for group in by_size.values():
+        width = max(split for _, _, split in group)
+        Y = np.full((len(group), width), np.nan)
+        for i, (_, values, split) in enumerate(group):
+            Y[i, width - split:] = values[:split]
+        model = HarmonicForecaster(detect_periods(Y, freq, settings["min_strength"]),
+                                   settings["harmonics"], ridge=settings["ridge"]).fit(Y)
+        yhat = model.forecast(max(len(values) - split for _, values, split in group))
+        for i, (name, values, split) in enumerate(group):
+            e = yhat[i, :len(values) - split] - values[split:]
+            rows.append({"series": name, "n_obs": len(values), "periods": " ".join(f"{p:g}" for p in model.periods),
+                         "mae": float(np.mean(np.abs(e))), "rmse": float(np.sqrt(np.mean(e * e)))})
+    elapsed = time.perf_counter() - t0
+    print(f" {len(rows)} séries ajustées en {elapsed:.2f} s ({len(rows) / max(elapsed, 1e-9):.0f} séries/s, "
+          f"{len(by_size)} ajustement(s) en lot)")
+    return pd.DataFrame(rows)
+
+def main(cfg_path, files=None, raw=False):
+    cfg = load_config(cfg_path)
+    setup_resources(cfg)
+    settings = harmonic_settings(cfg)
+
+    if files:
+        metrics = fit_fleet(cfg, files, settings)
+        if len(metrics):
+            print(metrics[["mae", "rmse"]].describe().loc[["mean", "50%"]].to_string())
+            os.makedirs(os.path.dirname(settings["metrics_path"]) or ".", exist_ok=True)
+            metrics.to_csv(settings["metrics_path"], index=False)
+            print(f" Métriques par série → {settings['metrics_path']}")
+        return metrics
+
+    # --- Série unique : même déroulé (et même série nettoyée) que train_arima.py, dont c'est le repli ---
+    if raw:
+        s = load_series(cfg.data.raw_path, cfg.data.datetime_col, cfg.data.value_col, dtype=get_dtype(cfg))
+    else:
+        s = load_processed_series(cfg, dtype=get_dtype(cfg)).sort_index()
+    if cfg.data.freq:
+        s = s.asfreq(cfg.data.freq.lower())
+    train, test = train_test_split_series(s, cfg.data.train_ratio)
+    print(f"Train : {len(train)} obs | Test : {len(test)} obs")
+
+    t0 = time.perf_counter()
+    periods = detect_periods(train.values, (cfg.data.freq or "h").lower(), settings["min_strength"])
+    model = HarmonicForecaster(periods, settings["harmonics"], ridge=settings["ridge"]).fit(train.values)
+    print(f" Régression harmonique (périodes {periods}) ajustée en {1000 * (time.perf_counter() - t0):.1f} ms")
+
+    yhat = pd.Series(model.forecast(len(test)), index=test.index)
+    mask = test.notna()
+    print(f"Harmonique - MAE: {mae(test[mask], yhat[mask]):.3f} | RMSE: {rmse(test[mask], yhat[mask]):.3f}")
+
+    os.makedirs(os.path.dirname(settings["model_path"]) or ".", exist_ok=True)
+    model.save(settings["model_path"])
+    os.makedirs(os.path.dirname(settings["forecast_path"]) or ".", exist_ok=True)
+    pd.DataFrame({"y_true": test.values, "y_pred": yhat.values}, index=test.index).to_csv(settings["forecast_path"])
+    print(f"Modèle sauvegardé, {settings['model_path']}")
+    print(f"Prévisions sauvegardées,  {settings['forecast_path']}")
+    return model
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Régression harmonique (tendance + Fourier), une série ou une flotte")
+    parser.add_argument("--config", required=True, help="Chemin vers le fichier config.yaml")
+    parser.add_argument("--files", nargs="*", default=None, help="CSV de la flotte (glob) : ajustement en lot")
+    parser.add_argument("--raw", action="store_true", help="Série brute (data.raw_path) au lieu de la série nettoyée")
+    args = parser.parse_args()
+    main(args.config, files=args.files, raw=args.raw)
@@ -4,27 +4,38 @@ import torch
 import pandas as pd
 import joblib
 
-from industrial_forecasting.utils.config import load_config
-from industrial_forecasting.data import  train_test_split_series
+from industrial_forecasting.utils.config import load_config, get_dtype
+from industrial_forecasting.utils.resources import setup_resources
+from industrial_forecasting.data import  train_test_split_series, load_processed_series
 from industrial_forecasting.features import create_supervised_from_series
 from industrial_forecasting.models.lstm import train_lstm, predict_lstm
 from industrial_forecasting.evaluate import mae, rmse
+from industrial_forecasting.artifacts import artifact_path, compare_artifacts, load_lstm_artifact, save_lstm_artifact
 from sklearn.preprocessing import MinMaxScaler
 
 
 
-def main(config_path):
+def main(config_path, processed=False):
     # --- Chargement de la configuration ---
     cfg = load_config(config_path)
     print(" Configuration chargée")
+    setup_resources(cfg)  # threads torch intra-op + BLAS selon resources
 
     # --- Chargement de la série depuis CSV ---
-    print(f" Chargement série depuis : {cfg.data.raw_path}")
-    s = pd.read_csv(
-        cfg.data.raw_path,
-        parse_dates=[cfg.data.datetime_col],
-        index_col=cfg.data.datetime_col
-    )[cfg.data.value_col].astype(float).sort_index()
+    # Précision du pipeline (float32 : séries, fenêtres et tenseurs sans conversion intermédiaire)
+    dtype = get_dtype(cfg)
+    if processed:
+        # Série déjà régularisée et comblée par scripts/preprocess.py
+        print(f" Chargement série nettoyée depuis : {cfg.data.store_path}")
+        s = load_processed_series(cfg, dtype=dtype).sort_index()
+    else:
+        print(f" Chargement série depuis : {cfg.data.raw_path}")
+        s = pd.read_csv(
+            cfg.data.raw_path,
+            parse_dates=[cfg.data.datetime_col],
+            index_col=cfg.data.datetime_col,
+            dtype={cfg.data.value_col: dtype}
+        )[cfg.data.value_col].sort_index()
     print(f"Série chargée : {len(s)} lignes")
 
     # --- Forcer la fréquence si spécifiée ---
@@ -44,20 +55,17 @@ def main(config_path):
     print(train.describe())
     
     # Normalisation (fit sur train uniquement pour éviter la fuite)
+    # (MinMaxScaler conserve le dtype d'entrée : float32 reste float32)
     scaler = MinMaxScaler()
     train_scaled = pd.Series(scaler.fit_transform(train.values.reshape(-1, 1)).flatten(), index=train.index)
     test_scaled = pd.Series(scaler.transform(test.values.reshape(-1, 1)).flatten(), index=test.index)
 
-    # --- Création des ensembles supervisés ---
-    window_size = int(cfg.lstm.window_size)
-    X_train, y_train = create_supervised_from_series(train_scaled, window_size)
-    
     # --- Fenêtres supervisées ---
     window = int(cfg.lstm.window_size)
-    X_train, y_train = create_supervised_from_series(train_scaled, window)
+    X_train, y_train = create_supervised_from_series(train_scaled, window, dtype=dtype)
 
     full_series = pd.concat([train_scaled, test_scaled])
-    X_full, y_full = create_supervised_from_series(full_series, window)
+    X_full, y_full = create_supervised_from_series(full_series, window, dtype=dtype)
     X_test = X_full[-len(test):]
     y_test = y_full[-len(test):]
 
@@ -132,6 +140,13 @@ def main(config_path):
     joblib.dump(scaler, scaler_save_path)
     print(f" Scaler sauvegardé → {scaler_save_path}")
 
+    # Artefact compact (.ifa) : poids + scaler + fenêtre dans un seul fichier memory-mappé
+    lean_path = artifact_path(model_save_path)
+    save_lstm_artifact(lean_path, model, scaler, window, hidden_size=cfg.lstm.hidden_size,
+                       num_layers=cfg.lstm.num_layers, freq=cfg.data.freq)
+    compare_artifacts(lean_path, load_lstm_artifact, [model_save_path, scaler_save_path],
+                      lambda m, sc: (torch.load(m, map_location="cpu"), joblib.load(sc)))
+
     # Sauvegarde des prédictions dans un CSV
     forecast_df = pd.DataFrame({
         "y_true": y_test,
@@ -148,7 +163,8 @@ def main(config_path):
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument('--config', required=True, help='Chemin vers le fichier de configuration YAML')
+    parser.add_argument('--processed', action='store_true', help='Utilise la série nettoyée par preprocess.py')
     args = parser.parse_args()
-    main(args.config)
+    main(args.config, processed=args.processed)
     
     
\ No newline at end of file
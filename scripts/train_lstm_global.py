@@ -0,0 +1,132 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+import torch
+
+from industrial_forecasting.utils.config import load_config, get_dtype
+from industrial_forecasting.utils.resources import setup_resources
+from industrial_forecasting.data import load_series
+from industrial_forecasting.features import create_supervised_from_series
+from industrial_forecasting.shards import ShardSet, WindowSampler, build_shards, load_fleet, series_scaling, window_starts
+from industrial_forecasting.models.lstm import LSTMRegressor, predict_lstm
+from industrial_forecasting.evaluate import mae, rmse
+
+
+def build_model(cfg):
+    return LSTMRegressor(1, cfg.lstm.hidden_size, cfg.lstm.num_layers)
+
+def train_global(model, sampler, lr, epochs, device, max_steps=None):
+    # Boucle d'entraînement en flux : les mini-lots viennent directement des shards memmap
+    model.to(device)
+    opt = torch.optim.Adam(model.parameters(), lr=lr)
+    loss_fn = torch.nn.MSELoss()
+    for epoch in range(epochs):
+        model.train()
+        t0, total, n = time.perf_counter(), 0.0, 0
+        for step, (X, y) in enumerate(sampler):
+            if max_steps and step >= max_steps:
+                break
+            xb = torch.from_numpy(X).float().unsqueeze(-1).to(device)
+            yb = torch.from_numpy(y).float().to(device)
+            opt.zero_grad()
+            loss = loss_fn(model(xb).reshape(-1), yb)
+            loss.backward()
+            opt.step()
+            total += loss.item() * len(y)
+            n += len(y)
+        dt = time.perf_counter() - t0
+        print(f"Époque {epoch + 1}/{epochs} - loss {total / max(n, 1):.5f} | {n} fenêtres | {n / dt:.0f} fenêtres/s")
+    model.eval()
+    return model
+
+def evaluate_global(model, shards, window):
+    # Évaluation par série sur sa partie test, en unités physiques
+    rows = []
+    for i, row in shards.index.iterrows():
+        # Ligne du manifeste (et non le nom) : deux fichiers homonymes de dossiers différents ne se confondent pas
+        values = shards.row_values(row)
+        starts = window_starts(shards.index.loc[[i]].assign(offset=0), window, part="test")
+        if not len(starts):
+            continue
+        X = values[starts[:, None] + np.arange(window)]
+        y_true = values[starts + window] * row["scale"] + row["loc"]
+        y_pred = predict_lstm(model, X) * row["scale"] + row["loc"]
+        rows.append({"series": row["name"], "n_test": len(y_true),
+                     "mae": mae(y_true, y_pred), "rmse": rmse(y_true, y_pred)})
+    return pd.DataFrame(rows)
+
+def predict_new(cfg, model_path, path, out_path):
+    # Nouveau capteur : pas d'entraînement, seule la normalisation est calculée sur son historique
+    dtype = get_dtype(cfg)
+    s = load_series(path, cfg.data.datetime_col, cfg.data.value_col, dtype=dtype).interpolate()
+    window = int(cfg.lstm.window_size)
+    loc, scale = series_scaling(s.to_numpy(), int(len(s) * cfg.data.train_ratio))
+    X, y = create_supervised_from_series((s - loc) / scale, window, dtype=dtype)
+    model = build_model(cfg)
+    model.load_state_dict(torch.load(model_path, map_location="cpu"))
+    model.eval()
+    y_pred = predict_lstm(model, X) * scale + loc
+    y_true = y * scale + loc
+    print(f" LSTM global sur {os.path.basename(path)} - MAE: {mae(y_true, y_pred):.3f} | RMSE: {rmse(y_true, y_pred):.3f}")
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    pd.DataFrame({"y_true": y_true, "y_pred": y_pred}, index=s.index[window:]).to_csv(out_path)
+    print(f" Prédictions sauvegardées → {out_path}")
+
+def main(cfg_path, files=None, rebuild=False, predict=None, max_steps=None):
+    cfg = load_config(cfg_path)
+    setup_resources(cfg)
+    gcfg = getattr(cfg, "lstm_global", None)
+    shard_dir = getattr(gcfg, "shard_dir", "data/shards/lstm_global")
+    model_path = getattr(gcfg, "model_path", "models/lstm_global.pt")
+    window = int(cfg.lstm.window_size)
+
+    if predict:
+        out_path = getattr(gcfg, "forecast_path", "data/processed/forecast_lstm_global.csv")
+        return predict_new(cfg, model_path, predict, out_path)
+
+    # --- Shards (reconstruits seulement si absents ou sur demande) ---
+    if rebuild or not ShardSet.exists(shard_dir):
+        files = files or getattr(gcfg, "files", None) or ["data/raw/nab/*.csv"]
+        t0 = time.perf_counter()
+        index = build_shards(load_fleet(files, cfg.data.datetime_col, dtype=get_dtype(cfg)), shard_dir, window,
+                             train_ratio=cfg.data.train_ratio, dtype=get_dtype(cfg),
+                             shard_size=int(getattr(gcfg, "shard_size", 10_000_000)))
+        print(f" {len(index)} séries écrites dans {shard_dir} ({time.perf_counter() - t0:.1f} s)")
+    shards = ShardSet(shard_dir)
+    sampler = WindowSampler(shards, window, batch_size=int(cfg.lstm.batch_size),
+                            shards_per_block=int(getattr(gcfg, "shards_per_block", 2)))
+    print(f" {shards.meta['n_series']} séries | {shards.meta['n_shards']} shards | {sampler.n_windows} fenêtres d'entraînement")
+
+    # --- Entraînement global ---
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+    print(f" Utilisation du device : {device}")
+    max_steps = max_steps or getattr(gcfg, "steps_per_epoch", None)
+    model = train_global(build_model(cfg), sampler, float(cfg.lstm.lr), int(cfg.lstm.epochs), device, max_steps)
+    model.to("cpu")
+
+    os.makedirs(os.path.dirname(model_path), exist_ok=True)
+    torch.save(model.state_dict(), model_path)
+    print(f" Modèle LSTM global sauvegardé → {model_path}")
+
+    # --- Évaluation par série ---
+    metrics = evaluate_global(model, shards, window)
+    if len(metrics):
+        print(metrics.describe().loc[["mean", "50%"], ["mae", "rmse"]].to_string())
+        metrics_path = getattr(gcfg, "metrics_path", "reports/lstm_global_metrics.csv")
+        os.makedirs(os.path.dirname(metrics_path), exist_ok=True)
+        metrics.to_csv(metrics_path, index=False)
+        print(f" Métriques par série → {metrics_path}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="LSTM global entraîné sur de nombreuses séries (shards memmap)")
+    parser.add_argument('--config', required=True, help='Chemin vers le fichier de configuration YAML')
+    parser.add_argument('--files', nargs='*', default=None, help='CSV à inclure (glob), remplace lstm_global.files')
+    parser.add_argument('--rebuild', action='store_true', help='Reconstruit les shards')
+    parser.add_argument('--predict', default=None, help='CSV d\'un nouveau capteur : prévision sans ré-entraînement')
+    parser.add_argument('--max-steps', type=int, default=None, help='Mini-lots maximum par époque')
+    args = parser.parse_args()
+    main(args.config, files=args.files, rebuild=args.rebuild, predict=args.predict, max_steps=args.max_steps)
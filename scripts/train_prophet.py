@@ -6,8 +6,11 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from industrial_forecasting.utils.config import load_config
-from industrial_forecasting.data import train_test_split_series
+from industrial_forecasting.utils.resources import setup_resources
+from industrial_forecasting.data import train_test_split_series, load_processed_series
 from industrial_forecasting.models.prophet import ProphetForecaster
+from industrial_forecasting.seasonality import suggest_seasonality
+from industrial_forecasting.resolution import plan_resolution, to_output
 from industrial_forecasting.evaluate import mae, rmse
 
 def analyze_prophet_components(model, forecast_df, test_df):
@@ -90,18 +93,24 @@ def analyze_prophet_components(model, forecast_df, test_df):
     if negligible_components:
         print(f"  Composantes à désactiver: {', '.join(negligible_components)}")
 
-def main(cfg_path):
+def main(cfg_path, processed=False):
     cfg = load_config(cfg_path)
+    setup_resources(cfg)
     print(" Configuration chargée")
 
     # Charger la série
-    df = pd.read_csv(
-        cfg.data.raw_path,
-        parse_dates=[cfg.data.datetime_col],
-        index_col=cfg.data.datetime_col
-    )
-    df = df.rename(columns={cfg.data.value_col: "y"})
-    df = df.reset_index().rename(columns={cfg.data.datetime_col: "ds"})
+    if processed:
+        # Série déjà régularisée et comblée par scripts/preprocess.py
+        clean = load_processed_series(cfg)
+        df = pd.DataFrame({"ds": clean.index, "y": clean.values})
+    else:
+        df = pd.read_csv(
+            cfg.data.raw_path,
+            parse_dates=[cfg.data.datetime_col],
+            index_col=cfg.data.datetime_col
+        )
+        df = df.rename(columns={cfg.data.value_col: "y"})
+        df = df.reset_index().rename(columns={cfg.data.datetime_col: "ds"})
     print(f"Série chargée : {len(df)} lignes")
     
     # Train/Test split
@@ -110,6 +119,12 @@ def main(cfg_path):
     print(s.index.is_monotonic_increasing)
     print(s.isna().sum())
 
+    # Résolution d'entraînement : niveau le plus grossier de la pyramide d'agrégats (optionnel)
+    freq = cfg.data.freq.lower() if cfg.data.freq else None
+    fine, plan = s, plan_resolution(s, freq, cfg, cfg.data.train_ratio)
+    if plan:
+        s, freq = plan["series"], plan["freq"]
+
     train, test = train_test_split_series(s, cfg.data.train_ratio)
     print(f"Train : {len(train)} obs | Test : {len(test)} obs")
     print("NaN dans train :", train.isna().sum())
@@ -120,15 +135,27 @@ def main(cfg_path):
     print("NaN dans test :", test.isna().sum())
     print(train.describe())
 
+    # Saisonnalités : celles de la config, restreintes à celles détectées par FFT (optionnel)
+    seasonality_flags = {
+        "yearly_seasonality": cfg.prophet.yearly_seasonality,
+        "weekly_seasonality": cfg.prophet.weekly_seasonality,
+        "daily_seasonality": cfg.prophet.daily_seasonality,
+    }
+    season_cfg = getattr(cfg, "seasonality", None)
+    if getattr(season_cfg, "auto", False) and freq:
+        found = suggest_seasonality(train, freq,
+                                    min_strength=getattr(season_cfg, "min_strength", 0.05))
+        seasonality_flags = {k: bool(v and found["prophet"][k]) for k, v in seasonality_flags.items()}
+        print(" Forces saisonnières :", {k: round(v, 3) for k, v in found["strengths"].items()})
+        print(" Saisonnalités ajustées :", seasonality_flags)
+
     # Préparer DataFrame pour Prophet
     train_df = pd.DataFrame({'ds': train.index, 'y': train.values})
     test_df = pd.DataFrame({'ds': test.index, 'y': test.values})
 
     # Instanciation et entraînement
     model = ProphetForecaster(
-        yearly_seasonality=cfg.prophet.yearly_seasonality,
-        weekly_seasonality=cfg.prophet.weekly_seasonality,
-        daily_seasonality=cfg.prophet.daily_seasonality,
+        **seasonality_flags,
         seasonality_mode=cfg.prophet.seasonality_mode,
         changepoint_prior_scale=cfg.prophet.changepoint_prior_scale,
         seasonality_prior_scale=cfg.prophet.seasonality_prior_scale,
@@ -141,7 +168,7 @@ def main(cfg_path):
     print(" Entraînement Prophet terminé")
 
     # Prévisions
-    forecast_df = model.forecast(steps=len(test_df), freq=cfg.data.freq)
+    forecast_df = model.forecast(steps=len(test_df), freq=freq if plan else cfg.data.freq)
 
     # DEBUG : Afficher les colonnes
     print("\n Colonnes disponibles dans forecast :", forecast_df.columns)
@@ -156,6 +183,13 @@ def main(cfg_path):
     #  ANALYSE DES COMPOSANTES
     analyze_prophet_components(model, forecast_df, test_df)
 
+    if plan:
+        # Évaluation (et sauvegarde) à la résolution de sortie : prévision désagrégée si besoin
+        y_true, yhat = to_output(pd.Series(yhat.values, index=test.index), plan, fine)
+        test_df = pd.DataFrame({"ds": y_true.index, "y": y_true.interpolate().values})
+        yhat = yhat.reset_index(drop=True)
+        print(f" Prévisions {freq} comparées sur {len(test_df)} points à la résolution de sortie")
+
     #  ANALYSE DE LA VARIABILITÉ
     print("\n" + "="*50)
     print(" ANALYSE DE LA VARIABILITÉ")
@@ -202,5 +236,6 @@ def main(cfg_path):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Entraînement Prophet")
     parser.add_argument("--config", required=True, help="Chemin vers config.yaml")
+    parser.add_argument("--processed", action="store_true", help="Utilise la série nettoyée par preprocess.py")
     args = parser.parse_args()
-    main(args.config)
\ No newline at end of file
+    main(args.config, processed=args.processed)
\ No newline at end of file
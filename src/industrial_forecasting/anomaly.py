@@ -1,7 +1,20 @@
-import argparse, numpy as np, pandas as pd, os
+import argparse, io, numpy as np, pandas as pd, os, joblib
+from scipy.stats import chi2
 from sklearn.ensemble import IsolationForest
-from industrial_forecasting.utils.config import load_config
-from industrial_forecasting.data import load_series
+from industrial_forecasting.utils.config import load_config, get_dtype
+from industrial_forecasting.utils.resources import joblib_jobs, setup_resources
+from industrial_forecasting.data import load_series, load_frame, load_processed_series
+from industrial_forecasting.store import to_ns
+from industrial_forecasting.preprocess import clean_series, read_raw_since
+from industrial_forecasting.changepoint import detect_changepoints
+from industrial_forecasting.matrix_profile import detect_discords
+from industrial_forecasting.events import append_events, read_meta as read_events_meta, to_events, write_events
+
+ANOMALIES_PATH = "data/processed/anomalies.csv"
+STATE_PATH = "data/processed/anomaly_state.pkl"
+# Méthodes qui analysent tout l'historique d'un coup (pas d'état à réutiliser point par point) ;
+# leur tableau annexe est écrit à côté de anomalies.csv (<anomalies>_<nom>.csv)
+OFFLINE_METHODS = {"changepoint": "segments", "discord": "discords"}
 
 def zscore_anomaly(y, threshold=3.0):
     m = np.median(y)
@@ -9,26 +22,317 @@ def zscore_anomaly(y, threshold=3.0):
     z = 0.6745*(y - m)/mad
     return (np.abs(z) > threshold).astype(int)
 
-def main(cfg_path):
+def _as_float(X):
+    # Garde float32/float64 tel quel (pas de copie), convertit le reste en float64
+    X = np.asarray(X)
+    return X if X.dtype.kind == "f" else X.astype(float)
+
+def update_moments(moments, X):
+    # Fusionne un bloc (n_obs, n_canaux) dans (n, moyenne, co-moment) — formule de Chan,
+    # ce qui permet d'accumuler la covariance bloc par bloc (ou au fil de l'eau)
+    X = np.asarray(X, dtype=float)
+    n_b = len(X)
+    if n_b == 0:
+        return moments
+    mean_b = X.mean(axis=0)
+    Xc = X - mean_b
+    M_b = Xc.T @ Xc
+    if moments is None:
+        return n_b, mean_b, M_b
+    n_a, mean_a, M_a = moments
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    mean = mean_a + delta * (n_b / n)
+    M = M_a + M_b + np.outer(delta, delta) * (n_a * n_b / n)
+    return n, mean, M
+
+def fit_mahalanobis(X, alpha=0.001, chunk_size=100_000):
+    """Estime l'état du détecteur multivarié (Mahalanobis robuste) sur une matrice (temps, canaux)."""
+    X = _as_float(X).reshape(len(X), -1)
+    X = X[~np.isnan(X).any(axis=1)]
+    if len(X) == 0:
+        raise ValueError("fit_mahalanobis : aucun instant sans valeur manquante sur l'ensemble des canaux")
+    # Standardisation robuste par canal (médiane / MAD), insensible aux défauts présents
+    med = np.median(X, axis=0)
+    mad = 1.4826 * np.median(np.abs(X - med), axis=0)
+    scale = np.where(mad > 0, mad, 1.0).astype(X.dtype)
+    Z = (X - med) / scale
+    threshold = float(chi2.ppf(1.0 - alpha, df=X.shape[1]))
+
+    def _moments(mask=None):
+        moments = None
+        for start in range(0, len(Z), chunk_size):
+            block = Z[start:start + chunk_size]
+            if mask is not None:
+                block = block[mask[start:start + chunk_size]]
+            moments = update_moments(moments, block)
+        return moments
+
+    # Première estimation, puis re-pondération : on écarte les points au-delà du seuil χ²
+    n, mean, M = _moments()
+    prec = np.linalg.pinv(M / max(n - 1, 1))
+    D = Z - mean.astype(Z.dtype)
+    d2 = np.einsum("ij,jk,ik->i", D, prec.astype(Z.dtype), D)
+    moments = _moments(d2 <= threshold)
+    n, mean, M = moments
+    return {
+        "median": med,
+        "scale": scale,
+        "mean": mean,
+        "precision": np.linalg.pinv(M / max(n - 1, 1)),
+        "threshold": threshold,
+        "moments": moments,
+    }
+
+def mahalanobis_scores(X, state):
+    # Distance de Mahalanobis² de chaque instant, tous canaux à la fois (NaN si donnée manquante)
+    X = _as_float(X).reshape(len(X), -1)
+    dt = X.dtype
+    Z = (X - state["median"].astype(dt)) / state["scale"].astype(dt)
+    D = Z - state["mean"].astype(dt)
+    return np.einsum("ij,jk,ik->i", D, state["precision"].astype(dt), D)
+
+def mahalanobis_anomaly(X, alpha=0.001):
+    state = fit_mahalanobis(X, alpha=alpha)
+    d2 = mahalanobis_scores(X, state)
+    return (d2 > state["threshold"]).astype(int), d2
+
+def refresh_mahalanobis(state, X):
+    # Intègre les nouveaux points jugés normaux dans la covariance (mise à jour incrémentale)
+    Z = (_as_float(X).reshape(len(X), -1) - state["median"]) / state["scale"]
+    Z = Z[~np.isnan(Z).any(axis=1)]
+    D = Z - state["mean"]
+    keep = np.einsum("ij,jk,ik->i", D, state["precision"], D) <= state["threshold"]
+    n, mean, M = state["moments"] = update_moments(state["moments"], Z[keep])
+    state["mean"] = mean
+    state["precision"] = np.linalg.pinv(M / max(n - 1, 1))
+    return state
+
+def fit_detector(X, method="zscore", contamination=0.03, zscore_threshold=3.0, alpha=0.001):
+    """Ajuste un détecteur et renvoie son état, réutilisable pour scorer de nouveaux points."""
+    X = _as_float(X)
+    if method in OFFLINE_METHODS:
+        raise ValueError(f"{method} : méthode hors-ligne (analyse de tout l'historique), "
+                         "utiliser detect_anomalies")
+    if method == "isolation_forest":
+        model = IsolationForest(contamination=float(contamination), random_state=42, n_jobs=joblib_jobs())
+        return {"method": method, "model": model.fit(X.reshape(len(X), -1))}
+    if method == "mahalanobis":
+        return {"method": method, **fit_mahalanobis(X, alpha=float(alpha))}
+    # Médiane / MAD par canal (une seule valeur pour une série univariée)
+    m = np.median(X, axis=0)
+    mad = np.median(np.abs(X - m), axis=0) + 1e-9
+    return {"method": "zscore", "median": m, "mad": mad, "threshold": float(zscore_threshold)}
+
+def score_detector(state, X):
+    # Renvoie (labels 0/1, score) ; seules les statistiques figées de l'état sont utilisées
+    X = _as_float(X)
+    if state["method"] == "isolation_forest":
+        X2 = X.reshape(len(X), -1)
+        return (state["model"].predict(X2) == -1).astype(int), -state["model"].score_samples(X2)
+    if state["method"] == "mahalanobis":
+        d2 = mahalanobis_scores(X, state)
+        return (d2 > state["threshold"]).astype(int), d2
+    z = np.abs(0.6745 * (X - state["median"]) / state["mad"])
+    if z.ndim == 2:
+        z = z.max(axis=1)  # plusieurs canaux : le plus écarté fait foi
+    return (z > state["threshold"]).astype(int), z
+
+def detect_anomalies(data, method="zscore", **params) -> pd.DataFrame:
+    # data : pd.Series (univarié) ou pd.DataFrame (une colonne par canal)
+    if method in OFFLINE_METHODS:
+        # changepoint : label 1 au début de chaque segment ; discord : points des sous-séquences
+        # anormales. Le tableau annexe (segments / discords) est gardé dans attrs
+        detect = detect_changepoints if method == "changepoint" else detect_discords
+        labels, scores, table = detect(data, **params)
+        out = _label_frame(data, labels, scores)
+        out.attrs[OFFLINE_METHODS[method]] = table
+        return out
+    state = fit_detector(data.values, method, **params)
+    return _label_frame(data, *score_detector(state, data.values))
+
+def _label_frame(data, labels, scores) -> pd.DataFrame:
+    out = data.to_frame(name="value") if isinstance(data, pd.Series) else data.copy()
+    out["anomaly"] = labels
+    out["score"] = scores
+    return out
+
+def detect_anomalies_series(
+    s: pd.Series,
+    method: str = "zscore",
+    contamination: float = 0.03,
+    zscore_threshold: float = 3.0,
+) -> pd.DataFrame:
+    return detect_anomalies(s, method, contamination=contamination, zscore_threshold=zscore_threshold)
+
+def detect_anomalies_frame(df: pd.DataFrame, alpha: float = 0.001) -> pd.DataFrame:
+    # Détection multivariée : un seul passage sur la matrice complète des canaux
+    return detect_anomalies(df, "mahalanobis", alpha=alpha)
+
+def anomaly_params(cfg, method=None) -> dict:
+    anomaly_cfg = getattr(cfg, "anomaly", None)
+    if method == "changepoint":
+        cp_cfg = getattr(anomaly_cfg, "changepoint", None)
+        return {
+            "algorithm": getattr(cp_cfg, "algorithm", "binseg"),
+            "cost": getattr(cp_cfg, "cost", "normal"),
+            "penalty": getattr(cp_cfg, "penalty", None),
+            "penalty_factor": getattr(cp_cfg, "penalty_factor", 3.0),
+            "min_size": getattr(cp_cfg, "min_size", 10),
+            "jump": getattr(cp_cfg, "jump", 5),
+        }
+    if method == "discord":
+        mp_cfg = getattr(anomaly_cfg, "discord", None)
+        return {
+            "window": getattr(mp_cfg, "window", 60),
+            "top_k": getattr(mp_cfg, "top_k", 3),
+            "fraction": getattr(mp_cfg, "fraction", 1.0),
+            "time_budget": getattr(mp_cfg, "time_budget", None),
+            "max_refine": getattr(mp_cfg, "max_refine", 200),
+        }
+    return {
+        "contamination": getattr(anomaly_cfg, "contamination", 0.03),
+        "zscore_threshold": getattr(anomaly_cfg, "zscore_threshold", 3.0),
+        "alpha": getattr(anomaly_cfg, "mahalanobis_alpha", 0.001),
+    }
+
+def output_settings(cfg) -> dict:
+    # anomalies.csv dense (optionnel) et store d'événements (<anomalies>_events/ par défaut)
+    anomaly_cfg = getattr(cfg, "anomaly", None)
+    out_path = getattr(anomaly_cfg, "output_path", None) or ANOMALIES_PATH
+    events_dir = None
+    if getattr(anomaly_cfg, "events_output", True):
+        events_dir = getattr(anomaly_cfg, "events_path", None) or os.path.splitext(out_path)[0] + "_events"
+    return {"out_path": out_path, "dense": bool(getattr(anomaly_cfg, "dense_output", True)),
+            "events_dir": events_dir}
+
+def save_anomalies(out: pd.DataFrame, out_path: str, method: str = None, dense: bool = True,
+                   events_dir: str = None):
+    # anomalies.csv (un point par ligne), événements compacts, plus le tableau annexe des
+    # méthodes hors-ligne (<anomalies>_segments.csv, ...)
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    if dense:
+        out.to_csv(out_path)
+        print(f"Anomalies sauvegardées dans {out_path}")
+    if events_dir:
+        events = to_events(out, method or "unknown")
+        write_events(events_dir, events, *(out.index[[0, -1]] if len(out) else (None, None)))
+        print(f"{len(events)} événements sauvegardés dans {events_dir}")
+    base, ext = os.path.splitext(out_path)
+    for name in OFFLINE_METHODS.values():
+        if name in out.attrs:
+            table_path = f"{base}_{name}{ext or '.csv'}"
+            out.attrs[name].to_csv(table_path, index=False)
+            print(f"{len(out.attrs[name])} {name} sauvegardés dans {table_path}")
+
+def _read_input(cfg, method, source, processed=False, anchor=None):
+    # Série (ou matrice des canaux pour mahalanobis) depuis un chemin ou un tampon de lignes CSV
+    dtype = get_dtype(cfg)
+    if method == "mahalanobis":
+        # Canaux à leurs horodatages d'origine : pas de regrille à data.freq (SKAB est à la seconde)
+        freq = getattr(cfg.anomaly, "frame_freq", None)
+        data = load_frame(source, cfg.data.datetime_col, getattr(cfg.anomaly, "value_cols", None), freq,
+                          dtype=dtype)
+        # --processed : même nettoyage que preprocess.py (trous intérieurs interpolés)
+        return clean_series(data, freq, anchor) if processed else data
+    return load_series(source, cfg.data.datetime_col, cfg.data.value_col,
+                       getattr(cfg.data, "freq", None), dtype=dtype)
+
+def input_path(cfg, method) -> str:
+    return (getattr(cfg.anomaly, "frame_path", None) if method == "mahalanobis" else None) or cfg.data.raw_path
+
+def load_anomaly_input(cfg, method, processed=False):
+    # Tout l'historique : série nettoyée (--processed) ou CSV brut
+    if processed and method != "mahalanobis":
+        return load_processed_series(cfg, dtype=get_dtype(cfg))
+    return _read_input(cfg, method, input_path(cfg, method), processed)
+
+def load_anomaly_increment(cfg, method, processed=False, since=None, cursor=None, anchor=None):
+    """Points postérieurs à ``since`` en O(nouveaux points) ; renvoie (données, curseur).
+
+    Série nettoyée : recherche dichotomique dans le store de preprocess.py. Sinon (série
+    brute ou canaux de mahalanobis), seules les lignes ajoutées au CSV depuis ``cursor``
+    sont lues ; ``anchor`` (dernière ligne déjà scorée) borne l'interpolation des canaux.
+    """
+    if processed and method != "mahalanobis":
+        return load_processed_series(cfg, dtype=get_dtype(cfg), since=since), cursor
+    content, cursor, _ = read_raw_since(input_path(cfg, method), cursor)
+    if content.count(b"\n") < 2:
+        # En-tête seul : aucune ligne ajoutée depuis le passage précédent
+        return pd.Series(dtype=float), cursor
+    data = _read_input(cfg, method, io.BytesIO(content), processed, anchor)
+    return (data[data.index > since] if since is not None else data), cursor
+
+def _dump_state(state, state_path):
+    os.makedirs(os.path.dirname(state_path) or ".", exist_ok=True)
+    joblib.dump(state, state_path + ".tmp")
+    os.replace(state_path + ".tmp", state_path)
+
+def run_incremental(cfg, method, processed=False, refit=False) -> int:
+    """Score uniquement les points postérieurs au dernier horodatage traité et les ajoute au CSV.
+
+    L'état (statistiques robustes, forêt ajustée, covariance, high-watermark) est persisté
+    dans ``anomaly.state_path`` ; le premier passage (ou ``refit``) ajuste le détecteur sur
+    tout l'historique disponible et réécrit le CSV. Les événements sont ajoutés au store :
+    un événement en cours au watermark précédent est prolongé.
+    """
+    anomaly_cfg = getattr(cfg, "anomaly", None)
+    outputs = output_settings(cfg)
+    out_path, events_dir = outputs["out_path"], outputs["events_dir"]
+    state_path = getattr(anomaly_cfg, "state_path", None) or STATE_PATH
+
+    # Reprise seulement si les sorties activées existent encore
+    written = (not outputs["dense"] or os.path.exists(out_path)) and \
+        (events_dir is None or read_events_meta(events_dir) is not None)
+    state = None
+    if not refit and os.path.exists(state_path) and written:
+        state = joblib.load(state_path)
+        if state["detector"]["method"] != method:
+            state = None
+    since = pd.Timestamp(state["watermark"]) if state else None
+
+    data, cursor = load_anomaly_increment(cfg, method, processed, since, state.get("cursor") if state else None,
+                                          state.get("tail") if state else None)
+    if len(data) == 0:
+        if state:
+            state["cursor"] = cursor
+            _dump_state(state, state_path)
+        print(f"Aucun nouveau point après {since}")
+        return 0
+    new_state = state is None
+    if new_state:
+        state = {"detector": fit_detector(data.values, method, **anomaly_params(cfg))}
+    out = _label_frame(data, *score_detector(state["detector"], data.values))
+    if method == "mahalanobis" and not new_state:
+        refresh_mahalanobis(state["detector"], data.values)
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    if outputs["dense"]:
+        out.to_csv(out_path, mode="w" if new_state else "a", header=new_state)
+    if events_dir:
+        (write_events if new_state else append_events)(events_dir, to_events(out, method), *out.index[[0, -1]])
+    state["watermark"] = int(to_ns(data.index)[-1])
+    state["cursor"], state["tail"] = cursor, data.iloc[-1:]
+    _dump_state(state, state_path)
+    print(f"{len(out)} points scorés ({int(out['anomaly'].sum())} anomalies) → {out_path if outputs['dense'] else events_dir}")
+    return len(out)
+
+def main(cfg_path, processed=False, incremental=False, refit=False):
     cfg = load_config(cfg_path)
-    s = load_series(cfg['data']['raw_path'], cfg['data']['datetime_col'], cfg['data']['value_col'], cfg['data']['freq'])
-
-    method = cfg['anomaly']['method']
-    if method == 'isolation_forest':
-        model = IsolationForest(contamination=cfg['anomaly']['contamination'], random_state=42)
-        y = s.values.reshape(-1,1)
-        labels = (model.fit_predict(y) == -1).astype(int)
-    else:
-        labels = zscore_anomaly(s.values, threshold=cfg['anomaly']['zscore_threshold'])
-
-    out = s.to_frame(name='value')
-    out['anomaly'] = labels
-    os.makedirs('data/processed', exist_ok=True)
-    out.to_csv('data/processed/anomalies.csv')
-    print("Anomalies sauvegardées dans data/processed/anomalies.csv")
+    setup_resources(cfg)
+    method = cfg.anomaly.method
+    if incremental:
+        run_incremental(cfg, method, processed=processed, refit=refit)
+        return
+    out = detect_anomalies(load_anomaly_input(cfg, method, processed=processed), method,
+                           **anomaly_params(cfg, method))
+    save_anomalies(out, method=method, **output_settings(cfg))
 
 if __name__ == '__main__':
     ap = argparse.ArgumentParser()
     ap.add_argument('--config', required=True)
+    ap.add_argument('--processed', action='store_true')
+    ap.add_argument('--incremental', action='store_true', help="Ne score que les points postérieurs au watermark")
+    ap.add_argument('--refit', action='store_true', help="Ré-ajuste le détecteur (mode incrémental)")
     args = ap.parse_args()
-    main(args.config)
+    main(args.config, processed=args.processed, incremental=args.incremental, refit=args.refit)
@@ -0,0 +1,190 @@
+"""Artefacts de modèle compacts, chargés par memory-mapping.
+
+Le pickle d'un ``ARIMAForecaster`` embarque le résultat statsmodels complet (données
+d'entraînement, états filtrés à chaque pas, matrices de covariance) ; le LSTM est réparti
+entre un state_dict et un scaler joblib. Un artefact ne garde que ce qu'il faut pour prédire,
+dans un seul fichier ``.ifa`` :
+
+    b"IFART1\\0\\0" | longueur de l'en-tête (uint64) | en-tête JSON | tableaux bruts alignés sur 64 octets
+
+L'en-tête contient les métadonnées (type, ordres, fenêtre, scaler...) et la table des
+tableaux (dtype, forme, offset) ; chaque tableau est relu par ``np.memmap`` sans copie.
+
+- SARIMA : paramètres, matrices de l'espace d'état (design, transition, ordonnées) et état
+  prédit en fin d'échantillon : la prévision est une simple récurrence, sans statsmodels ;
+- LSTM   : poids du state_dict, bornes du MinMaxScaler, fenêtre et dimensions du réseau.
+"""
+import functools
+import json
+import os
+import time
+import numpy as np
+
+MAGIC = b"IFART1\0\0"
+ALIGN = 64
+EXT = ".ifa"
+
+def artifact_path(model_path: str) -> str:
+    return os.path.splitext(model_path)[0] + EXT
+
+def save_artifact(path: str, arrays: dict, meta: dict) -> int:
+    """Écrit un artefact (remplacement atomique) ; renvoie sa taille en octets."""
+    arrays = {k: np.ascontiguousarray(v) for k, v in arrays.items()}
+    table, offset = {}, 0
+    for name, arr in arrays.items():
+        table[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset += -(-arr.nbytes // ALIGN) * ALIGN
+    header = json.dumps({"meta": meta, "arrays": table}).encode()
+    start = -(-(len(MAGIC) + 8 + len(header)) // ALIGN) * ALIGN
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".tmp", "wb") as f:
+        f.write(MAGIC + np.uint64(len(header)).tobytes() + header)
+        for name, arr in arrays.items():
+            f.seek(start + table[name]["offset"])
+            f.write(arr.tobytes())
+        f.truncate(start + offset)
+    os.replace(path + ".tmp", path)
+    return os.path.getsize(path)
+
+def load_artifact(path: str, mmap: bool = True):
+    """Renvoie (métadonnées, {nom: tableau}) ; les tableaux sont des memmap en lecture seule."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} n'est pas un artefact {EXT}")
+        size = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+        header = json.loads(f.read(size))
+        start = -(-(len(MAGIC) + 8 + size) // ALIGN) * ALIGN
+        arrays = {}
+        for name, spec in header["arrays"].items():
+            dtype, shape = np.dtype(spec["dtype"]), tuple(spec["shape"])
+            if mmap and int(np.prod(shape)):
+                arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=start + spec["offset"], shape=shape)
+            else:
+                f.seek(start + spec["offset"])
+                arrays[name] = np.frombuffer(f.read(dtype.itemsize * int(np.prod(shape))), dtype=dtype).reshape(shape)
+    return header["meta"], arrays
+
+class LeanSARIMA:
+    """Prévision SARIMA à partir de l'état final du filtre de Kalman (sans statsmodels)."""
+
+    def __init__(self, meta: dict, arrays: dict):
+        self.meta = meta
+        self.arrays = arrays
+
+    @classmethod
+    def from_results(cls, results, order=None, seasonal_order=None, **meta):
+        # Matrices invariantes de l'espace d'état (dernière tranche si variables dans le temps)
+        fr = results.filter_results
+        arrays = {
+            "params": np.asarray(results.params, dtype=float),
+            "design": np.asarray(fr.design[..., -1], dtype=float),
+            "obs_intercept": np.asarray(fr.obs_intercept[..., -1], dtype=float),
+            "obs_cov": np.asarray(fr.obs_cov[..., -1], dtype=float),
+            "transition": np.asarray(fr.transition[..., -1], dtype=float),
+            "state_intercept": np.asarray(fr.state_intercept[..., -1], dtype=float),
+            "state_cov": np.asarray(fr.selection[..., -1] @ fr.state_cov[..., -1] @ fr.selection[..., -1].T,
+                                    dtype=float),
+            # a(n+1|n), P(n+1|n) : état prédit pour le premier pas hors échantillon
+            "state": np.asarray(fr.predicted_state[:, -1], dtype=float),
+            "state_var": np.asarray(fr.predicted_state_cov[:, :, -1], dtype=float),
+        }
+        meta = {"kind": "sarima", "order": list(order or results.model.order),
+                "seasonal_order": list(seasonal_order or results.model.seasonal_order),
+                "param_names": list(results.model.param_names), "nobs": int(results.nobs),
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"), **meta}
+        return cls(meta, arrays)
+
+    def forecast(self, steps: int, return_std: bool = False):
+        a = self.arrays
+        Z, T = np.asarray(a["design"]), np.asarray(a["transition"])
+        d, c, RQR = np.asarray(a["obs_intercept"]), np.asarray(a["state_intercept"]), np.asarray(a["state_cov"])
+        state, P = np.array(a["state"]), np.array(a["state_var"])
+        mean, var = np.empty(int(steps)), np.empty(int(steps))
+        for h in range(int(steps)):
+            mean[h] = (Z @ state + d)[0]
+            if return_std:
+                var[h] = (Z @ P @ Z.T + a["obs_cov"])[0, 0]
+                P = T @ P @ T.T + RQR
+            state = T @ state + c
+        return (mean, np.sqrt(np.maximum(var, 0.0))) if return_std else mean
+
+    def save(self, path: str) -> int:
+        return save_artifact(path, self.arrays, self.meta)
+
+    @classmethod
+    def load(cls, path: str):
+        meta, arrays = load_artifact(path)
+        if meta.get("kind") != "sarima":
+            raise ValueError(f"{path} : artefact {meta.get('kind')}, SARIMA attendu")
+        return cls(meta, arrays)
+
+def save_lstm_artifact(path: str, model, scaler=None, window: int = None, **meta) -> int:
+    """Poids du LSTM (state_dict), bornes du MinMaxScaler et fenêtre dans un seul fichier."""
+    arrays = {f"w:{k}": v.detach().cpu().numpy() for k, v in model.state_dict().items()}
+    if scaler is not None:
+        for attr in ("data_min_", "data_max_", "data_range_", "scale_", "min_"):
+            arrays[f"scaler:{attr}"] = np.asarray(getattr(scaler, attr))
+        meta["feature_range"] = list(scaler.feature_range)
+        meta["n_samples_seen"] = int(np.asarray(scaler.n_samples_seen_).max())
+    meta = {"kind": "lstm", "window": window, "created": time.strftime("%Y-%m-%dT%H:%M:%S"), **meta}
+    return save_artifact(path, arrays, meta)
+
+def load_lstm_artifact(path: str, device: str = "cpu"):
+    """Renvoie (modèle en mode eval, scaler ou None, métadonnées)."""
+    import torch
+    from industrial_forecasting.models.lstm import LSTMRegressor
+    meta, arrays = load_artifact(path)
+    if meta.get("kind") != "lstm":
+        raise ValueError(f"{path} : artefact {meta.get('kind')}, LSTM attendu")
+    model = LSTMRegressor(1, meta["hidden_size"], meta["num_layers"])
+    # memmap en lecture seule : torch exige un tampon inscriptible, copie des seuls poids
+    state = {k[2:]: torch.from_numpy(np.array(v)) for k, v in arrays.items() if k.startswith("w:")}
+    model.load_state_dict(state)
+    model.to(device).eval()
+    scaler = None
+    if "scaler:scale_" in arrays:
+        from sklearn.preprocessing import MinMaxScaler
+        scaler = MinMaxScaler(feature_range=tuple(meta["feature_range"]))
+        for attr in ("data_min_", "data_max_", "data_range_", "scale_", "min_"):
+            setattr(scaler, attr, np.array(arrays[f"scaler:{attr}"]))
+        scaler.n_features_in_ = len(scaler.scale_)
+        scaler.n_samples_seen_ = meta["n_samples_seen"]
+    return model, scaler, meta
+
+@functools.lru_cache(maxsize=32)
+def _cached(path: str, mtime_ns: int, loader, args: tuple):
+    return loader(path, *args)
+
+def load_cached(path: str, loader, *args):
+    # Chargement mémorisé par processus, invalidé quand le fichier est réécrit
+    return _cached(os.path.abspath(path), os.stat(path).st_mtime_ns, loader, args)
+
+def _timed(loader, path, repeat: int = 5) -> float:
+    # Meilleur temps de chargement sur ``repeat`` essais (cache disque chaud)
+    best = np.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        loader(path)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def compare_artifacts(lean_path: str, lean_loader, legacy_paths, legacy_loader, repeat: int = 5) -> dict:
+    """Taille et temps de chargement de l'artefact vs les fichiers pickle actuels.
+
+    ``legacy_loader`` reçoit tous les ``legacy_paths`` ; s'il en manque un, la comparaison
+    est sautée (None).
+    """
+    missing = [p for p in legacy_paths if not p or not os.path.exists(p)]
+    if missing:
+        print(f" Comparaison artefact / pickle sautée : introuvable(s) {missing}")
+        return None
+    report = {
+        "lean_bytes": os.path.getsize(lean_path),
+        "legacy_bytes": sum(os.path.getsize(p) for p in legacy_paths),
+        "lean_load_ms": 1000 * _timed(lean_loader, lean_path, repeat),
+        "legacy_load_ms": 1000 * _timed(lambda _: legacy_loader(*legacy_paths), None, repeat),
+    }
+    print(f" Artefact {os.path.basename(lean_path)} : {report['lean_bytes'] / 1024:.1f} Ko, "
+          f"chargé en {report['lean_load_ms']:.2f} ms | pickle : {report['legacy_bytes'] / 1024:.1f} Ko, "
+          f"{report['legacy_load_ms']:.2f} ms")
+    return report
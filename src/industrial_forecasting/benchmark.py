@@ -0,0 +1,191 @@
+"""Banc d'essai précision / coût des détecteurs d'anomalies sur NAB et SKAB.
+
+Chaque couple (fichier, méthode) est exécuté dans un processus du pool : on mesure le
+temps de détection (ajustement + scoring), le débit en points/s, et on compare les
+détections aux fenêtres d'anomalies connues :
+- précision / rappel / F1 point à point ;
+- score NAB fenêtré (profil standard A_TP=1, A_FP=-0.11, A_FN=-1) : seule la première
+  détection d'une fenêtre compte, d'autant plus qu'elle est précoce ; une fausse alerte
+  est d'autant moins pénalisée qu'elle suit de près la fin d'une fenêtre. Une plage
+  contiguë de points détectés compte pour une seule alerte (son début). Comme dans NAB,
+  les scores bruts sont sommés sur le corpus puis normalisés une seule fois entre le
+  détecteur nul (0, aucune détection) et le détecteur parfait (100) ; une série sans
+  fenêtre ne compte que ses fausses alertes (A_FP chacune).
+
+Étiquettes : ``combined_windows.json`` de NAB (copié par ``fetch_nab.py``) ou colonne
+``anomaly`` des fichiers SKAB.
+"""
+import contextlib, glob, io, json, os, time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from industrial_forecasting.utils.config import load_config, get_dtype
+from industrial_forecasting.utils.resources import pool_size, thread_budget, worker_init
+from industrial_forecasting.data import LABEL_COLS, load_frame
+from industrial_forecasting.anomaly import anomaly_params, detect_anomalies
+from industrial_forecasting.events import label_runs
+
+METHODS = ("zscore", "isolation_forest", "mahalanobis", "changepoint", "discord")
+NAB_PROFILE = {"tp": 1.0, "fp": -0.11, "fn": -1.0}
+NAB_WINDOWS = "combined_windows.json"
+
+def _scaled_sigmoid(y):
+    # Fonction de pondération NAB 2 / (1 + e^(5y)) - 1 : ~1 en début de fenêtre, 0 en fin, -> -1 loin après
+    return -np.tanh(2.5 * y)
+
+def label_windows(labels: np.ndarray):
+    # Fenêtres [début, fin] (indices inclus) des plages contiguës d'étiquettes à 1
+    return list(zip(*label_runs(labels)))
+
+def window_labels(index: pd.DatetimeIndex, windows) -> np.ndarray:
+    labels = np.zeros(len(index), dtype=int)
+    for start, end in windows:
+        labels[(index >= pd.Timestamp(start)) & (index <= pd.Timestamp(end))] = 1
+    return labels
+
+def point_metrics(truth, pred) -> dict:
+    truth, pred = np.asarray(truth, dtype=bool), np.asarray(pred, dtype=bool)
+    tp = int((truth & pred).sum())
+    fp = int((~truth & pred).sum())
+    fn = int((truth & ~pred).sum())
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"tp": tp, "fp": fp, "fn": fn, "precision": precision, "recall": recall, "f1": f1}
+
+def nab_raw(truth, pred, profile=NAB_PROFILE) -> dict:
+    """Scores NAB bruts d'une série : détecteur évalué, nul (aucune alerte) et parfait."""
+    windows = label_windows(truth)
+    # Une alerte par plage contiguë de détections (un indicateur maintenu n'alerte qu'une fois)
+    detections = np.array([start for start, _ in label_windows(pred)], dtype=np.int64)
+    if not windows:
+        # Série sans anomalie : chaque alerte est une fausse alerte hors fenêtre (A_FP), nul = parfait = 0
+        return {"nab_raw": profile["fp"] * len(detections), "nab_null": 0.0, "nab_perfect": 0.0}
+    starts = np.array([w[0] for w in windows])
+    ends = np.array([w[1] for w in windows])
+    lengths = ends - starts + 1
+    raw = 0.0
+    detected = np.zeros(len(windows), dtype=bool)
+    # Fenêtre contenant (ou précédant) chaque détection : recherche dichotomique
+    k = np.searchsorted(starts, detections, side="right") - 1
+    for t, w in zip(detections, k):
+        if w >= 0 and t <= ends[w]:
+            if not detected[w]:
+                detected[w] = True
+                raw += profile["tp"] * _scaled_sigmoid((t - ends[w]) / lengths[w])
+        elif w >= 0:
+            raw += -profile["fp"] * _scaled_sigmoid((t - ends[w]) / lengths[w])
+        else:
+            raw += profile["fp"]
+    raw += profile["fn"] * (~detected).sum()
+    return {"nab_raw": float(raw), "nab_null": profile["fn"] * len(windows),
+            "nab_perfect": float(profile["tp"] * _scaled_sigmoid(-1.0) * len(windows))}
+
+def normalized_nab(raw, null, perfect) -> float:
+    # 100 * (S - S_nul) / (S_parfait - S_nul) ; indéfini sans fenêtre (nul = parfait)
+    return 100.0 * (raw - null) / (perfect - null) if perfect != null else np.nan
+
+def nab_score(truth, pred, profile=NAB_PROFILE) -> float:
+    """Score NAB normalisé d'une seule série (NaN sans fenêtre : voir ``leaderboard``)."""
+    r = nab_raw(truth, pred, profile)
+    return normalized_nab(r["nab_raw"], r["nab_null"], r["nab_perfect"])
+
+def load_benchmark_file(path, nab_windows=None, dtype=float):
+    """Renvoie (données, étiquettes) : colonne ``anomaly`` (SKAB) ou fenêtres NAB."""
+    with open(path, "r") as f:
+        header = f.readline().strip()
+    sep = ";" if header.count(";") > header.count(",") else ","
+    cols = [c for c in header.split(sep) if c not in ("timestamp", "datetime")]
+    frame = load_frame(path, "timestamp", value_cols=cols, sep=sep, dtype=dtype)
+    if "anomaly" in frame.columns:
+        labels = frame["anomaly"].to_numpy()
+    else:
+        labels = window_labels(frame.index, (nab_windows or {}).get(os.path.basename(path), []))
+    frame = frame.drop(columns=[c for c in LABEL_COLS if c in frame.columns])
+    data = frame.iloc[:, 0] if frame.shape[1] == 1 else frame
+    return data, np.asarray(labels, dtype=int)
+
+def _run(task):
+    path, method, params, nab_windows, dtype = task
+    data, truth = load_benchmark_file(path, nab_windows, dtype)
+    t0 = time.perf_counter()
+    try:
+        # Les détecteurs hors-ligne rapportent leur progression : sortie absorbée dans les workers
+        with contextlib.redirect_stdout(io.StringIO()):
+            out = detect_anomalies(data, method, **params)
+        error = None
+    except Exception as e:  # une méthode en échec ne bloque pas le banc d'essai
+        out, error = None, f"{type(e).__name__}: {e}"
+    elapsed = time.perf_counter() - t0
+    row = {"file": os.path.basename(path), "method": method, "n_points": len(data),
+           "n_channels": 1 if isinstance(data, pd.Series) else data.shape[1],
+           "wall_time_s": elapsed, "samples_per_s": len(data) / elapsed if elapsed > 0 else np.nan,
+           "error": error}
+    if out is not None:
+        pred = out["anomaly"].to_numpy()
+        row.update(point_metrics(truth, pred))
+        row.update(nab_raw(truth, pred))
+        row["nab_score"] = normalized_nab(row["nab_raw"], row["nab_null"], row["nab_perfect"])
+    return row
+
+def leaderboard(results: pd.DataFrame) -> pd.DataFrame:
+    # Agrégat par méthode : F1 micro (comptes cumulés), score NAB du corpus, coût total
+    ok = results[results["error"].isna()]
+    agg = ok.groupby("method").agg(files=("file", "count"), tp=("tp", "sum"), fp=("fp", "sum"), fn=("fn", "sum"),
+                                   nab_raw=("nab_raw", "sum"), nab_null=("nab_null", "sum"),
+                                   nab_perfect=("nab_perfect", "sum"), f1_mean=("f1", "mean"),
+                                   n_points=("n_points", "sum"), wall_time_s=("wall_time_s", "sum"))
+    # Scores bruts sommés sur le corpus, normalisés une fois (et non moyenne des scores par fichier)
+    agg["nab_score"] = [normalized_nab(*v) for v in agg[["nab_raw", "nab_null", "nab_perfect"]].to_numpy()]
+    agg["precision"] = agg["tp"] / (agg["tp"] + agg["fp"]).replace(0, np.nan)
+    agg["recall"] = agg["tp"] / (agg["tp"] + agg["fn"]).replace(0, np.nan)
+    agg["f1"] = 2 * agg["precision"] * agg["recall"] / (agg["precision"] + agg["recall"])
+    agg["samples_per_s"] = agg["n_points"] / agg["wall_time_s"]
+    agg["errors"] = results.groupby("method")["error"].count().reindex(agg.index).fillna(0).astype(int)
+    cols = ["files", "nab_score", "f1", "precision", "recall", "f1_mean", "wall_time_s", "samples_per_s", "errors"]
+    return agg[cols].fillna(0.0).sort_values("nab_score", ascending=False)
+
+def run_benchmark(cfg, files, methods=METHODS, workers=None, nab_windows=None) -> pd.DataFrame:
+    dtype = get_dtype(cfg)
+    sizes = {p: os.path.getsize(p) for p in files}
+    # Gros fichiers d'abord : meilleur équilibrage du pool
+    tasks = [(p, m, anomaly_params(cfg, m), nab_windows, dtype)
+             for p in sorted(files, key=sizes.get, reverse=True) for m in methods]
+    # Chaque worker reçoit sa part des cœurs : les temps mesurés ne souffrent pas de sur-souscription
+    workers = pool_size(cfg, workers)
+    budget = thread_budget(cfg, workers)
+    print(f"Pool : {workers} workers × {budget['cores']} cœur(s)")
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=worker_init, initargs=(budget,)) as pool:
+        for i, row in enumerate(pool.map(_run, tasks), 1):
+            rows.append(row)
+            status = row["error"] or f"F1 {row['f1']:.3f} | NAB {row['nab_score']:.1f}"
+            print(f"[{i}/{len(tasks)}] {row['file']} × {row['method']} : {status} "
+                  f"({row['wall_time_s']:.2f} s, {row['samples_per_s']:.0f} pts/s)", flush=True)
+    return pd.DataFrame(rows)
+
+def main(cfg_path, nab_glob="data/raw/nab/*.csv", skab_glob="data/raw/skab/*.csv", methods=None,
+         workers=None, out_dir="reports"):
+    cfg = load_config(cfg_path)
+    nab_files = sorted(glob.glob(nab_glob)) if nab_glob else []
+    files = nab_files + (sorted(glob.glob(skab_glob)) if skab_glob else [])
+    if not files:
+        raise FileNotFoundError("Aucun fichier : lancer scripts/fetch_nab.py et scripts/fetch_skab.py --series files")
+    nab_windows = None
+    if nab_files:
+        windows_path = os.path.join(os.path.dirname(nab_files[0]), NAB_WINDOWS)
+        if os.path.exists(windows_path):
+            with open(windows_path) as f:
+                nab_windows = json.load(f)
+        else:
+            print(f"Fenêtres NAB introuvables ({windows_path}) : relancer scripts/fetch_nab.py")
+    t0 = time.perf_counter()
+    results = run_benchmark(cfg, files, methods or METHODS, workers, nab_windows)
+    board = leaderboard(results)
+    os.makedirs(out_dir, exist_ok=True)
+    results.to_csv(os.path.join(out_dir, "benchmark_results.csv"), index=False)
+    board.to_csv(os.path.join(out_dir, "benchmark_leaderboard.csv"))
+    print(f"\n{len(files)} fichiers × {len(methods or METHODS)} méthodes en {time.perf_counter() - t0:.1f} s")
+    print(board.to_string(float_format=lambda v: f"{v:.3f}"))
+    print(f"Résultats → {out_dir}/benchmark_results.csv, {out_dir}/benchmark_leaderboard.csv")
+    return board
@@ -1,15 +1,45 @@
 import pandas as pd
+from industrial_forecasting.store import read_meta, read_store
 
-def load_series(path: str, ts_col: str, val_col: str, freq: str = None) -> pd.Series:
-    df = pd.read_csv(path, parse_dates=[ts_col])
+# Colonnes d'étiquettes présentes dans les fichiers SKAB (à exclure de la matrice capteurs)
+LABEL_COLS = ("anomaly", "changepoint")
+
+def load_series(path: str, ts_col: str, val_col: str, freq: str = None, dtype=float) -> pd.Series:
+    # dtype appliqué dès la lecture : pas de passage intermédiaire par float64 en float32
+    df = pd.read_csv(path, parse_dates=[ts_col], dtype={val_col: dtype})
     df = df.sort_values(ts_col)
     if freq:
         df = df.set_index(ts_col).asfreq(freq)
     else:
         df = df.set_index(ts_col)
-    s = df[val_col].astype(float)
+    s = df[val_col].astype(dtype, copy=False)
     return s
 
+def load_frame(path: str, ts_col: str, value_cols=None, freq: str = None, sep: str = None,
+               dtype=float) -> pd.DataFrame:
+    # Charge toutes les voies capteurs d'un fichier (ex. SKAB : 8 canaux, séparateur ';')
+    df = pd.read_csv(path, sep=sep, engine="python" if sep is None else "c")
+    if ts_col not in df.columns and "datetime" in df.columns:
+        df = df.rename(columns={"datetime": ts_col})
+    df[ts_col] = pd.to_datetime(df[ts_col])
+    df = df.sort_values(ts_col).set_index(ts_col)
+    if freq:
+        df = df[~df.index.duplicated(keep="last")].asfreq(freq)
+    if value_cols is None:
+        value_cols = [c for c in df.columns
+                      if c not in LABEL_COLS and pd.api.types.is_numeric_dtype(df[c])]
+    return df[list(value_cols)].astype(dtype, copy=False)
+
+def load_processed_series(cfg, dtype=float, since=None) -> pd.Series:
+    # Série nettoyée produite par preprocess : store binaire si présent, sinon CSV processed_path.
+    # ``since`` ne renvoie que les points postérieurs (recherche dichotomique dans le store)
+    store_dir = getattr(cfg.data, "store_path", None)
+    if store_dir and read_meta(store_dir) is not None:
+        s = read_store(store_dir, start=since, name=cfg.data.value_col)
+        return s.rename_axis(cfg.data.datetime_col).astype(dtype, copy=False)
+    s = load_series(cfg.data.processed_path, cfg.data.datetime_col, cfg.data.value_col, dtype=dtype)
+    return s[s.index > since] if since is not None else s
+
 def train_test_split_series(s: pd.Series, train_ratio: float = 0.8):
     n = len(s)
     split = int(n * train_ratio)
@@ -0,0 +1,170 @@
+"""Sortie compacte des anomalies : un événement par plage contiguë de points détectés.
+
+Un store d'événements est un dossier contenant :
+- ``events.csv`` : start, end, n_points, peak_score, peak_time, method (trié par début) ;
+- ``index.i8``   : par événement (début ns, fin ns, offset de la ligne dans events.csv), int64 ;
+- ``meta.json``  : nombre d'événements, taille utile du CSV, dernier horodatage scoré.
+
+Les événements d'un même passage ne se chevauchent pas : débuts et fins sont triés, et
+``events_in_range`` trouve les événements d'une plage par deux recherches dichotomiques
+dans l'index (memory-mapping) puis ne lit que les lignes utiles du CSV : O(log n + k).
+Comme pour ``store.py``, les données sont écrites avant ``meta.json`` : seuls ``count``
+événements font foi, un ajout interrompu est tronqué au suivant.
+"""
+import io
+import json
+import os
+import numpy as np
+import pandas as pd
+from industrial_forecasting.store import to_ns
+
+EVENTS_FILE = "events.csv"
+INDEX_FILE = "index.i8"
+META_FILE = "meta.json"
+COLUMNS = ["start", "end", "n_points", "peak_score", "peak_time", "method"]
+TIME_COLS = ["start", "end", "peak_time"]
+
+def label_runs(labels: np.ndarray):
+    # Débuts / fins (indices inclus) des plages contiguës d'étiquettes à 1
+    padded = np.r_[0, np.asarray(labels, dtype=np.int8) != 0, 0].astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    return edges[::2], edges[1::2] - 1
+
+def to_events(out: pd.DataFrame, method: str) -> pd.DataFrame:
+    """Un événement par plage de points ``anomaly == 1`` : bornes, taille et pic de score."""
+    starts, ends = label_runs(out["anomaly"].to_numpy())
+    if not len(starts):
+        return pd.DataFrame(columns=COLUMNS)
+    lengths = ends - starts + 1
+    flagged = np.flatnonzero(out["anomaly"].to_numpy())
+    score = out["score"].to_numpy(dtype=float)[flagged] if "score" in out else np.zeros(len(flagged))
+    score = np.where(np.isnan(score), -np.inf, score)
+    # Pic de chaque plage : maximum par segment, puis première position qui l'atteint
+    offsets = np.r_[0, np.cumsum(lengths)[:-1]]
+    peak = np.maximum.reduceat(score, offsets)
+    hits = np.flatnonzero(score == np.repeat(peak, lengths))
+    peak_pos = flagged[hits[np.searchsorted(hits, offsets)]]
+    return pd.DataFrame({
+        "start": out.index[starts],
+        "end": out.index[ends],
+        "n_points": lengths,
+        "peak_score": np.where(np.isfinite(peak), peak, np.nan),
+        "peak_time": out.index[peak_pos],
+        "method": method,
+    })
+
+def read_meta(events_dir: str) -> dict | None:
+    path = os.path.join(events_dir, META_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+def write_meta(events_dir: str, meta: dict):
+    path = os.path.join(events_dir, META_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def _index(events_dir: str, count: int) -> np.ndarray:
+    if count == 0:
+        return np.empty((0, 3), dtype=np.int64)
+    return np.memmap(os.path.join(events_dir, INDEX_FILE), dtype=np.int64, mode="r", shape=(count, 3))
+
+def _rows(events: pd.DataFrame):
+    # Lignes CSV (bytes) d'un bloc d'événements, une par événement
+    buf = io.StringIO()
+    events[COLUMNS].to_csv(buf, header=False, index=False, lineterminator="\n")
+    return [line.encode() + b"\n" for line in buf.getvalue().splitlines()]
+
+def _merge(last: pd.Series, first: pd.Series) -> pd.Series:
+    # Événement à cheval sur deux passages : bornes réunies, pic le plus haut
+    merged = last.copy()
+    merged["end"] = first["end"]
+    merged["n_points"] = int(last["n_points"]) + int(first["n_points"])
+    if pd.isna(last["peak_score"]) or first["peak_score"] > last["peak_score"]:
+        merged["peak_score"], merged["peak_time"] = first["peak_score"], first["peak_time"]
+    return merged
+
+def append_events(events_dir: str, events: pd.DataFrame, first_ts=None, last_ts=None) -> dict:
+    """Ajoute les événements d'un passage couvrant [first_ts, last_ts].
+
+    Si le dernier événement stocké se terminait au dernier point du passage précédent et
+    que le premier nouvel événement commence au premier point de celui-ci, les deux sont fusionnés.
+    """
+    os.makedirs(events_dir, exist_ok=True)
+    csv_path = os.path.join(events_dir, EVENTS_FILE)
+    meta = read_meta(events_dir)
+    if meta is None:
+        with open(csv_path, "wb") as f:
+            f.write((",".join(COLUMNS) + "\n").encode())
+        meta = {"count": 0, "csv_bytes": os.path.getsize(csv_path), "watermark": None}
+    count, keep = int(meta["count"]), int(meta["csv_bytes"])
+    events = events[COLUMNS].reset_index(drop=True)
+    # Seule la dernière entrée de l'index sert (memmap relâché avant de tronquer le fichier)
+    last_end, last_offset = (int(v) for v in _index(events_dir, count)[-1, 1:]) if count else (None, None)
+    if (count and len(events) and first_ts is not None and meta["watermark"] is not None
+            and last_end == meta["watermark"] and to_ns([events["start"].iloc[0]])[0] == to_ns([first_ts])[0]):
+        # Dernier événement seul relu (sa ligne CSV), pas tout le store
+        last = _read_rows(events_dir, last_offset, keep).iloc[-1]
+        events = pd.concat([_merge(last, events.iloc[0]).to_frame().T, events.iloc[1:]], ignore_index=True)
+        keep = last_offset
+        count -= 1
+    rows = _rows(events) if len(events) else []
+    offsets = keep + np.r_[0, np.cumsum([len(r) for r in rows])[:-1]].astype(np.int64) if rows else []
+    with open(csv_path, "r+b") as f:
+        f.truncate(keep)
+        f.seek(keep)
+        f.write(b"".join(rows))
+    block = np.column_stack([to_ns(events["start"]), to_ns(events["end"]), offsets]).astype(np.int64) \
+        if rows else np.empty((0, 3), dtype=np.int64)
+    with open(os.path.join(events_dir, INDEX_FILE), "ab") as f:
+        f.truncate(count * 3 * 8)
+        f.write(np.ascontiguousarray(block).tobytes())
+    meta["count"] = count + len(block)
+    meta["csv_bytes"] = keep + sum(len(r) for r in rows)
+    if last_ts is not None:
+        meta["watermark"] = int(to_ns([last_ts])[0])
+    write_meta(events_dir, meta)
+    return meta
+
+def write_events(events_dir: str, events: pd.DataFrame, first_ts=None, last_ts=None) -> dict:
+    # Réécrit le store (passage complet)
+    for name in (META_FILE, EVENTS_FILE, INDEX_FILE):
+        if os.path.exists(os.path.join(events_dir, name)):
+            os.remove(os.path.join(events_dir, name))
+    return append_events(events_dir, events, first_ts, last_ts)
+
+def _parse(frame: pd.DataFrame) -> pd.DataFrame:
+    for col in TIME_COLS:
+        frame[col] = pd.to_datetime(frame[col])
+    return frame
+
+def _read_rows(events_dir: str, start: int, stop: int) -> pd.DataFrame:
+    # Lignes d'événements entre deux offsets du CSV (lecture directe, sans parcourir le début)
+    with open(os.path.join(events_dir, EVENTS_FILE), "rb") as f:
+        f.seek(start)
+        chunk = f.read(stop - start)
+    return _parse(pd.read_csv(io.BytesIO(chunk), names=COLUMNS, header=None))
+
+def read_events(events_dir: str) -> pd.DataFrame:
+    meta = read_meta(events_dir)
+    if meta is None or meta["count"] == 0:
+        return pd.DataFrame(columns=COLUMNS)
+    frame = pd.read_csv(os.path.join(events_dir, EVENTS_FILE), nrows=int(meta["count"]))
+    return _parse(frame)
+
+def events_in_range(events_dir: str, start=None, end=None) -> pd.DataFrame:
+    """Événements qui recouvrent [start, end] : recherche dichotomique dans l'index, O(log n + k)."""
+    meta = read_meta(events_dir)
+    if meta is None or meta["count"] == 0:
+        return pd.DataFrame(columns=COLUMNS)
+    count = int(meta["count"])
+    index = _index(events_dir, count)
+    # Débuts et fins triés : premier événement finissant après start, dernier commençant avant end
+    lo = int(np.searchsorted(index[:, 1], pd.Timestamp(start).value, side="left")) if start is not None else 0
+    hi = int(np.searchsorted(index[:, 0], pd.Timestamp(end).value, side="right")) if end is not None else count
+    if hi <= lo:
+        return pd.DataFrame(columns=COLUMNS)
+    stop = int(index[hi, 2]) if hi < count else int(meta["csv_bytes"])
+    return _read_rows(events_dir, int(index[lo, 2]), stop)
@@ -1,20 +1,30 @@
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 
-def rolling_features(s: pd.Series, windows=(3, 6, 12)):
-    df = pd.DataFrame({"y": s})
+def _float_dtype(values, dtype=None):
+    # Conserve la précision d'entrée (float32/float64) sauf demande explicite
+    if dtype is not None:
+        return np.dtype(dtype)
+    return values.dtype if values.dtype.kind == "f" else np.dtype(float)
+
+def rolling_features(s: pd.Series, windows=(3, 6, 12), dtype=None):
+    dtype = _float_dtype(s.values, dtype)
+    cols = {"y": s.astype(dtype, copy=False)}
     for w in windows:
-        df[f"roll_mean_{w}"] = s.rolling(w).mean()
-        df[f"roll_std_{w}"] = s.rolling(w).std()
+        roll = s.rolling(w)
+        cols[f"roll_mean_{w}"] = roll.mean().astype(dtype, copy=False)
+        cols[f"roll_std_{w}"] = roll.std().astype(dtype, copy=False)
+    df = pd.DataFrame(cols)
     df = df.dropna()
     return df
 
-def create_supervised_from_series(s: pd.Series, window: int = 24):
-    X, y = [], []
-    values = s.values.astype(float)
-    for i in range(len(values) - window):
-        X.append(values[i:i+window])
-        y.append(values[i+window])
-    X = np.asarray(X, dtype=float)
-    y = np.asarray(y, dtype=float)
+def create_supervised_from_series(s: pd.Series, window: int = 24, dtype=None):
+    values = np.asarray(s.values)
+    values = values.astype(_float_dtype(values, dtype), copy=False)
+    if len(values) <= window:
+        return np.empty((0, window), dtype=values.dtype), np.empty(0, dtype=values.dtype)
+    # Fenêtres glissantes vectorisées (une seule copie contiguë, prête pour torch)
+    X = np.ascontiguousarray(sliding_window_view(values, window)[:-1])
+    y = values[window:].copy()
     return X, y
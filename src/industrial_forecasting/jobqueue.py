@@ -0,0 +1,433 @@
+"""File de travaux sur répertoire partagé : répartit le travail par série sur plusieurs nœuds.
+
+Aucun broker : la file est un dossier (NFS, SMB...) monté par tous les nœuds.
+- ``pending/``, ``claimed/``, ``done/``, ``failed/`` : un fichier JSON par travail
+  (série + étape + empreinte de configuration) ;
+- ``configs/<hash>.yaml`` : configurations référencées par les travaux ;
+- ``work/<série>-<hash>/`` : répertoire de travail d'une série (sorties relatives des scripts).
+
+La prise d'un travail est un ``os.rename`` pending → claimed (atomique : un seul worker
+gagne). Le worker entretient un bail en rafraîchissant le mtime du fichier ; un travail
+dont le bail a expiré (nœud mort) est remis en file, ou passe en ``failed`` après
+``max_attempts`` tentatives. Chaque étape est exécutée dans un sous-processus (script CLI
+existant) avec une configuration dont ``data.raw_path`` pointe sur la série et dont toutes
+les sorties (store, modèles, prévisions, anomalies) sont redirigées dans ``work/<série>-<hash>/``.
+"""
+import glob, hashlib, json, ntpath, os, socket, subprocess, sys, threading, time
+from multiprocessing import Process
+import yaml
+from industrial_forecasting.utils.config import load_config
+from industrial_forecasting.utils.resources import apply_budget, thread_budget
+
+STATES = ("pending", "claimed", "done", "failed")
+SCRIPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "scripts"))
+
+# Étapes disponibles : script CLI et arguments supplémentaires
+STAGES = {
+    "preprocess": ["preprocess.py"],
+    "train_arima": ["train_arima.py"],
+    "train_lstm": ["train_lstm.py"],
+    "train_prophet": ["train_prophet.py"],
+    "train_harmonic": ["train_harmonic.py"],
+    "detect": ["detect_anomalies.py"],
+    "evaluate_arima": ["evaluate_forecasts.py", "--model", "arima"],
+    "evaluate_lstm": ["evaluate_forecasts.py", "--model", "lstm"],
+}
+# Sections dont les chemins sont propres à chaque série (redirigés dans le répertoire de travail)
+PER_SERIES_SECTIONS = ("data", "output", "anomaly", "harmonic")
+
+# Étapes lourdes qui, en cas de dépassement de job_timeout_s, basculent sur l'étape de repli
+HEAVY_STAGES = ("train_arima", "train_lstm", "train_prophet")
+# Code de retour d'une étape arrêtée pour dépassement de délai : jamais un code de processus
+# (-1 est celui d'un processus tué par SIGHUP), pour distinguer délai et signal
+TIMEOUT = "timeout"
+
+# Dépendance de chaque travail, lue une fois par processus (immuable) : un travail bloqué
+# n'est plus ni renommé ni relu tant que sa dépendance n'est pas terminée
+_DEPENDS_ON = {}
+
+# Étape qui produit le modèle évalué : si elle a basculé sur le repli, l'évaluation est sautée
+MODEL_STAGES = {"evaluate_arima": "train_arima", "evaluate_lstm": "train_lstm"}
+
+def _path(queue_dir, state, job_id):
+    return os.path.join(queue_dir, state, f"{job_id}.json")
+
+def _read(path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+def _write(path, job):
+    # Écriture atomique (tmp + replace) : un lecteur ne voit jamais de JSON partiel
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(job, f, indent=2)
+    os.replace(tmp, path)
+
+def _private(src):
+    return f"{src}.{os.getpid()}-{threading.get_ident()}.moving"
+
+def _settle(private, dest, job) -> bool:
+    # Deuxième moitié d'un transfert : contenu mis à jour, puis rename vers l'état cible
+    try:
+        # Réécrit aussitôt : le mtime frais protège ce transfert de recover_expired
+        _write(private, job)
+        os.rename(private, dest)
+    except FileNotFoundError:
+        return False
+    return True
+
+def _move(src, dest, job) -> bool:
+    """Transfère un travail : rename vers un nom privé (seul le gagnant continue), mise à jour
+    du contenu, puis rename vers l'état cible. False si le travail a déjà été pris ailleurs."""
+    private = _private(src)
+    try:
+        os.rename(src, private)
+    except FileNotFoundError:
+        return False
+    return _settle(private, dest, job)
+
+def init_queue(queue_dir):
+    for sub in (*STATES, "configs", "work"):
+        os.makedirs(os.path.join(queue_dir, sub), exist_ok=True)
+
+def config_hash(cfg_path) -> str:
+    with open(cfg_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+def series_id(path) -> str:
+    return os.path.splitext(os.path.basename(path))[0].replace(" ", "_")
+
+def job_state(queue_dir, job_id):
+    for state in STATES:
+        if os.path.exists(_path(queue_dir, state, job_id)):
+            return state
+    return None
+
+def enqueue(queue_dir, cfg_path, series_paths, stages, max_attempts=3) -> int:
+    """Ajoute un travail par (série, étape) ; les étapes d'une série s'enchaînent (dépendances).
+
+    Idempotent : un travail déjà présent (quel que soit son état) n'est pas recréé.
+    """
+    init_queue(queue_dir)
+    h = config_hash(cfg_path)
+    cfg_copy = os.path.join(queue_dir, "configs", f"{h}.yaml")
+    if not os.path.exists(cfg_copy):
+        with open(cfg_path, "rb") as src:
+            data = src.read()
+        with open(cfg_copy + ".tmp", "wb") as dst:
+            dst.write(data)
+        os.replace(cfg_copy + ".tmp", cfg_copy)
+    added = 0
+    for path in series_paths:
+        sid, previous = series_id(path), None
+        for stage in stages:
+            if stage not in STAGES:
+                raise ValueError(f"Étape inconnue : {stage} (choix : {', '.join(STAGES)})")
+            job_id = f"{sid}-{stage}-{h}"
+            if job_state(queue_dir, job_id) is None:
+                _write(_path(queue_dir, "pending", job_id), {
+                    "id": job_id, "series": sid, "path": os.path.abspath(path), "stage": stage,
+                    "config_hash": h, "depends_on": previous, "attempts": 0,
+                    "max_attempts": int(max_attempts), "created": time.time(), "history": [],
+                })
+                added += 1
+            previous = job_id
+    return added
+
+def recover_expired(queue_dir, lease) -> int:
+    """Remet en file (ou en échec) les travaux dont le bail n'est plus rafraîchi.
+
+    Récupère aussi les transferts interrompus entre les deux renames de ``_move`` (worker
+    mort) : un ``*.moving`` plus vieux que le bail termine dans done/ si son étape a réussi,
+    sinon est remis en file comme un bail expiré.
+    """
+    now, moved = time.time(), 0
+    for path in glob.glob(os.path.join(queue_dir, "*", "*.moving")):
+        try:
+            st = os.stat(path)
+            # ctime : change au rename, même si le contenu (et le mtime) n'a pas encore été réécrit
+            if now - max(st.st_mtime, st.st_ctime) < lease:
+                continue
+            job = _read(path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            continue
+        last = job["history"][-1] if job["history"] else {}
+        if last.get("event") == "run" and last.get("returncode") == 0:
+            state = "done"
+        else:
+            state = "pending" if job["attempts"] < job["max_attempts"] else "failed"
+        job["history"].append({"event": "move_interrupted", "at": now})
+        moved += _move(path, _path(queue_dir, state, job["id"]), job)
+    for path in glob.glob(os.path.join(queue_dir, "claimed", "*.json")):
+        try:
+            if now - os.path.getmtime(path) < lease:
+                continue
+            job = _read(path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            continue
+        job["history"].append({"event": "lease_expired", "worker": job.get("worker"), "at": now})
+        state = "pending" if job["attempts"] < job["max_attempts"] else "failed"
+        moved += _move(path, _path(queue_dir, state, job["id"]), job)
+    return moved
+
+def _model_fallback(queue_dir, job):
+    # Repli utilisé par l'entraînement du modèle qu'évalue ``job`` (None : modèle bien produit)
+    train = MODEL_STAGES.get(job["stage"])
+    if train is None:
+        return None
+    path = _path(queue_dir, "done", f"{job['series']}-{train}-{job['config_hash']}")
+    try:
+        return _read(path).get("fallback") if os.path.exists(path) else None
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def claim(queue_dir, worker_id):
+    """Prend le premier travail disponible (dépendance terminée) ; None si la file est vide.
+
+    Les candidats sont essayés dans l'ordre des noms : rename atomique vers un nom privé, et
+    seul le fichier gagné est lu (pas de lecture de toute la file à chaque prise). Un travail
+    dont la dépendance n'est pas terminée est rendu à pending/ et sa dépendance mémorisée.
+    Une évaluation dont l'entraînement a basculé sur le repli est rangée dans done/ sans être
+    exécutée (``skipped``) : son modèle n'a pas été écrit, ou date d'un passage précédent.
+    """
+    pending = os.path.join(queue_dir, "pending")
+    try:
+        names = sorted(e.name for e in os.scandir(pending) if e.name.endswith(".json"))
+    except FileNotFoundError:
+        return None
+    for name in names:
+        job_id = name[:-len(".json")]
+        dep = _DEPENDS_ON.get(job_id)
+        if dep and job_state(queue_dir, dep) not in ("done", "failed"):
+            continue
+        path = os.path.join(pending, name)
+        private = _private(path)
+        try:
+            os.rename(path, private)
+        except FileNotFoundError:
+            continue  # pris par un autre worker
+        try:
+            job = _read(private)
+        except json.JSONDecodeError:
+            os.rename(private, path)
+            continue
+        dep = _DEPENDS_ON[job_id] = job.get("depends_on")
+        if dep:
+            dep_state = job_state(queue_dir, dep)
+            if dep_state == "failed":
+                job["history"].append({"event": "dependency_failed", "at": time.time()})
+                _settle(private, _path(queue_dir, "failed", job_id), job)
+                continue
+            if dep_state != "done":
+                os.rename(private, path)
+                continue
+        used = _model_fallback(queue_dir, job)
+        if used:
+            job["skipped"] = f"{MODEL_STAGES[job['stage']]} remplacé par {used}"
+            job["history"].append({"event": "skipped", "reason": job["skipped"], "at": time.time()})
+            _settle(private, _path(queue_dir, "done", job_id), job)
+            continue
+        job["attempts"] += 1
+        job.update(worker=worker_id, claimed_at=time.time())
+        # Le fichier réécrit juste avant son arrivée dans claimed/ porte un mtime (bail) frais
+        if _settle(private, _path(queue_dir, "claimed", job_id), job):
+            return job
+    return None
+
+def _heartbeat(path, lease, stop):
+    # Rafraîchit le bail tant que l'étape tourne ; s'arrête si le travail a été repris ailleurs
+    while not stop.wait(lease / 3):
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return
+
+def _is_path_key(key: str) -> bool:
+    return key.endswith("_path") or "_path_" in key or key.startswith(("forecast", "image_", "model_path"))
+
+def job_config(queue_dir, job, work_dir) -> str:
+    """Configuration du travail : celle de la file, data.raw_path sur la série, sorties dans ``work_dir``.
+
+    Chaque chemin des sections par série est redirigé dans le répertoire de travail : relatif,
+    il y est conservé tel quel ; absolu (ex. ``C:/Users/.../models/arima_model.pkl``), seuls son
+    dossier parent et son nom sont gardés (``<work_dir>/models/arima_model.pkl``). Deux séries ne
+    partagent ainsi ni store, ni modèle, ni prévisions.
+    """
+    with open(os.path.join(queue_dir, "configs", f"{job['config_hash']}.yaml")) as f:
+        cfg = yaml.safe_load(f)
+    work_dir = os.path.abspath(work_dir)
+    for section in PER_SERIES_SECTIONS:
+        values = cfg.get(section) or {}
+        for key, value in values.items():
+            if isinstance(value, str) and _is_path_key(key):
+                absolute = os.path.isabs(value) or ntpath.isabs(value)
+                tail = (ntpath.basename(ntpath.dirname(value)), ntpath.basename(value)) if absolute else (value,)
+                values[key] = os.path.join(work_dir, *tail)
+    cfg.setdefault("data", {})["raw_path"] = job["path"]
+    if (cfg.get("anomaly") or {}).get("frame_path"):
+        cfg["anomaly"]["frame_path"] = job["path"]
+    path = os.path.join(work_dir, "config.yaml")
+    with open(path + ".tmp", "w") as f:
+        yaml.safe_dump(cfg, f, sort_keys=False, allow_unicode=True)
+    os.replace(path + ".tmp", path)
+    return path
+
+def _run_stage(stage, cfg_path, work_dir, log, timeout=None) -> int | str:
+    script, *extra = STAGES[stage]
+    cmd = [sys.executable, os.path.join(SCRIPTS_DIR, script), "--config", cfg_path, *extra]
+    try:
+        return subprocess.run(cmd, cwd=work_dir, stdout=log, stderr=subprocess.STDOUT, timeout=timeout).returncode
+    except subprocess.TimeoutExpired:
+        return TIMEOUT
+
+def run_job(queue_dir, job, lease, timeout=None, fallback=None) -> dict:
+    """Exécute l'étape dans ``work/<série>-<hash>/`` (les chemins relatifs des scripts y aboutissent).
+
+    Une étape lourde qui dépasse ``timeout`` est remplacée par l'étape ``fallback`` (modèle de repli).
+    """
+    work_dir = os.path.join(queue_dir, "work", f"{job['series']}-{job['config_hash']}")
+    os.makedirs(work_dir, exist_ok=True)
+    cfg_path = os.path.abspath(job_config(queue_dir, job, work_dir))
+    log_path = os.path.join(work_dir, f"{job['stage']}.log")
+    stop = threading.Event()
+    hb = threading.Thread(target=_heartbeat, args=(_path(queue_dir, "claimed", job["id"]), lease, stop), daemon=True)
+    hb.start()
+    t0, used = time.time(), None
+    try:
+        with open(log_path, "a") as log:
+            returncode = _run_stage(job["stage"], cfg_path, work_dir, log, timeout)
+            if returncode == TIMEOUT and fallback and job["stage"] in HEAVY_STAGES:
+                log.write(f"\nDélai de {timeout} s dépassé : repli sur {fallback}\n")
+                log.flush()
+                used = fallback
+                returncode = _run_stage(fallback, cfg_path, work_dir, log, timeout)
+    finally:
+        stop.set()
+        hb.join()
+    return {"returncode": returncode, "started": t0, "finished": time.time(),
+            "duration_s": time.time() - t0, "log": log_path, "fallback": used,
+            "effective_stage": used or job["stage"]}
+
+def finish(queue_dir, job, result) -> str:
+    """Range le travail dans done/, pending/ (nouvel essai) ou failed/ ; renvoie l'état final."""
+    job["history"].append({"event": "run", "worker": job["worker"], **result})
+    if result["returncode"] == 0:
+        state = "done"
+    else:
+        state = "pending" if job["attempts"] < job["max_attempts"] else "failed"
+    job.update(result)
+    if not _move(_path(queue_dir, "claimed", job["id"]), _path(queue_dir, state, job["id"]), job):
+        # Bail perdu (travail repris par un autre nœud) : le résultat n'est pas enregistré
+        return "lost"
+    return state
+
+def work(queue_dir, worker_id=None, lease=600, poll=5.0, timeout=None, max_jobs=None, exit_when_empty=True,
+         budget=None, fallback=None):
+    """Boucle d'un worker : récupère les baux expirés, prend un travail, l'exécute, recommence.
+
+    ``budget`` (part des cœurs du nœud) est transmis aux étapes par l'environnement.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    if budget:
+        apply_budget(budget)
+    n = 0
+    while max_jobs is None or n < max_jobs:
+        recover_expired(queue_dir, lease)
+        job = claim(queue_dir, worker_id)
+        if job is None:
+            if exit_when_empty and not _has_pending_work(queue_dir):
+                break
+            time.sleep(poll)
+            continue
+        state = finish(queue_dir, job, run_job(queue_dir, job, lease, timeout, fallback))
+        note = f", repli {job['fallback']}" if job.get("fallback") else ""
+        print(f"[{worker_id}] {job['id']} → {state} ({job['duration_s']:.1f} s{note})", flush=True)
+        n += 1
+    return n
+
+def _has_pending_work(queue_dir) -> bool:
+    # Travail encore possible : en attente, ou en cours ailleurs (dépendances à venir)
+    return any(glob.glob(os.path.join(queue_dir, state, "*.json")) for state in ("pending", "claimed"))
+
+def status(queue_dir, window=300.0) -> dict:
+    """Comptes par état et par étape, débit récent et estimation du temps restant."""
+    counts, by_stage, durations, finished, fallbacks, skipped = {}, {}, [], [], 0, 0
+    for state in STATES:
+        paths = glob.glob(os.path.join(queue_dir, state, "*.json"))
+        counts[state] = len(paths)
+        for path in paths:
+            try:
+                job = _read(path)
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue
+            by_stage.setdefault(job["stage"], dict.fromkeys(STATES, 0))[state] += 1
+            if state == "done" and job.get("skipped"):
+                skipped += 1
+            elif state == "done":
+                durations.append(job.get("duration_s", 0.0))
+                fallbacks += bool(job.get("fallback"))
+                finished.append((job.get("started", 0.0), job.get("finished", 0.0)))
+    # Débit sur la fenêtre récente (ramenée au début du premier travail si la file est plus jeune)
+    now = time.time()
+    recent = [s for s, f in finished if now - f <= window]
+    span = min(window, now - min(recent)) if recent else window
+    throughput = len(recent) / max(span, 1e-9) * 60.0
+    remaining = counts["pending"] + counts["claimed"]
+    return {
+        "counts": counts, "by_stage": by_stage, "fallbacks": fallbacks, "skipped": skipped,
+        "mean_duration_s": sum(durations) / len(durations) if durations else None,
+        "jobs_per_min": throughput,
+        "eta_min": remaining / throughput if throughput > 0 else None,
+    }
+
+def print_status(queue_dir, window=300.0):
+    st = status(queue_dir, window)
+    total = sum(st["counts"].values())
+    print(f"File {queue_dir} : {total} travaux | " + " | ".join(f"{k}: {v}" for k, v in st["counts"].items()))
+    for stage, c in sorted(st["by_stage"].items()):
+        print(f"  {stage:<16}" + "  ".join(f"{k}={v}" for k, v in c.items()))
+    if st["mean_duration_s"] is not None:
+        print(f"Durée moyenne : {st['mean_duration_s']:.1f} s | Débit ({window / 60:.0f} dernières min) : "
+              f"{st['jobs_per_min']:.2f} travaux/min"
+              + (f" | Reste ~{st['eta_min']:.0f} min" if st["eta_min"] is not None else ""))
+    if st["fallbacks"]:
+        print(f"Replis sur modèle de secours (délai dépassé) : {st['fallbacks']}")
+    if st["skipped"]:
+        print(f"Évaluations sautées (modèle remplacé par le repli) : {st['skipped']}")
+
+def queue_settings(cfg_path) -> dict:
+    qcfg = getattr(load_config(cfg_path), "jobqueue", None)
+    return {
+        "queue_dir": getattr(qcfg, "queue_dir", "data/queue"),
+        "lease": float(getattr(qcfg, "lease_s", 600)),
+        "max_attempts": int(getattr(qcfg, "max_attempts", 3)),
+        "poll": float(getattr(qcfg, "poll_s", 5)),
+        "timeout": getattr(qcfg, "job_timeout_s", None),
+        "fallback": getattr(qcfg, "fallback_stage", None),
+    }
+
+def main(cfg_path, command, queue_dir=None, files=None, stages=("detect",), processes=1,
+         max_jobs=None, forever=False):
+    settings = queue_settings(cfg_path)
+    queue_dir = queue_dir or settings["queue_dir"]
+    if command == "enqueue":
+        paths = sorted(p for pattern in files or [] for p in glob.glob(pattern))
+        added = enqueue(queue_dir, cfg_path, paths, stages, settings["max_attempts"])
+        print(f"{added} travaux ajoutés ({len(paths)} séries × {len(stages)} étapes) → {queue_dir}")
+    elif command == "work":
+        # Plusieurs processus workers sur ce nœud ; d'autres nœuds peuvent en lancer sur le même partage
+        init_queue(queue_dir)
+        budget = thread_budget(load_config(cfg_path), processes)
+        kwargs = dict(lease=settings["lease"], poll=settings["poll"], timeout=settings["timeout"],
+                      max_jobs=max_jobs, exit_when_empty=not forever, budget=budget, fallback=settings["fallback"])
+        print(f"{processes} workers × {budget['cores']} cœur(s) (threads BLAS/torch/joblib des étapes)")
+        procs = [Process(target=work, args=(queue_dir,), kwargs=kwargs) for _ in range(processes)]
+        t0 = time.time()
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        print(f"Workers terminés en {time.time() - t0:.1f} s")
+        print_status(queue_dir)
+    else:
+        print_status(queue_dir)
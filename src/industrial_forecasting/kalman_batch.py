@@ -0,0 +1,172 @@
+"""Filtre de Kalman en lot : mise à jour et prévision de nombreux SARIMA du même ordre à la fois.
+
+Chaque modèle ajusté (``ARIMAForecaster`` / résultat statsmodels, ou son artefact ``.ifa``)
+se résume à ses matrices d'espace d'état et à son état prédit (voir ``artifacts.LeanSARIMA``).
+Les modèles d'un même ordre ont la même dimension d'état : on empile ces matrices en
+tableaux (N, k, k) et chaque pas de filtrage / prévision devient quelques opérations
+vectorisées sur les N séries, sans objet statsmodels ni boucle Python par série.
+
+Les séries n'ont pas besoin d'être synchrones : un masque ``active`` (N, T) indique les pas
+qui concernent chaque série (postérieurs à son dernier point filtré) ; une valeur manquante
+sur un pas actif ne fait qu'avancer l'état (prédiction sans mise à jour).
+"""
+import os
+import numpy as np
+import pandas as pd
+from industrial_forecasting.artifacts import LeanSARIMA, load_artifact, save_artifact
+from industrial_forecasting.sarima import sarimax_results
+
+ARRAYS = ("design", "obs_intercept", "obs_cov", "transition", "state_intercept", "state_cov", "state", "state_var")
+
+class BatchSARIMA:
+    """N modèles SARIMA de même ordre, filtrés et prévus ensemble."""
+
+    def __init__(self, names, arrays: dict, meta: dict):
+        self.names = list(names)
+        self.meta = meta
+        a = {k: np.array(v, dtype=float) for k, v in arrays.items() if k in ARRAYS}
+        self.Z = a["design"].reshape(len(self.names), -1)
+        self.d = a["obs_intercept"].reshape(len(self.names))
+        self.H = a["obs_cov"].reshape(len(self.names))
+        self.T, self.c, self.RQR = a["transition"], a["state_intercept"], a["state_cov"]
+        self.a, self.P = a["state"], a["state_var"]
+        self.last = np.array(arrays.get("last", np.full(len(self.names), -1)), dtype=np.int64)
+
+    @classmethod
+    def from_lean(cls, models, names=None):
+        """Empile des ``LeanSARIMA`` ; tous doivent avoir le même ordre (même dimension d'état) et la même fréquence."""
+        models = list(models)
+        orders = {(tuple(m.meta["order"]), tuple(m.meta["seasonal_order"])) for m in models}
+        if len(orders) != 1:
+            raise ValueError(f"BatchSARIMA : ordres différents dans le lot ({sorted(orders)}) ; grouper par ordre")
+        freqs = {m.meta.get("freq") for m in models}
+        if len(freqs) != 1:
+            raise ValueError(f"BatchSARIMA : fréquences différentes dans le lot ({sorted(map(str, freqs))})")
+        names = names or [m.meta.get("series", str(i)) for i, m in enumerate(models)]
+        arrays = {k: np.stack([np.asarray(m.arrays[k], dtype=float) for m in models]) for k in ARRAYS}
+        arrays["last"] = np.array([pd.Timestamp(m.meta["last_timestamp"]).value if m.meta.get("last_timestamp")
+                                   else -1 for m in models], dtype=np.int64)
+        order, seasonal_order = next(iter(orders))
+        meta = {"kind": "sarima_batch", "order": list(order), "seasonal_order": list(seasonal_order),
+                "freq": models[0].meta.get("freq"),
+                "raw_paths": [m.meta.get("raw_path") for m in models],
+                "store_paths": [m.meta.get("store_path") for m in models]}
+        return cls(names, arrays, meta)
+
+    @classmethod
+    def from_models(cls, models, names=None):
+        # ARIMAForecaster ajustés (ou résultats statsmodels) : seuls paramètres et état final sont gardés
+        return cls.from_lean([LeanSARIMA.from_results(sarimax_results(m)) for m in models], names)
+
+    @classmethod
+    def from_artifacts(cls, paths):
+        return cls.from_lean([LeanSARIMA.load(p) for p in paths])
+
+    def __len__(self):
+        return len(self.names)
+
+    def _predict(self, a, P):
+        # a(t+1) = T a + c ; P(t+1) = T P T' + RQR'
+        a = np.einsum("nij,nj->ni", self.T, a) + self.c
+        P = self.T @ P @ self.T.transpose(0, 2, 1) + self.RQR
+        return a, P
+
+    def filter(self, Y, active=None, tol: float = 1e-9):
+        """Intègre les observations Y (N, T) ; renvoie innovations et variances (N, T).
+
+        Innovation standardisée v / sqrt(F) : surprise de chaque point vs la prévision à un pas
+        (NaN sur les pas inactifs ou manquants). Dès que P ne bouge plus (régime permanent,
+        atteint en général pendant l'ajustement), le gain est figé et la propagation de P en
+        O(N k³) est sautée tant qu'aucune valeur ne manque.
+        """
+        Y = np.asarray(Y, dtype=float).reshape(len(self), -1)
+        active = np.ones(Y.shape, dtype=bool) if active is None else np.asarray(active, dtype=bool)
+        v_out = np.full(Y.shape, np.nan)
+        F_out = np.full(Y.shape, np.nan)
+        a, P = self.a, self.P
+        steady = False
+        for t in range(Y.shape[1]):
+            on = active[:, t]
+            if not on.any():
+                continue
+            y = Y[:, t]
+            obs = on & np.isfinite(y)
+            if not steady or not np.array_equal(obs, on):
+                steady = False
+                PZ = np.einsum("nij,nj->ni", P, self.Z)
+                F = np.einsum("ni,ni->n", self.Z, PZ) + self.H
+            v = np.where(obs, y - np.einsum("ni,ni->n", self.Z, a) - self.d, 0.0)
+            gain = np.where(obs, 1.0 / F, 0.0)
+            a_next = np.einsum("nij,nj->ni", self.T, a + PZ * (v * gain)[:, None]) + self.c
+            if not steady:
+                P_f = P - PZ[:, :, None] * PZ[:, None, :] * gain[:, None, None]
+                P_next = self.T @ P_f @ self.T.transpose(0, 2, 1) + self.RQR
+                P_next = np.where(on[:, None, None], P_next, P)
+                steady = bool(np.array_equal(obs, on)
+                              and np.all(np.abs(P_next - P) <= tol * np.maximum(np.abs(P), 1.0)))
+                P = P_next
+            # Séries inactives à ce pas : état inchangé
+            a = np.where(on[:, None], a_next, a)
+            v_out[obs, t], F_out[obs, t] = v[obs], F[obs]
+        self.a, self.P = a, P
+        return v_out, F_out
+
+    def update(self, frame: pd.DataFrame):
+        """Intègre un tableau (horodatages réguliers × séries) ; renvoie les innovations standardisées.
+
+        Pour chaque série, seuls les pas postérieurs à son dernier horodatage filtré et
+        antérieurs à sa dernière valeur reçue sont intégrés : une série en retard n'est pas
+        avancée à vide et reprendra au bon pas au prochain rafraîchissement.
+        """
+        frame = frame.reindex(columns=self.names)
+        ts = frame.index.as_unit("ns").asi8
+        Y = frame.to_numpy(dtype=float).T
+        received = np.where(np.isfinite(Y), ts[None, :], -1).max(axis=1, initial=-1)
+        active = (ts[None, :] > self.last[:, None]) & (ts[None, :] <= received[:, None])
+        v, F = self.filter(Y, active)
+        self.last = np.maximum(self.last, received)
+        return pd.DataFrame((v / np.sqrt(F)).T, index=frame.index, columns=self.names)
+
+    def forecast(self, steps: int, return_std: bool = False):
+        """Prévisions (N, steps) de toutes les séries depuis leur état courant."""
+        a, P = self.a, self.P
+        mean, var = np.empty((len(self), int(steps))), np.empty((len(self), int(steps)))
+        for h in range(int(steps)):
+            mean[:, h] = np.einsum("ni,ni->n", self.Z, a) + self.d
+            if return_std:
+                var[:, h] = np.einsum("ni,nij,nj->n", self.Z, P, self.Z) + self.H
+                a, P = self._predict(a, P)
+            else:
+                a = np.einsum("nij,nj->ni", self.T, a) + self.c
+        return (mean, np.sqrt(np.maximum(var, 0.0))) if return_std else mean
+
+    def save(self, path: str) -> int:
+        arrays = {"design": self.Z, "obs_intercept": self.d, "obs_cov": self.H, "transition": self.T,
+                  "state_intercept": self.c, "state_cov": self.RQR, "state": self.a, "state_var": self.P,
+                  "last": self.last}
+        return save_artifact(path, arrays, {**self.meta, "names": self.names})
+
+    @classmethod
+    def load(cls, path: str):
+        meta, arrays = load_artifact(path)
+        if meta.get("kind") != "sarima_batch":
+            raise ValueError(f"{path} : artefact {meta.get('kind')}, lot SARIMA attendu")
+        return cls(meta.pop("names"), arrays, meta)
+
+def group_by_order(paths) -> dict:
+    """Artefacts SARIMA regroupés par (ordre, ordre saisonnier, fréquence) : un lot par groupe.
+
+    La fréquence fait partie de la clé : deux séries de même ordre ajustées à des résolutions
+    différentes (entraînement multi-résolution) n'avancent pas au même pas.
+    """
+    groups = {}
+    for path in paths:
+        meta, _ = load_artifact(path)
+        if meta.get("kind") == "sarima":
+            key = (tuple(meta["order"]), tuple(meta["seasonal_order"]), meta.get("freq"))
+            groups.setdefault(key, []).append(path)
+    return groups
+
+def bank_path(bank_dir: str, order, seasonal_order, freq=None) -> str:
+    tag = "_".join(map(str, order)) + "-" + "_".join(map(str, seasonal_order)) + (f"-{freq}" if freq else "")
+    return os.path.join(bank_dir, f"sarima_{tag}.ifa")
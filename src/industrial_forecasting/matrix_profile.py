@@ -0,0 +1,152 @@
+"""Détection de discords (sous-séquences anormales) par matrix profile.
+
+Le matrix profile P[i] est la distance euclidienne z-normalisée entre la sous-séquence
+de longueur ``m`` commençant en i et sa plus proche voisine (hors zone d'exclusion) ;
+un discord est une sous-séquence dont P est maximal : une forme qui n'a pas d'équivalent
+ailleurs dans la série (cycle de vibration modifié, palier anormal...).
+
+Calcul :
+- les diagonales de la matrice des distances sont parcourues dans un ordre aléatoire
+  (produits scalaires glissants par somme cumulée, O(n) vectorisé par diagonale) ;
+  on peut s'arrêter après une fraction des diagonales ou un budget de temps (mode
+  anytime) : P est alors une borne supérieure du profil exact ;
+- les discords sont ensuite affinés par MASS (profil de distance complet par FFT) :
+  un candidat affiné qui reste en tête est le discord exact, puisque les autres
+  valeurs sont des bornes supérieures.
+"""
+import time
+import numpy as np
+import pandas as pd
+
+def sliding_stats(T: np.ndarray, m: int):
+    # Moyenne et écart-type de chaque sous-séquence de longueur m (sommes cumulées)
+    cs = np.r_[0.0, np.cumsum(T)]
+    cs2 = np.r_[0.0, np.cumsum(T * T)]
+    mu = (cs[m:] - cs[:-m]) / m
+    var = (cs2[m:] - cs2[:-m]) / m - mu * mu
+    return mu, np.sqrt(np.maximum(var, 0.0))
+
+class MatrixProfile:
+    """Matrix profile (anytime) d'une série univariée, fenêtre ``m``."""
+
+    def __init__(self, T, m: int, exclusion: int = None):
+        T = np.asarray(T, dtype=float)
+        self.T = T - T.mean()  # centrage global : limite l'erreur des sommes cumulées
+        self.m = int(m)
+        self.n = len(T)
+        self.l = self.n - self.m + 1
+        if self.l < 2:
+            raise ValueError("matrix profile : série plus courte que la fenêtre")
+        self.exclusion = int(exclusion) if exclusion is not None else int(np.ceil(self.m / 4))
+        self.mu, sig = sliding_stats(self.T, self.m)
+        # Sous-séquences plates (capteur figé) : écart-type plancher, distance maximale
+        self.sig = np.maximum(sig, 1e-8 * max(float(self.T.std()), 1e-12))
+        self._m_mu, self._m_sig = self.m * self.mu, self.m * self.sig
+        self.P = np.full(self.l, np.inf)
+        self.diagonals = np.arange(self.exclusion + 1, self.l)
+        self.done = 0
+        self._fft_T = None
+
+    @property
+    def progress(self) -> float:
+        return self.done / max(len(self.diagonals), 1)
+
+    def _diagonal(self, k: int):
+        # Produits scalaires QT[i, i+k] pour tous les i, en O(n) par somme cumulée
+        m, cnt = self.m, self.l - k
+        cs = np.cumsum(self.T[:self.n - k] * self.T[k:])
+        qt = np.empty(cnt)
+        qt[0] = cs[m - 1]
+        np.subtract(cs[m:], cs[:cnt - 1], out=qt[1:])
+        # d² = 2m (1 - corr), calculé en place pour limiter les allocations
+        qt -= self._m_mu[:cnt] * self.mu[k:]
+        qt /= self._m_sig[:cnt] * self.sig[k:]
+        np.subtract(1.0, qt, out=qt)
+        np.maximum(qt, 0.0, out=qt)
+        d = np.sqrt(qt, out=qt)
+        d *= np.sqrt(2 * m)
+        np.minimum(self.P[:cnt], d, out=self.P[:cnt])
+        np.minimum(self.P[k:], d, out=self.P[k:])
+
+    def compute(self, fraction: float = 1.0, time_budget: float = None, chunk: int = 256,
+                seed: int = 42, verbose: bool = True, report_every: float = 5.0):
+        """Parcourt les diagonales (ordre aléatoire) jusqu'à ``fraction`` ou ``time_budget`` secondes."""
+        rng = np.random.default_rng(seed)
+        if self.done == 0:
+            self.diagonals = rng.permutation(self.diagonals)
+        target = int(np.ceil(min(max(fraction, 0.0), 1.0) * len(self.diagonals)))
+        t0 = last = time.perf_counter()
+        while self.done < target:
+            for k in self.diagonals[self.done:min(self.done + chunk, target)]:
+                self._diagonal(int(k))
+            self.done = min(self.done + chunk, target)
+            now = time.perf_counter()
+            if verbose and (now - last >= report_every or self.done == target):
+                rate = self.done / max(now - t0, 1e-9)
+                eta = (target - self.done) / max(rate, 1e-9)
+                print(f"Matrix profile : {100 * self.progress:.1f} % des diagonales "
+                      f"({now - t0:.1f} s, reste ~{eta:.0f} s)")
+                last = now
+            if time_budget is not None and now - t0 >= time_budget:
+                if verbose:
+                    print(f"Matrix profile : budget de {time_budget} s atteint "
+                          f"({100 * self.progress:.1f} % des diagonales, profil approché)")
+                break
+        return self.P
+
+    def distance_profile(self, i: int) -> np.ndarray:
+        # MASS : distances de la sous-séquence i à toutes les autres (corrélation par FFT)
+        size = 1 << int(np.ceil(np.log2(self.n + self.m)))
+        if self._fft_T is None or len(self._fft_T) != size // 2 + 1:
+            self._fft_T = np.fft.rfft(self.T, size)
+        Q = self.T[i:i + self.m][::-1]
+        qt = np.fft.irfft(self._fft_T * np.fft.rfft(Q, size), size)[self.m - 1:self.n]
+        corr = (qt - self.m * self.mu[i] * self.mu) / (self.m * self.sig[i] * self.sig)
+        D = np.sqrt(np.maximum(2 * self.m * (1 - corr), 0.0))
+        D[max(i - self.exclusion, 0):i + self.exclusion + 1] = np.inf
+        return D
+
+    def discords(self, top_k: int = 3, max_refine: int = 200, verbose: bool = True) -> pd.DataFrame:
+        """Top-k discords sans recouvrement ; ``exact`` indique si la valeur est certifiée."""
+        refined = np.zeros(self.l, dtype=bool)
+        if self.progress >= 1.0:
+            refined[:] = True
+        rows, n_refine = [], 0
+        banned = np.zeros(self.l, dtype=bool)
+        while len(rows) < top_k and not banned.all():
+            i = int(np.argmax(np.where(banned, -np.inf, self.P)))
+            if not refined[i] and n_refine < max_refine:
+                D = self.distance_profile(i)
+                np.minimum(self.P, D, out=self.P)  # D[j] = d(i, j) borne aussi P[j]
+                self.P[i] = D.min()
+                refined[i] = True
+                n_refine += 1
+                continue
+            rows.append({"start": i, "distance": float(self.P[i]), "exact": bool(refined[i])})
+            banned[max(i - self.m + 1, 0):i + self.m] = True
+        if verbose:
+            print(f"Discords : {len(rows)} trouvés ({n_refine} affinements MASS)")
+        return pd.DataFrame(rows, columns=["start", "distance", "exact"])
+
+def detect_discords(data, window=60, top_k=3, fraction=1.0, time_budget=None, max_refine=200,
+                    chunk=256, verbose=True):
+    """Renvoie (labels, score, discords) : label 1 sur les points des top-k discords,
+    score = matrix profile (distance au plus proche voisin de la sous-séquence débutant au point)."""
+    frame = data.to_frame(name="value") if isinstance(data, pd.Series) else data
+    labels = np.zeros(len(frame), dtype=int)
+    score = np.zeros(len(frame))
+    tables = []
+    for col in frame.columns:
+        T = frame[col].interpolate(limit_direction="both").to_numpy(dtype=float)
+        mp = MatrixProfile(T, int(window))
+        mp.compute(fraction=fraction, time_budget=time_budget, chunk=chunk, verbose=verbose)
+        found = mp.discords(top_k=top_k, max_refine=max_refine, verbose=verbose)
+        P = np.where(np.isfinite(mp.P), mp.P, 0.0)
+        score[:mp.l] = np.maximum(score[:mp.l], P)
+        for i in found["start"]:
+            labels[i:i + mp.m] = 1
+        found.insert(0, "channel", col)
+        found["end"] = frame.index[np.minimum(found["start"] + mp.m - 1, len(frame) - 1)]
+        found["start"] = frame.index[found["start"]]
+        tables.append(found)
+    return labels, score, pd.concat(tables, ignore_index=True)[["channel", "start", "end", "distance", "exact"]]
@@ -0,0 +1,113 @@
+"""Régression harmonique dynamique : tendance linéaire + termes de Fourier, ajustée en lot.
+
+Modèle de référence très peu coûteux (plancher de vitesse face à ARIMA / LSTM / Prophet,
+et repli quand ceux-ci dépassent leur budget de temps) :
+
+    y_t = b0 + b1 t + Σ_p Σ_{k<=K_p} [a_pk cos(2πkt/p) + c_pk sin(2πkt/p)] + ε_t
+
+Toutes les séries du lot partagent la matrice de conception X : les moindres carrés se
+résolvent en une fois par les équations normales (X'X + λI) B = X'Y, soit un produit
+matriciel pour des milliers de séries. Les séries avec trous, ou bourrées de NaN pour
+aligner des longueurs différentes, ont des équations pondérées par leur masque de points
+valides (X'WX + λI) B = X'WY : toutes sont formées par un même produit matriciel puis
+résolues en lot.
+"""
+import numpy as np
+from industrial_forecasting.artifacts import load_artifact, save_artifact
+
+def harmonic_design(t: np.ndarray, periods, harmonics, t_scale: float, trend: bool = True) -> np.ndarray:
+    # Colonnes : constante, tendance (t normalisé), puis cos / sin de chaque harmonique
+    t = np.asarray(t, dtype=float)
+    cols = [np.ones_like(t)]
+    if trend:
+        cols.append(t / t_scale)
+    for p, K in zip(periods, harmonics):
+        angle = 2 * np.pi * np.outer(t, np.arange(1, int(K) + 1)) / float(p)
+        cols.extend([np.cos(angle), np.sin(angle)])
+    return np.column_stack(cols)
+
+def detect_periods(Y, freq: str, min_strength: float = 0.05) -> list:
+    """Cycles calendaires (jour, semaine...) significatifs pour au moins une série du lot."""
+    from industrial_forecasting.seasonality import calendar_periods, nested_widths, seasonal_strength
+    Y = np.atleast_2d(np.asarray(Y, dtype=float))
+    periods = {k: p for k, p in calendar_periods(freq).items() if 2 <= p <= Y.shape[1] / 2}
+    if not periods:
+        return []
+    strengths = seasonal_strength(Y, list(periods.values()), nested_widths(periods))
+    keep = np.nanmax(np.atleast_2d(strengths), axis=0) >= min_strength
+    return [float(p) for p, ok in zip(periods.values(), keep) if ok]
+
+class HarmonicForecaster:
+    """Tendance + Fourier ; ``fit`` accepte une série (n_obs,) ou un lot (n_series, n_obs)."""
+
+    def __init__(self, periods=(24, 168), harmonics=4, trend=True, ridge=1e-6, block=2048):
+        self.periods = [float(p) for p in periods]
+        K = harmonics if np.ndim(harmonics) else [harmonics] * len(self.periods)
+        # Pas plus d'harmoniques que la période ne le permet (Nyquist)
+        self.harmonics = [int(min(k, p // 2)) for k, p in zip(K, self.periods)]
+        self.trend = bool(trend)
+        self.ridge = float(ridge)
+        self.block = int(block)
+        self.coef_ = None
+
+    def fit(self, y):
+        Y = np.asarray(y)
+        self.univariate_ = Y.ndim == 1
+        Y = np.atleast_2d(Y)
+        n_series, self.n_obs_ = Y.shape
+        self.t_scale_ = float(max(self.n_obs_ - 1, 1))
+        X = harmonic_design(np.arange(self.n_obs_), self.periods, self.harmonics, self.t_scale_, self.trend)
+        G = X.T @ X + self.ridge * self.n_obs_ * np.eye(X.shape[1])
+        coef = np.empty((n_series, X.shape[1]))
+        sigma = np.empty(n_series)
+        XX = None
+        # Blocs de séries convertis en float64 : mémoire bornée quel que soit le lot
+        for i in range(0, n_series, self.block):
+            Yb = np.asarray(Y[i:i + self.block], dtype=float)
+            gaps = np.isnan(Yb).any(axis=1)
+            B = np.linalg.solve(G, X.T @ np.where(gaps[:, None], 0.0, Yb).T).T
+            if gaps.any():
+                if XX is None:
+                    XX = (X[:, :, None] * X[:, None, :]).reshape(self.n_obs_, -1)  # x_t x_t' par pas
+                B[gaps] = self._masked_solve(X, XX, Yb[gaps])
+            resid = Yb - B @ X.T
+            coef[i:i + self.block] = B
+            sigma[i:i + self.block] = np.sqrt(np.nanmean(resid * resid, axis=1))
+        self.coef_, self.sigma_ = coef, sigma
+        return self
+
+    def _masked_solve(self, X, XX, Yg, chunk: int = 8192):
+        # (X'WX + λI) B = X'WY pour chaque série, W = masque des points valides ; X'WX de toutes
+        # les séries par un produit (séries × pas) @ (pas × p²), par tranches de pas (mémoire bornée)
+        p = X.shape[1]
+        W = ~np.isnan(Yg)
+        G = np.zeros((len(Yg), p * p))
+        for a in range(0, self.n_obs_, chunk):
+            G += W[:, a:a + chunk].astype(float) @ XX[a:a + chunk]
+        G = G.reshape(-1, p, p) + self.ridge * np.maximum(W.sum(axis=1), 1)[:, None, None] * np.eye(p)
+        return np.linalg.solve(G, (np.where(W, Yg, 0.0) @ X)[..., None])[..., 0]
+
+    def forecast(self, steps: int, return_std: bool = False):
+        t = np.arange(self.n_obs_, self.n_obs_ + int(steps))
+        yhat = self.coef_ @ harmonic_design(t, self.periods, self.harmonics, self.t_scale_, self.trend).T
+        std = np.repeat(self.sigma_[:, None], int(steps), axis=1)
+        if self.univariate_:
+            yhat, std = yhat[0], std[0]
+        return (yhat, std) if return_std else yhat
+
+    def save(self, path):
+        # Artefact .ifa (voir artifacts.py) : coefficients et écarts-types relus par memmap
+        meta = {"kind": "harmonic", "periods": self.periods, "harmonics": self.harmonics, "trend": self.trend,
+                "ridge": self.ridge, "n_obs": self.n_obs_, "t_scale": self.t_scale_,
+                "univariate": self.univariate_}
+        return save_artifact(path, {"coef": self.coef_, "sigma": self.sigma_}, meta)
+
+    @staticmethod
+    def load(path):
+        meta, arrays = load_artifact(path)
+        if meta.get("kind") != "harmonic":
+            raise ValueError(f"{path} : artefact {meta.get('kind')}, harmonique attendu")
+        model = HarmonicForecaster(meta["periods"], meta["harmonics"], meta["trend"], meta["ridge"])
+        model.coef_, model.sigma_ = arrays["coef"], arrays["sigma"]
+        model.n_obs_, model.t_scale_, model.univariate_ = meta["n_obs"], meta["t_scale"], meta["univariate"]
+        return model
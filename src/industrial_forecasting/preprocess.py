@@ -0,0 +1,103 @@
+import hashlib, io, os, shutil
+import pandas as pd
+from industrial_forecasting.utils.config import load_config, get_dtype
+from industrial_forecasting.store import read_meta, append_store, tail_store, to_ns
+
+def clean_series(s: pd.Series, freq: str = None, anchor: pd.Series = None) -> pd.Series:
+    """Régularise la série (ou les canaux d'un tableau) et comble les trous intérieurs par interpolation.
+
+    ``anchor`` contient les derniers points déjà stockés : il aligne la grille et sert
+    de borne gauche à l'interpolation des nouveaux points, puis est retiré du résultat.
+    Les trous en bord ne sont pas extrapolés : la série est tronquée à sa dernière valeur
+    connue, et le trou final sera comblé au passage qui apportera la valeur suivante.
+    """
+    s = s[~s.index.duplicated(keep="last")].sort_index()
+    if anchor is not None and len(anchor):
+        s = pd.concat([anchor.astype(s.dtypes), s])
+    if freq:
+        s = s.asfreq(freq)
+    s = s.interpolate(limit_area="inside")
+    if not s.notna().to_numpy().any():
+        return s.iloc[:0]
+    s = s.loc[s.first_valid_index():s.last_valid_index()]
+    if anchor is not None and len(anchor):
+        s = s[s.index > anchor.index[-1]]
+    return s
+
+def raw_fingerprint(path: str, size: int, block: int = 65536) -> dict:
+    # Identité du CSV brut : inode + empreinte du début déjà consommé (inchangés par un simple ajout)
+    with open(path, "rb") as f:
+        head = f.read(min(size, block))
+    return {"inode": os.stat(path).st_ino, "head": hashlib.sha1(head).hexdigest()}
+
+def read_raw_increment(path: str, offset: int = 0, header: bytes = b""):
+    # Ne lit que les octets ajoutés au CSV brut depuis le dernier passage (lignes complètes)
+    with open(path, "rb") as f:
+        if offset == 0:
+            header = f.readline()
+            offset = len(header)
+        f.seek(offset)
+        chunk = f.read()
+    end = chunk.rfind(b"\n") + 1
+    return header + chunk[:end], offset + end, header
+
+def read_raw_since(path: str, cursor: dict = None):
+    """Lignes du CSV brut ajoutées depuis ``cursor`` (en-tête compris), nouveau curseur, relu depuis le début ?
+
+    Le curseur (offset, en-tête, empreinte) ne vaut que pour le même fichier, simplement
+    complété : un fichier réécrit ou remplacé (rotation) est relu depuis le début.
+    """
+    cursor = cursor or {}
+    offset = int(cursor.get("raw_offset", 0))
+    valid = offset > 0 and cursor.get("raw_path") == path and os.path.getsize(path) >= offset \
+        and cursor.get("raw_fingerprint") == raw_fingerprint(path, offset)
+    offset, header = (offset, cursor.get("raw_header", "").encode("utf-8")) if valid else (0, b"")
+    content, offset, header = read_raw_increment(path, offset, header)
+    cursor = {"raw_path": path, "raw_offset": offset, "raw_header": header.decode("utf-8"),
+              "raw_fingerprint": raw_fingerprint(path, offset)}
+    return content, cursor, not valid
+
+def update_store(cfg, rebuild: bool = False, export_csv: bool = True) -> int:
+    store_dir = cfg.data.store_path
+    raw_path = cfg.data.raw_path
+    freq = getattr(cfg.data, "freq", None)
+    freq = freq.lower() if freq else None
+    dtype = get_dtype(cfg)
+    processed_path = getattr(cfg.data, "processed_path", None)
+
+    meta = {} if rebuild else read_meta(store_dir) or {}
+    content, cursor, restarted = read_raw_since(raw_path, meta)
+    if restarted and meta:
+        # CSV brut réécrit ou remplacé : le store est reconstruit depuis le début
+        print(f"{raw_path} a été réécrit ou remplacé : reconstruction du store")
+        rebuild = True
+    if rebuild and os.path.exists(store_dir):
+        shutil.rmtree(store_dir)
+        meta = {}
+
+    df = pd.read_csv(io.BytesIO(content), parse_dates=[cfg.data.datetime_col],
+                     dtype={cfg.data.value_col: dtype})
+    s = df.set_index(cfg.data.datetime_col)[cfg.data.value_col].astype(dtype, copy=False)
+    if meta.get("watermark") is not None:
+        # Les points arrivés en retard (antérieurs au high-watermark) sont ignorés
+        s = s[to_ns(s.index) > meta["watermark"]]
+
+    anchor = tail_store(store_dir, 1) if meta.get("count") else None
+    cleaned = clean_series(s, freq, anchor)
+    append_store(store_dir, cleaned.rename("value"), freq=freq, **cursor)
+
+    if export_csv and processed_path and len(cleaned):
+        # Le CSV nettoyé est lui aussi complété en fin de fichier, jamais réécrit
+        os.makedirs(os.path.dirname(processed_path) or ".", exist_ok=True)
+        new_file = rebuild or not os.path.exists(processed_path)
+        cleaned.rename(cfg.data.value_col).rename_axis(cfg.data.datetime_col).to_csv(
+            processed_path, mode="w" if new_file else "a", header=new_file)
+    return len(cleaned)
+
+def main(cfg_path, rebuild=False, export_csv=True):
+    cfg = load_config(cfg_path)
+    n_new = update_store(cfg, rebuild=rebuild, export_csv=export_csv)
+    meta = read_meta(cfg.data.store_path)
+    watermark = pd.Timestamp(meta["watermark"]) if meta.get("watermark") is not None else None
+    print(f"{n_new} nouveaux points nettoyés | total : {meta['count']} | high-watermark : {watermark}")
+    print(f"Série nettoyée sauvegardée dans {cfg.data.store_path}")
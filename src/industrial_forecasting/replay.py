@@ -0,0 +1,264 @@
+"""Rejeu de flux capteurs (NAB, SKAB ou synthétiques) pour mesurer le débit soutenu.
+
+Les points de toutes les séries sont émis selon leurs horodatages d'origine, accélérés
+d'un facteur ``speedup``, dans ``concurrency`` files (une par worker, chaque flux toujours
+dans la même : ses micro-lots sont traités dans l'ordre d'arrivée) consommées par des workers
+qui appellent le point d'entrée testé (détection d'anomalies ou prévision). On mesure le
+débit soutenu, le délai d'attente en file et la latence bout-en-bout (p50 / p99).
+"""
+import glob, os, queue, threading, time
+import numpy as np
+import pandas as pd
+from industrial_forecasting.utils.config import load_config, get_dtype
+from industrial_forecasting.utils.resources import setup_resources
+from industrial_forecasting.data import load_series, load_frame
+from industrial_forecasting.anomaly import fit_detector, score_detector, anomaly_params
+from industrial_forecasting.artifacts import LeanSARIMA, artifact_path
+from industrial_forecasting.kalman_batch import BatchSARIMA
+from industrial_forecasting.sarima import sarimax_results
+from industrial_forecasting.resolution import aggregate, artifact_plan, disaggregate, freq_delta, intra_profile
+
+def load_streams(paths, ts_col="timestamp", value_col="value", dtype=float) -> dict:
+    streams = {}
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        try:
+            s = load_series(path, ts_col, value_col, dtype=dtype)
+        except (KeyError, ValueError):
+            # Fichiers SKAB (séparateur ';', plusieurs canaux) : premier canal capteur
+            frame = load_frame(path, ts_col, dtype=dtype)
+            s = frame.iloc[:, 0]
+        streams[name] = s.dropna()
+    return streams
+
+def synthetic_streams(n_streams=10, n_points=10_000, freq="min", seed=42) -> dict:
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=n_points, freq=freq)
+    t = np.arange(n_points)
+    streams = {}
+    for i in range(n_streams):
+        period = rng.integers(60, 1440)
+        y = 10 + 2 * np.sin(2 * np.pi * t / period) + rng.normal(scale=0.3, size=n_points)
+        streams[f"synthetic_{i:04d}"] = pd.Series(y, index=index)
+    return streams
+
+def build_schedule(streams: dict, speedup: float = 1.0, max_points: int = None):
+    """Fusionne les flux en un calendrier d'émission unique trié (vectorisé).
+
+    ``speedup <= 0`` émet tout le plus vite possible (mesure du débit maximal).
+    """
+    names = list(streams)
+    starts = min(s.index[0] for s in streams.values())
+    offsets, stream_ids, values = [], [], []
+    for sid, name in enumerate(names):
+        s = streams[name]
+        offsets.append((s.index - starts).total_seconds().to_numpy())
+        stream_ids.append(np.full(len(s), sid, dtype=np.int32))
+        values.append(s.to_numpy())
+    offsets = np.concatenate(offsets)
+    order = np.argsort(offsets, kind="stable")[:max_points]
+    emit = offsets[order] / speedup if speedup > 0 else np.zeros(len(order))
+    return names, emit, np.concatenate(stream_ids)[order], np.concatenate(values)[order]
+
+class AnomalyHandler:
+    # Détecteur ajusté par flux sur les ``warmup`` premiers points, puis scoring des micro-lots
+    def __init__(self, cfg, streams, method=None, warmup=500):
+        method = method or getattr(getattr(cfg, "anomaly", None), "method", "zscore")
+        params = anomaly_params(cfg)
+        self.states = [fit_detector(s.to_numpy()[:warmup], method, **params) for s in streams.values()]
+
+    def process(self, stream_id, values):
+        return score_detector(self.states[stream_id], values)[0]
+
+class ForecastHandler:
+    # Ingestion + inférence du modèle ARIMA sauvegardé : chaque micro-lot reçu est filtré dans
+    # l'état du flux (sans ré-estimation), puis ``horizon`` pas sont prévus depuis cet état.
+    # Modèle ajusté à une résolution plus grossière (multi-résolution) : les points sont
+    # regroupés en buckets, seuls les buckets complets sont filtrés, et la prévision est
+    # ramenée à la résolution de sortie (``horizon`` pas de sortie)
+    def __init__(self, cfg, streams, horizon=24):
+        lean_path = artifact_path(cfg.output.model_path)
+        if os.path.exists(lean_path):
+            # Artefact compact : un filtre de Kalman (lot d'une série) par flux, sans statsmodels
+            lean = LeanSARIMA.load(lean_path)
+            self.states = [BatchSARIMA.from_lean([lean]) for _ in streams]
+            self.plan = artifact_plan(lean.meta, cfg)
+        else:
+            from industrial_forecasting.models.arima import ARIMAForecaster
+            results = sarimax_results(ARIMAForecaster.load(cfg.output.model_path))
+            self.states = [results for _ in streams]
+            self.plan = None
+        # Un flux est servi par un seul worker (``replay``) ; le verrou protège les appels directs
+        self.locks = [threading.Lock() for _ in streams]
+        self.horizon = horizon
+        if self.plan:
+            plan = self.plan
+            out = freq_delta(plan["output_freq"])
+            self.steps = -(-horizon * out // freq_delta(plan["freq"])) + 1  # bucket en cours compris
+            # Horodatages des flux (les workers ne reçoivent que les valeurs, dans l'ordre) et profil
+            # intra-bucket de chaque flux à la résolution de sortie, estimé une fois
+            self.index = [s.index for s in streams.values()]
+            self.pos = [0] * len(streams)
+            self.pending = [s.iloc[:0].astype(float) for s in streams.values()]
+            self.profiles = [intra_profile(s if plan["output_freq"] == plan["base_freq"]
+                                           else aggregate(s, plan["output_freq"])["mean"], plan["freq"])
+                             if plan["disaggregate"] and freq_delta(plan["freq"]) > out else None
+                             for s in streams.values()]
+
+    def _buckets(self, stream_id, values):
+        # Moyennes des buckets complets (un point du bucket suivant est arrivé) ; le dernier reste en attente
+        i = self.pos[stream_id]
+        self.pos[stream_id] = i + len(values)
+        s = pd.concat([self.pending[stream_id], pd.Series(values, index=self.index[stream_id][i:i + len(values)])])
+        means = aggregate(s, self.plan["freq"])["mean"]
+        self.pending[stream_id] = s[s.index >= means.index[-1]]
+        return means.iloc[:-1]
+
+    def _output(self, stream_id, yhat):
+        # Prévision au pas du modèle (depuis le bucket en cours) → ``horizon`` pas de sortie
+        # postérieurs au dernier point reçu
+        plan = self.plan
+        start = self.pending[stream_id].index[0].floor(plan["freq"]) if len(self.pending[stream_id]) else None
+        if start is None:
+            return yhat
+        coarse = pd.Series(yhat, index=pd.date_range(start, periods=len(yhat), freq=plan["freq"]))
+        if freq_delta(plan["freq"]) < freq_delta(plan["output_freq"]):
+            out = aggregate(coarse, plan["output_freq"])["mean"]
+        elif self.profiles[stream_id] is not None:
+            out = disaggregate(coarse, plan["freq"], plan["output_freq"], self.profiles[stream_id])
+        else:
+            out = coarse
+        last = self.index[stream_id][self.pos[stream_id] - 1]
+        return out[out.index > last].to_numpy()[:self.horizon]
+
+    def process(self, stream_id, values):
+        values = np.asarray(values, dtype=float)
+        with self.locks[stream_id]:
+            state = self.states[stream_id]
+            steps = self.horizon
+            if self.plan:
+                values, steps = self._buckets(stream_id, values).to_numpy(), self.steps
+            if isinstance(state, BatchSARIMA):
+                if len(values):
+                    state.filter(values[None, :])
+                yhat = state.forecast(steps)[0]
+            else:
+                # Pickle statsmodels : extend() filtre les nouveaux points depuis l'état final
+                if len(values):
+                    self.states[stream_id] = state = state.extend(values)
+                yhat = state.forecast(steps)
+            return self._output(stream_id, yhat) if self.plan else yhat
+
+HANDLERS = {"anomaly": AnomalyHandler, "forecast": ForecastHandler}
+
+def _worker(q, handler, batch_size, records, lock):
+    local = []
+    while True:
+        item = q.get()
+        if item is None:
+            break
+        batch = [item]
+        # Micro-lot : tout ce qui est déjà en file (dans la limite de batch_size)
+        while len(batch) < batch_size:
+            try:
+                item = q.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                q.put(None)
+                break
+            batch.append(item)
+        dequeued = time.perf_counter()
+        by_stream = {}
+        for sid, value, scheduled in batch:
+            by_stream.setdefault(sid, []).append(value)
+        for sid, vals in by_stream.items():
+            handler.process(sid, np.asarray(vals))
+        done = time.perf_counter()
+        local.extend((scheduled, dequeued, done) for _, _, scheduled in batch)
+    with lock:
+        records.extend(local)
+
+def replay(streams, handler, speedup=1.0, concurrency=4, batch_size=64, max_points=None, duration=None):
+    names, emit, stream_ids, values = build_schedule(streams, speedup, max_points)
+    if duration is not None:
+        keep = emit <= duration
+        emit, stream_ids, values = emit[keep], stream_ids[keep], values[keep]
+    # Une file par worker, flux affecté par stream_id % concurrency : l'ordre des micro-lots
+    # d'un même flux est conservé (l'état filtré et la position dans le flux en dépendent)
+    queues = [queue.Queue() for _ in range(concurrency)]
+    records, lock = [], threading.Lock()
+    workers = [threading.Thread(target=_worker, args=(q, handler, batch_size, records, lock), daemon=True)
+               for q in queues]
+    for w in workers:
+        w.start()
+
+    t0 = time.perf_counter()
+    i, n, max_depth = 0, len(emit), 0
+    while i < n:
+        now = time.perf_counter() - t0
+        # Tous les points dont l'instant d'émission est passé partent d'un coup
+        j = int(np.searchsorted(emit, now, side="right"))
+        if j > i:
+            for k in range(i, j):
+                sid = int(stream_ids[k])
+                queues[sid % concurrency].put((sid, values[k], t0 + emit[k]))
+            i = j
+            max_depth = max(max_depth, sum(q.qsize() for q in queues))
+        else:
+            time.sleep(min(emit[i] - now, 0.01))
+    for q in queues:
+        q.put(None)
+    for w in workers:
+        w.join()
+    return summarize(np.asarray(records), t0, n_streams=len(names), max_depth=max_depth)
+
+def summarize(records, t0, n_streams, max_depth=0) -> dict:
+    if len(records) == 0:
+        return {"points": 0}
+    scheduled, dequeued, done = records[:, 0], records[:, 1], records[:, 2]
+    latency = (done - scheduled) * 1e3
+    wait = (dequeued - scheduled) * 1e3
+    elapsed = done.max() - t0
+    offered = (scheduled.max() - t0)
+    return {
+        "streams": n_streams,
+        "points": len(records),
+        "elapsed_s": elapsed,
+        "offered_pts_per_s": len(records) / offered if offered > 0 else float("inf"),
+        "throughput_pts_per_s": len(records) / elapsed if elapsed > 0 else float("inf"),
+        "queue_wait_ms_p50": float(np.percentile(wait, 50)),
+        "queue_wait_ms_p99": float(np.percentile(wait, 99)),
+        "latency_ms_p50": float(np.percentile(latency, 50)),
+        "latency_ms_p99": float(np.percentile(latency, 99)),
+        "latency_ms_max": float(latency.max()),
+        "max_queue_depth": int(max_depth),
+    }
+
+def main(cfg_path, files=None, synthetic=0, target="anomaly", speedup=1.0, concurrency=4,
+         batch_size=64, max_points=None, duration=None, out_path=None):
+    cfg = load_config(cfg_path)
+    # Les workers sont des threads du même processus : BLAS limité à cœurs / concurrency
+    setup_resources(cfg, n_workers=concurrency)
+    if synthetic:
+        streams = synthetic_streams(n_streams=synthetic)
+    else:
+        paths = sorted(p for pattern in files for p in glob.glob(pattern))
+        streams = load_streams(paths, cfg.data.datetime_col, cfg.data.value_col, dtype=get_dtype(cfg))
+    print(f"{len(streams)} flux | {sum(len(s) for s in streams.values())} points | cible : {target}")
+
+    handler = HANDLERS[target](cfg, streams)
+    report = replay(streams, handler, speedup=speedup, concurrency=concurrency, batch_size=batch_size,
+                    max_points=max_points, duration=duration)
+
+    print("\n" + "="*50)
+    print(" REJEU — DÉBIT ET LATENCE")
+    print("="*50)
+    for key, value in report.items():
+        print(f"  {key:22} : {value:,.3f}" if isinstance(value, float) else f"  {key:22} : {value}")
+    if out_path:
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        pd.DataFrame([{"target": target, "speedup": speedup, "concurrency": concurrency, **report}]).to_csv(
+            out_path, mode="a", header=not os.path.exists(out_path), index=False)
+        print(f"Rapport ajouté → {out_path}")
+    return report
@@ -0,0 +1,199 @@
+"""Entraînement multi-résolution : ajuster à la résolution la plus grossière qui suffit.
+
+Un capteur échantillonné à la minute n'a pas besoin d'être modélisé à la minute si l'on
+prévoit 48 h à résolution horaire : ajuster sur des agrégats divise le temps d'ajustement
+et la mémoire par le facteur d'agrégation (60 entre 1 min et 1 h).
+
+- ``build_pyramid`` : agrégats (moyenne, min, max, nombre de points) à chaque niveau, chaque
+  niveau étant calculé depuis le précédent (coût total ~ une passe sur la série) ;
+- ``choose_resolution`` : niveau le plus grossier qui garde au moins ``min_steps`` pas sur
+  l'horizon et dont l'erreur de reconstruction à la résolution de sortie reste sous
+  ``max_error`` (RMSE relative à l'écart-type, mesurée sur la fin de l'historique avec un
+  profil intra-bucket estimé sur le début, hors bruit blanc : aucun modèle ne le prévoit) ;
+- ``disaggregate`` : ramène une prévision grossière à la résolution de sortie en ajoutant
+  le profil moyen intra-bucket (forme journalière...), centré pour conserver les moyennes.
+"""
+import numpy as np
+import pandas as pd
+
+LEVELS = ("1min", "5min", "15min", "1h", "6h", "1D")
+DAY = pd.Timedelta("1D")
+
+def freq_delta(freq) -> pd.Timedelta:
+    return pd.Timedelta(pd.tseries.frequencies.to_offset(freq).nanos)
+
+def _resample(obj, freq: str):
+    # Buckets alignés sur l'epoch (mêmes bornes que Timestamp.floor) ; le jour l'est déjà sur minuit
+    return obj.resample(freq, origin="epoch") if freq_delta(freq) < DAY else obj.resample(freq)
+
+def aggregate(s: pd.Series, freq: str) -> pd.DataFrame:
+    r = _resample(s, freq)
+    return pd.DataFrame({"mean": r.mean(), "min": r.min(), "max": r.max(), "count": r.count()})
+
+def build_pyramid(s: pd.Series, base_freq: str, levels=LEVELS) -> dict:
+    """{fréquence: DataFrame(mean, min, max, count)} du plus fin au plus grossier."""
+    base = freq_delta(base_freq)
+    pyramid, prev = {}, None
+    for freq in sorted((f for f in levels if freq_delta(f) >= base), key=freq_delta):
+        if prev is None or freq_delta(freq) % freq_delta(prev[0]):
+            level = aggregate(s, freq)
+        else:
+            # Depuis le niveau précédent : moyenne pondérée par les comptes, min des min, max des max
+            p = prev[1]
+            r = _resample(p.assign(total=p["mean"] * p["count"]), freq)
+            agg = r.agg({"total": "sum", "min": "min", "max": "max", "count": "sum"})
+            level = pd.DataFrame({"mean": agg["total"] / agg["count"].where(agg["count"] > 0),
+                                  "min": agg["min"], "max": agg["max"], "count": agg["count"]})
+        pyramid[freq] = level
+        prev = (freq, level)
+    return pyramid
+
+def _profile_key(index: pd.DatetimeIndex, bucket: str) -> np.ndarray:
+    # Position dans la journée (buckets <= 1 jour) ou dans le bucket : clé du profil intra-bucket,
+    # toujours en ns (l'historique et la grille désagrégée n'ont pas forcément la même unité)
+    if freq_delta(bucket) <= DAY:
+        return (index - index.normalize()).as_unit("ns").asi8
+    return (index - index.floor(bucket)).as_unit("ns").asi8
+
+def intra_profile(fine: pd.Series, bucket: str) -> pd.Series:
+    """Écart moyen à la moyenne du bucket, par position (clé ns) ; ``fine`` à la résolution de sortie."""
+    fine = fine.dropna()
+    means = fine.groupby(fine.index.floor(bucket)).transform("mean")
+    return (fine - means).groupby(_profile_key(fine.index, bucket)).mean()
+
+def disaggregate(coarse: pd.Series, bucket: str, out_freq: str, profile: pd.Series = None) -> pd.Series:
+    """Série à ``out_freq`` : valeur du bucket + profil intra-bucket (centré par bucket)."""
+    if len(coarse) == 0:
+        return pd.Series(dtype=float)
+    end = coarse.index[-1] + freq_delta(bucket) - freq_delta(out_freq)
+    index = pd.date_range(coarse.index[0], end, freq=out_freq)
+    buckets = index.floor(bucket)
+    values = pd.Series(coarse.reindex(buckets).to_numpy(), index=index)
+    if profile is None or len(profile) == 0:
+        return values
+    dev = pd.Series(profile.reindex(_profile_key(index, bucket)).fillna(0.0).to_numpy(), index=index)
+    dev -= dev.groupby(buckets).transform("mean")
+    return values + dev
+
+def noise_floor(fine: pd.Series) -> float:
+    """Variance du bruit blanc de ``fine`` (grille régulière) : Var(Δ²y) / 6.
+
+    Les différences secondes annulent presque tout signal lisse à l'échelle du pas (cycle,
+    tendance) et multiplient la variance d'un bruit blanc par 6.
+    """
+    d2 = fine.diff().diff().dropna()
+    return float(d2.var() / 6.0) if len(d2) > 1 else 0.0
+
+def reconstruction_error(fine: pd.Series, bucket: str, out_freq: str, holdout: float = 0.2) -> float:
+    """RMSE / écart-type de la reconstruction (agrégat + profil) sur la fin de ``fine``, au-delà du bruit.
+
+    Le bruit blanc intra-bucket n'est ni reconstructible ni prévisible à ``out_freq`` : sa
+    variance (``noise_floor``) est retranchée de l'erreur quadratique avant comparaison.
+    """
+    values = fine.dropna()
+    if len(values) < 4:
+        return np.inf
+    split = values.index[int(len(values) * (1 - holdout))].floor(bucket)
+    head, tail = values[values.index < split], values[values.index >= split]
+    if len(tail) < 2 or tail.std() == 0:
+        return 0.0 if len(tail) else np.inf
+    coarse = tail.groupby(tail.index.floor(bucket)).mean()
+    recon = disaggregate(coarse, bucket, out_freq, intra_profile(head, bucket) if len(head) else None)
+    err = recon.reindex(tail.index) - tail
+    excess = max(float(np.nanmean(err * err)) - noise_floor(fine[fine.index >= split]), 0.0)
+    return float(np.sqrt(excess) / tail.std())
+
+def choose_resolution(s: pd.Series, base_freq: str, horizon: str, out_freq: str = None, levels=LEVELS,
+                      min_steps: int = 12, max_error: float = 0.05, allow_disaggregation: bool = True):
+    """Renvoie (fréquence retenue, pyramide, rapport par niveau)."""
+    pyramid = build_pyramid(s, base_freq, levels)
+    out_freq = out_freq or base_freq
+    out = freq_delta(out_freq)
+    # Série de référence à la résolution de sortie (la plus fine des deux)
+    reference = pyramid[out_freq]["mean"] if out_freq in pyramid else aggregate(s, out_freq)["mean"]
+    rows = []
+    for freq in pyramid:
+        delta = freq_delta(freq)
+        steps = freq_delta(horizon) / delta
+        if delta <= out:
+            err = 0.0  # agréger ensuite la prévision ne perd rien
+        elif allow_disaggregation and not (delta % out):
+            err = reconstruction_error(reference, freq, out_freq)
+        else:
+            err = np.inf
+        rows.append({"freq": freq, "points": int(pyramid[freq]["count"].gt(0).sum()), "horizon_steps": steps,
+                     "error": err, "ok": steps >= min_steps and err <= max_error})
+    report = pd.DataFrame(rows)
+    ok = report[report["ok"]]
+    chosen = ok["freq"].iloc[-1] if len(ok) else base_freq
+    return chosen, pyramid, report
+
+def resolution_settings(cfg) -> dict:
+    rcfg = getattr(cfg, "resolution", None)
+    return {
+        "enabled": bool(getattr(rcfg, "enabled", False)),
+        "levels": list(getattr(rcfg, "levels", None) or LEVELS),
+        "horizon": getattr(rcfg, "horizon", "24h"),
+        "output_freq": getattr(rcfg, "output_freq", None),
+        "min_steps": int(getattr(rcfg, "min_steps", 12)),
+        "max_error": float(getattr(rcfg, "max_error", 0.05)),
+        "disaggregate": bool(getattr(rcfg, "disaggregate", True)),
+    }
+
+def plan_resolution(s: pd.Series, base_freq: str, cfg, train_ratio: float = 1.0):
+    """Série (moyennes) à la résolution choisie sur la partie entraînement ; None si désactivé."""
+    settings = resolution_settings(cfg)
+    if not settings["enabled"] or not base_freq:
+        return None
+    history = s.iloc[:max(int(len(s) * train_ratio), 1)]
+    freq, _, report = choose_resolution(history, base_freq, settings["horizon"], settings["output_freq"],
+                                        settings["levels"], settings["min_steps"], settings["max_error"],
+                                        settings["disaggregate"])
+    series = s if freq == base_freq else aggregate(s, freq)["mean"].rename(s.name)
+    print(" Résolutions candidates :")
+    print(report.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    print(f" Résolution d'entraînement : {freq} ({len(series)} points au lieu de {len(s)}, "
+          f"÷{len(s) / max(len(series), 1):.0f} en mémoire)")
+    return {"freq": freq, "base_freq": base_freq, "series": series, "report": report,
+            "output_freq": settings["output_freq"] or base_freq, "disaggregate": settings["disaggregate"]}
+
+def to_output(yhat: pd.Series, plan: dict, fine: pd.Series):
+    """(réel, prévision) à la résolution de sortie pour une prévision ``yhat`` à la résolution retenue.
+
+    Le profil intra-bucket est estimé sur ``fine`` avant le premier pas prévu. Sans
+    désagrégation, la comparaison se fait à la résolution retenue.
+    """
+    freq, out_freq = plan["freq"], plan["output_freq"]
+    end = yhat.index[-1] + freq_delta(freq)
+    past, future = fine[fine.index < yhat.index[0]], fine[(fine.index >= yhat.index[0]) & (fine.index < end)]
+    coarse, out = freq_delta(freq), freq_delta(out_freq)
+    if coarse > out and not plan["disaggregate"]:
+        return aggregate(future, freq)["mean"], yhat
+    y_true = future if out_freq == plan["base_freq"] else aggregate(future, out_freq)["mean"]
+    if coarse < out:
+        y_pred = _resample(yhat, out_freq).mean()
+    elif coarse > out:
+        past = past if out_freq == plan["base_freq"] else aggregate(past, out_freq)["mean"]
+        y_pred = disaggregate(yhat, freq, out_freq, intra_profile(past, freq))
+    else:
+        y_pred = yhat
+    return y_true, y_pred.reindex(y_true.index)
+
+def artifact_plan(meta: dict, cfg):
+    """Plan de sortie d'un modèle sauvegardé à ``meta["freq"]`` (artefact ``.ifa``) ; None s'il l'a été à data.freq."""
+    freq = meta.get("freq")
+    base = meta.get("base_freq") or (cfg.data.freq.lower() if getattr(cfg.data, "freq", None) else None)
+    if not freq or not base or freq_delta(freq) == freq_delta(base):
+        return None
+    settings = resolution_settings(cfg)
+    return {"freq": freq, "base_freq": base,
+            "output_freq": meta.get("output_freq") or settings["output_freq"] or base,
+            "disaggregate": bool(meta.get("disaggregate", settings["disaggregate"]))}
+
+def rescale_period(period: int, base_freq: str, freq: str):
+    # Période saisonnière exprimée en pas de base → en pas de la résolution choisie (None si non entière)
+    if not period:
+        return period
+    ratio = freq_delta(freq) / freq_delta(base_freq)
+    scaled = period / ratio
+    return int(round(scaled)) if abs(scaled - round(scaled)) < 1e-9 and scaled >= 2 else None
@@ -0,0 +1,90 @@
+"""Ré-estimation SARIMA à chaud : l'optimiseur part des paramètres du dernier ajustement."""
+import json, os, time
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+def sarimax_results(model):
+    # Résultat statsmodels porté par un ARIMAForecaster (attribut ``model_``) ou passé directement
+    if hasattr(model, "params") and hasattr(model, "filter_results"):
+        return model
+    results = getattr(model, "model_", None)
+    if results is None:
+        raise TypeError(f"{type(model).__name__} non ajusté (aucun résultat SARIMAX dans model_)")
+    return results
+
+def as_forecaster(results, order, seasonal_order):
+    """ARIMAForecaster portant un résultat déjà estimé : même type que l'entraînement standard."""
+    from industrial_forecasting.models.arima import ARIMAForecaster
+    model = ARIMAForecaster(order=order, seasonal_order=seasonal_order)
+    model.model_ = results
+    return model
+
+def params_path(model_path: str) -> str:
+    return os.path.splitext(model_path)[0] + "_params.json"
+
+def fit_info(results, fit_time_s: float, warm: bool) -> dict:
+    retvals = getattr(results, "mle_retvals", None) or {}
+    return {
+        "fit_time_s": round(fit_time_s, 4),
+        "iterations": retvals.get("iterations"),
+        "fcalls": retvals.get("fcalls"),
+        "converged": retvals.get("converged"),
+        "warm_start": warm,
+        "fit_nobs": int(results.nobs),
+        "nobs": int(results.nobs),
+        "llf": float(results.llf),
+    }
+
+def save_params(path: str, results, order, seasonal_order, **info):
+    payload = {
+        "order": list(order),
+        "seasonal_order": list(seasonal_order),
+        "param_names": list(results.model.param_names),
+        "params": np.asarray(results.params, dtype=float).tolist(),
+        **info,
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+
+def load_params(path: str, order=None, seasonal_order=None):
+    # Paramètres sauvegardés, ou None si absents / d'un autre ordre
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        payload = json.load(f)
+    if order is not None and (payload["order"] != list(order) or payload["seasonal_order"] != list(seasonal_order)):
+        return None
+    return payload
+
+def reestimate_sarima(y, order, seasonal_order, start_params=None, window=None, maxiter=50, tol=1e-5,
+                      method="lbfgs"):
+    """Ré-estime un SARIMA en partant de ``start_params`` (ajustement à chaud).
+
+    ``window`` restreint l'estimation aux dernières observations ; les paramètres obtenus
+    sont ensuite appliqués (simple filtrage, sans optimisation) à tout l'historique pour que
+    l'état final serve aux prévisions. Renvoie ``(résultats, infos d'ajustement)``.
+    """
+    y = np.asarray(y, dtype=float)
+    y_fit = y[-int(window):] if window else y
+    model = SARIMAX(y_fit, order=tuple(order), seasonal_order=tuple(seasonal_order))
+    if start_params is not None and len(start_params) != model.k_params:
+        start_params = None
+    tol_key = {"lbfgs": "pgtol", "bfgs": "gtol", "newton": "tol"}.get(method)
+    fit_kwargs = {tol_key: tol} if tol_key else {}
+
+    t0 = time.perf_counter()
+    results = model.fit(start_params=start_params, method=method, maxiter=int(maxiter), disp=False, **fit_kwargs)
+    info = fit_info(results, time.perf_counter() - t0, warm=start_params is not None)
+    if window and len(y_fit) < len(y):
+        results = SARIMAX(y, order=tuple(order), seasonal_order=tuple(seasonal_order)).filter(results.params)
+        # Log-vraisemblance sur tout l'historique : comparable à celle d'un ajustement complet
+        info.update(nobs=int(results.nobs), llf=float(results.llf))
+    return results, info
+
+def log_fit(model_path: str, info: dict):
+    # Historique des ajustements (temps, itérations) pour comparer à froid / à chaud
+    log_path = os.path.splitext(model_path)[0] + "_fits.csv"
+    row = pd.DataFrame([{"timestamp": pd.Timestamp.now().isoformat(timespec="seconds"), **info}])
+    row.to_csv(log_path, mode="a", header=not os.path.exists(log_path), index=False)
+    return log_path
@@ -0,0 +1,200 @@
+"""Détection rapide des périodes saisonnières (autocorrélation par FFT, vectorisée sur N séries).
+
+L'analyse est faite avant tout ajustement : on mesure la force de chaque saisonnalité
+candidate (autocorrélation au décalage de la période, après retrait de la tendance
+linéaire) pour ne pas ajuster de termes saisonniers inexistants dans SARIMA / Prophet.
+"""
+import glob, os
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from industrial_forecasting.utils.config import load_config
+from industrial_forecasting.data import load_series
+
+def _stack(series_list):
+    # Empile des séries de longueurs différentes (bourrage NaN) en matrice (n_séries, n_max)
+    n_max = max(len(s) for s in series_list)
+    Y = np.full((len(series_list), n_max), np.nan)
+    for i, s in enumerate(series_list):
+        Y[i, :len(s)] = np.asarray(s, dtype=float)
+    return Y
+
+def autocorrelation(Y, max_lag=None):
+    """ACF de chaque ligne de ``Y`` (n_séries, n) via FFT, NaN traités comme absents.
+
+    La tendance linéaire est retirée ligne par ligne ; l'ACF est corrigée du nombre de
+    paires disponibles à chaque décalage (estimateur non biaisé).
+    """
+    resid, valid = _detrend(Y)
+    n = resid.shape[1]
+    max_lag = min(max_lag or n - 1, n - 1)
+    nfft = 1 << int(np.ceil(np.log2(2 * n)))
+    acov = np.fft.irfft(np.abs(np.fft.rfft(resid, nfft)) ** 2, nfft)[:, :max_lag + 1]
+    pairs = np.fft.irfft(np.abs(np.fft.rfft(valid.astype(float), nfft)) ** 2, nfft)[:, :max_lag + 1]
+    acov = acov / np.maximum(np.rint(pairs), 1)
+    acf = acov / np.where(acov[:, :1] > 0, acov[:, :1], 1.0)
+    # Décalages sans assez de paires (séries courtes) : non significatifs
+    acf[np.rint(pairs) < 2] = 0.0
+    return acf
+
+def _detrend(Y):
+    # Résidus après retrait de la tendance linéaire de chaque ligne (NaN remplacés par 0)
+    Y = np.atleast_2d(np.asarray(Y, dtype=float))
+    n = Y.shape[1]
+    valid = ~np.isnan(Y)
+    t = np.broadcast_to(np.arange(n, dtype=float), Y.shape)
+    cnt = valid.sum(axis=1, keepdims=True)
+    # Régression linéaire vectorisée (tendance) sur les points valides
+    t_mean = np.where(valid, t, 0).sum(axis=1, keepdims=True) / cnt
+    y_mean = np.where(valid, Y, 0).sum(axis=1, keepdims=True) / cnt
+    tc = np.where(valid, t - t_mean, 0)
+    slope = (tc * np.where(valid, Y - y_mean, 0)).sum(axis=1, keepdims=True) / (tc ** 2).sum(axis=1, keepdims=True)
+    resid = np.where(valid, Y - y_mean - slope * (t - t_mean), 0.0)
+    return resid, valid
+
+def seasonal_strength(Y, periods, widths=None):
+    """Force de chaque saisonnalité candidate, pour toutes les séries à la fois.
+
+    Pour une composante de période P, l'ACF vaut +a au décalage P et -a à P/2, alors
+    que les composantes plus lentes (tendance résiduelle, saisonnalités longues) y ont
+    une valeur proche : la demi-différence isole donc la part de variance propre à P.
+    ``widths`` moyenne l'ACF sur une fenêtre centrée : avec la largeur de la période
+    inférieure (ex. 24 h pour la période hebdomadaire), la sous-période s'annule aussi.
+    """
+    widths = widths or [1] * len(periods)
+    max_lag = int(np.ceil(max(p + w / 2 for p, w in zip(periods, widths)))) + 1
+    acf = autocorrelation(Y, max_lag=max_lag)
+    n_lags = acf.shape[1]
+    csum = np.concatenate([np.zeros((acf.shape[0], 1)), np.cumsum(acf, axis=1)], axis=1)
+
+    def window_mean(center, w, peak=False):
+        if w <= 1:
+            # Tolérance ±1 pas pour les périodes non entières
+            lags = np.clip([int(np.floor(center)), int(np.ceil(center))], 1, n_lags - 1)
+            return acf[:, lags].max(axis=1) if peak else acf[:, lags].mean(axis=1)
+        lo = min(max(int(round(center - w / 2)), 1), n_lags - 1)
+        hi = min(lo + int(round(w)), n_lags)
+        return (csum[:, hi] - csum[:, lo]) / max(hi - lo, 1)
+
+    out = np.zeros((acf.shape[0], len(periods)))
+    for j, (p, w) in enumerate(zip(periods, widths)):
+        out[:, j] = (window_mean(p, w, peak=True) - window_mean(p / 2, w)) / 2
+    # Au moins deux cycles complets sont nécessaires pour parler de saisonnalité
+    lengths = (~np.isnan(np.atleast_2d(np.asarray(Y, dtype=float)))).sum(axis=1)
+    out[lengths[:, None] < 2 * np.asarray(periods)[None, :]] = 0.0
+    return out
+
+def dominant_periods(Y, max_period, min_period=2, top_k=3):
+    """Périodes dominantes de chaque série, lues sur le périodogramme (FFT).
+
+    Renvoie ``(périodes, forces)`` de forme (n_séries, top_k) ; la force est la part de
+    variance portée par le pic (3 raies autour du maximum local).
+    """
+    resid, _ = _detrend(Y)
+    nfft = 1 << int(np.ceil(np.log2(resid.shape[1])))
+    power = np.abs(np.fft.rfft(resid, nfft)) ** 2
+    power[:, 0] = 0.0
+    k = np.arange(power.shape[1], dtype=float)
+    with np.errstate(divide="ignore"):
+        bin_period = np.where(k > 0, nfft / np.maximum(k, 1), np.inf)
+    band = (bin_period >= min_period) & (bin_period <= max_period)
+    # Maximum local sur ±3 raies : écarte les lobes secondaires (fuite spectrale) d'un même pic
+    padded = np.pad(power, ((0, 0), (3, 3)))
+    peaks = (power > 0) & (power >= sliding_window_view(padded, 7, axis=1).max(axis=2))
+    top = np.argsort(-np.where(peaks & band, power, 0.0), axis=1)[:, :top_k]
+
+    # Raie centrale et voisines : fréquence par barycentre, force = part de la puissance totale
+    idx = np.clip(top[..., None] + np.array([-1, 0, 1]), 0, power.shape[1] - 1)
+    p3 = np.take_along_axis(power, idx.reshape(len(power), -1), axis=1).reshape(idx.shape)
+    k_hat = (p3 * idx).sum(axis=2) / np.maximum(p3.sum(axis=2), 1e-300)
+    total = np.maximum(power.sum(axis=1, keepdims=True), 1e-300)
+    strengths = np.where(np.take_along_axis(peaks & band, top, axis=1), p3.sum(axis=2) / total, 0.0)
+    periods = np.where(strengths > 0, np.rint(nfft / np.maximum(k_hat, 1e-9)), 0).astype(int)
+    return periods, strengths
+
+def calendar_periods(freq: str) -> dict:
+    # Périodes journalière / hebdomadaire / annuelle exprimées en pas de temps
+    step = pd.Timedelta(pd.tseries.frequencies.to_offset(freq)).total_seconds()
+    day = 86400.0 / step
+    return {"daily": day, "weekly": 7 * day, "yearly": 365.25 * day}
+
+def nested_widths(periods: dict) -> list:
+    # Largeur de moyenne de chaque période = période calendaire immédiatement inférieure
+    values = list(periods.values())
+    return [1] + [round(prev) for prev in values[:-1]]
+
+def suggest_seasonality(s: pd.Series, freq: str, min_strength: float = 0.05, max_arima_period: int = None) -> dict:
+    """Saisonnalités significatives d'une série, et la période à donner à SARIMA.
+
+    ``max_arima_period`` (en pas, None : sans plafond) écarte les périodes trop longues pour
+    SARIMA (ex. 24 en horaire exclut s=168 : le cycle hebdomadaire reste alors à Prophet /
+    à la régression harmonique). ``arima_period`` vaut None si aucune n'est significative.
+    """
+    periods = {k: p for k, p in calendar_periods(freq).items() if p >= 2}
+    max_arima_period = max_arima_period or np.inf
+    strengths = seasonal_strength(s.values, list(periods.values()), nested_widths(periods))[0] if periods else []
+    detected = {k: float(v) for k, v in zip(periods, strengths)}
+    arima_candidates = {k: v for k, v in detected.items()
+                        if v >= min_strength and periods[k] <= max_arima_period and float(periods[k]).is_integer()}
+    arima_key = max(arima_candidates, key=arima_candidates.get) if arima_candidates else None
+    return {
+        "strengths": detected,
+        "periods": periods,
+        "prophet": {f"{k}_seasonality": detected.get(k, 0.0) >= min_strength for k in ("daily", "weekly", "yearly")},
+        "arima_period": int(periods[arima_key]) if arima_key else None,
+    }
+
+def apply_to_seasonal_order(seasonal_order, arima_period):
+    # Sans saisonnalité significative utilisable par SARIMA, le terme saisonnier est retiré
+    # (ajustement bien plus rapide) ; sinon (P, D, Q) configurés à la période détectée
+    if arima_period is None:
+        print(f" Aucune période saisonnière détectée pour SARIMA : terme saisonnier {list(seasonal_order)} retiré")
+        return [0, 0, 0, 0]
+    P, D, Q = list(seasonal_order)[:3]
+    return [P, D, Q, arima_period]
+
+def infer_freq(index: pd.DatetimeIndex) -> str:
+    # Pas d'échantillonnage propre au fichier (NAB : 5 min, SKAB : 1 s...) : fréquence inférée,
+    # sinon pas médian des horodatages
+    freq = pd.infer_freq(index[:1000]) if len(index) >= 3 else None
+    if freq is None:
+        freq = pd.tseries.frequencies.to_offset(index.to_series().diff().median()).freqstr
+    return freq.lower()
+
+def _load(path, cfg, freq=None):
+    s = load_series(path, cfg.data.datetime_col, cfg.data.value_col)
+    s = s[~s.index.duplicated(keep="last")]
+    freq = freq or infer_freq(s.index)
+    return s.asfreq(freq).interpolate(), freq
+
+def main(cfg_path, files, max_period=None, top_k=3, freq=None):
+    """Rapport des saisonnalités ; chaque fichier est lu à son propre pas (``freq`` : imposé)."""
+    cfg = load_config(cfg_path)
+    season_cfg = getattr(cfg, "seasonality", None)
+    min_strength = getattr(season_cfg, "min_strength", 0.05)
+    paths = sorted(p for pattern in (files or [cfg.data.raw_path]) for p in glob.glob(pattern))
+    by_freq = {}
+    for path in paths:
+        s, f = _load(path, cfg, freq)
+        by_freq.setdefault(f, []).append((path, s))
+
+    rows = []
+    for f, group in by_freq.items():
+        # Un seul passage FFT par pas d'échantillonnage (périodes calendaires exprimées en pas)
+        Y = _stack([s.values for _, s in group])
+        cal = calendar_periods(f)
+        strengths = seasonal_strength(Y, list(cal.values()), nested_widths(cal))
+        periods, dom_strengths = dominant_periods(
+            Y, max_period=max_period or int(min(cal["weekly"] * 2, Y.shape[1] // 2)), top_k=top_k)
+        for i, (path, s) in enumerate(group):
+            row = {"file": os.path.basename(path), "freq": f, "n": len(s)}
+            row.update({k: round(float(v), 3) for k, v in zip(cal, strengths[i])})
+            row.update({f"period_{j + 1}": int(periods[i, j]) for j in range(top_k)})
+            row.update({f"strength_{j + 1}": round(float(dom_strengths[i, j]), 3) for j in range(top_k)})
+            rows.append(row)
+    report = pd.DataFrame(rows)
+    print(report.to_string(index=False))
+    print(f"\nSaisonnalités significatives (force ≥ {min_strength}) :")
+    for k in cal:
+        print(f"  {k:8} : {int((report[k] >= min_strength).sum())}/{len(report)} séries")
+    return report
@@ -0,0 +1,164 @@
+"""Shards memory-mappés de nombreuses séries pour l'entraînement d'un LSTM global.
+
+Un dossier de shards contient :
+- ``shard_XXXXX.bin`` : valeurs déjà normalisées de plusieurs séries, concaténées bout à bout ;
+- ``series.csv``      : une ligne par série (shard, offset, longueur, n_train, loc, scale) ;
+- ``meta.json``       : dtype et taille cible des shards.
+
+La normalisation est propre à chaque série (min/max de sa partie train, comme le
+MinMaxScaler de ``train_lstm.py``) : ``loc`` et ``scale`` permettent de revenir aux unités
+physiques. Une série n'est jamais coupée entre deux shards et aucune fenêtre ne chevauche
+deux séries.
+"""
+import glob, json, os
+import numpy as np
+import pandas as pd
+from industrial_forecasting.data import load_frame
+
+INDEX_FILE = "series.csv"
+META_FILE = "meta.json"
+
+def shard_path(shard_dir: str, shard: int) -> str:
+    return os.path.join(shard_dir, f"shard_{shard:05d}.bin")
+
+def _header_sep(path: str) -> str:
+    # Séparateur lu sur l'en-tête (le sniffer de pandas se trompe sur les horodatages "HH:MM:SS")
+    with open(path, "r") as f:
+        header = f.readline()
+    return ";" if header.count(";") > header.count(",") else ","
+
+def load_fleet(patterns, ts_col="timestamp", dtype=float):
+    """Itère sur (nom, valeurs) pour chaque canal numérique de chaque fichier (NAB, SKAB, historiens).
+
+    Générateur : un seul fichier en mémoire à la fois.
+    """
+    paths = sorted(p for pattern in patterns for p in glob.glob(pattern))
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        try:
+            frame = load_frame(path, ts_col, sep=_header_sep(path), dtype=dtype)
+        except (KeyError, ValueError) as e:
+            print(f" Fichier ignoré ({os.path.basename(path)}) : {e}")
+            continue
+        for col in frame.columns:
+            values = frame[col].interpolate(limit_direction="both").to_numpy()
+            if np.isfinite(values).all():
+                yield (name if frame.shape[1] == 1 else f"{name}:{col}"), values
+
+def series_scaling(values: np.ndarray, n_train: int):
+    # Min/max de la partie train uniquement (pas de fuite vers la partie test)
+    head = values[:max(n_train, 1)]
+    loc, high = float(np.min(head)), float(np.max(head))
+    scale = high - loc
+    return loc, scale if scale > 0 else 1.0
+
+def build_shards(series_iter, shard_dir: str, window: int, train_ratio: float = 0.8,
+                 dtype=np.float32, shard_size: int = 10_000_000) -> pd.DataFrame:
+    """Écrit les séries normalisées dans des shards d'environ ``shard_size`` valeurs."""
+    os.makedirs(shard_dir, exist_ok=True)
+    dtype = np.dtype(dtype)
+    rows, shard, offset = [], 0, 0
+    f = open(shard_path(shard_dir, shard), "wb")
+    try:
+        for name, values in series_iter:
+            if len(values) <= window + 1:
+                continue
+            if offset and offset + len(values) > shard_size:
+                f.close()
+                shard, offset = shard + 1, 0
+                f = open(shard_path(shard_dir, shard), "wb")
+            n_train = int(len(values) * train_ratio)
+            loc, scale = series_scaling(values, n_train)
+            f.write(((np.asarray(values, dtype=float) - loc) / scale).astype(dtype).tobytes())
+            rows.append({"name": name, "shard": shard, "offset": offset, "length": len(values),
+                         "n_train": n_train, "loc": loc, "scale": scale})
+            offset += len(values)
+    finally:
+        f.close()
+    index = pd.DataFrame(rows, columns=["name", "shard", "offset", "length", "n_train", "loc", "scale"])
+    index.to_csv(os.path.join(shard_dir, INDEX_FILE), index=False)
+    meta = {"dtype": dtype.name, "window": int(window), "shard_size": int(shard_size),
+            "n_shards": int(index["shard"].max()) + 1 if len(index) else 0,
+            "n_series": len(index), "n_values": int(index["length"].sum())}
+    with open(os.path.join(shard_dir, META_FILE), "w") as fh:
+        json.dump(meta, fh, indent=2)
+    return index
+
+class ShardSet:
+    """Accès en lecture (memmap) à un dossier de shards."""
+
+    def __init__(self, shard_dir: str):
+        self.shard_dir = shard_dir
+        with open(os.path.join(shard_dir, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.dtype = np.dtype(self.meta["dtype"])
+        self.index = pd.read_csv(os.path.join(shard_dir, INDEX_FILE))
+
+    @staticmethod
+    def exists(shard_dir: str) -> bool:
+        return os.path.exists(os.path.join(shard_dir, META_FILE))
+
+    def shard(self, shard: int) -> np.ndarray:
+        return np.memmap(shard_path(self.shard_dir, shard), dtype=self.dtype, mode="r")
+
+    def series(self, name: str) -> np.ndarray:
+        # Premier enregistrement de ce nom (deux fichiers homonymes : passer par ``row_values``)
+        return self.row_values(self.index.loc[self.index["name"] == name].iloc[0])
+
+    def row_values(self, row) -> np.ndarray:
+        # Valeurs normalisées d'une ligne de l'index (shard, offset, longueur)
+        mm = self.shard(int(row["shard"]))
+        return np.array(mm[int(row["offset"]):int(row["offset"]) + int(row["length"])])
+
+def window_starts(rows: pd.DataFrame, window: int, part: str = "train") -> np.ndarray:
+    """Débuts (dans le shard) des fenêtres dont la cible tombe dans la partie ``train`` ou ``test``."""
+    starts = []
+    for offset, length, n_train in rows[["offset", "length", "n_train"]].to_numpy():
+        if part == "train":
+            lo, hi = 0, n_train - window
+        else:
+            lo, hi = max(n_train - window, 0), length - window
+        if hi > lo:
+            starts.append(np.arange(offset + lo, offset + hi, dtype=np.int64))
+    return np.concatenate(starts) if starts else np.empty(0, dtype=np.int64)
+
+class WindowSampler:
+    """Échantillonneur en flux de fenêtres (X, y) mélangées, pour un jeu plus grand que la RAM.
+
+    À chaque époque l'ordre des shards est tiré au hasard ; ils sont lus séquentiellement
+    par blocs de ``shards_per_block`` (seule la mémoire d'un bloc est occupée) et les
+    fenêtres de tout le bloc sont mélangées avant découpage en mini-lots.
+    """
+
+    def __init__(self, shards: ShardSet, window: int, batch_size: int = 64, part: str = "train",
+                 shards_per_block: int = 2, seed: int = 42):
+        self.shards, self.window, self.batch_size = shards, int(window), int(batch_size)
+        self.part, self.shards_per_block = part, max(int(shards_per_block), 1)
+        self.rng = np.random.default_rng(seed)
+        self._starts = {k: window_starts(g, self.window, part) for k, g in shards.index.groupby("shard")}
+
+    def __len__(self):
+        n = sum(len(v) for v in self._starts.values())
+        return -(-n // self.batch_size)
+
+    @property
+    def n_windows(self) -> int:
+        return sum(len(v) for v in self._starts.values())
+
+    def __iter__(self):
+        order = self.rng.permutation(sorted(self._starts))
+        offsets = np.arange(self.window + 1)
+        for b in range(0, len(order), self.shards_per_block):
+            block, starts, base = [], [], 0
+            for k in order[b:b + self.shards_per_block]:
+                values = np.array(self.shards.shard(int(k)))  # lecture séquentielle du shard
+                block.append(values)
+                starts.append(self._starts[k] + base)
+                base += len(values)
+            if not block:
+                continue
+            block, starts = np.concatenate(block), np.concatenate(starts)
+            starts = starts[self.rng.permutation(len(starts))]
+            for i in range(0, len(starts), self.batch_size):
+                w = block[starts[i:i + self.batch_size, None] + offsets]
+                yield w[:, :-1], w[:, -1]
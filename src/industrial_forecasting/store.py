@@ -0,0 +1,82 @@
+"""Stockage binaire append-only d'une série régulière (horodatages int64 ns + valeurs).
+
+Un store est un dossier contenant :
+- ``timestamps.i8`` : horodatages en nanosecondes (int64, triés) ;
+- ``values.bin``    : valeurs brutes au dtype du pipeline ;
+- ``meta.json``     : nombre de points, dtype, high-watermark et curseur de lecture du CSV brut (avec son empreinte).
+
+Les ajouts écrivent d'abord les données puis ``meta.json`` (remplacement atomique) :
+seuls ``count`` points font foi, un ajout interrompu est tronqué au suivant.
+"""
+import json
+import os
+import numpy as np
+import pandas as pd
+
+META_FILE = "meta.json"
+TS_FILE = "timestamps.i8"
+VALUES_FILE = "values.bin"
+
+def read_meta(store_dir: str) -> dict | None:
+    path = os.path.join(store_dir, META_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+def write_meta(store_dir: str, meta: dict):
+    path = os.path.join(store_dir, META_FILE)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, path)
+
+def _append_raw(path: str, arr: np.ndarray, keep_bytes: int):
+    # Tronque un éventuel reliquat d'écriture interrompue puis ajoute en fin de fichier
+    with open(path, "ab") as f:
+        f.truncate(keep_bytes)
+        f.write(np.ascontiguousarray(arr).tobytes())
+
+def to_ns(index) -> np.ndarray:
+    # Horodatages en int64 ns, quelle que soit la résolution d'origine (pandas >= 2 : s/ms/us/ns)
+    return pd.DatetimeIndex(index).as_unit("ns").asi8
+
+def append_store(store_dir: str, s: pd.Series, **meta_updates) -> dict:
+    os.makedirs(store_dir, exist_ok=True)
+    meta = read_meta(store_dir) or {"count": 0, "dtype": np.dtype(s.dtype).name, "watermark": None}
+    dtype = np.dtype(meta["dtype"])
+    count = int(meta["count"])
+    if len(s):
+        ts = to_ns(s.index)
+        if meta["watermark"] is not None and ts[0] <= meta["watermark"]:
+            raise ValueError("append_store : les nouveaux points doivent suivre le high-watermark")
+        _append_raw(os.path.join(store_dir, TS_FILE), ts.astype(np.int64), count * 8)
+        _append_raw(os.path.join(store_dir, VALUES_FILE), s.values.astype(dtype), count * dtype.itemsize)
+        meta["count"] = count + len(s)
+        meta["watermark"] = int(ts[-1])
+    meta.update(meta_updates)
+    write_meta(store_dir, meta)
+    return meta
+
+def read_store(store_dir: str, start=None, name: str = "value") -> pd.Series:
+    """Lit le store par memory-mapping ; ``start`` ne renvoie que les points strictement postérieurs."""
+    meta = read_meta(store_dir)
+    if meta is None or meta["count"] == 0:
+        return pd.Series([], index=pd.DatetimeIndex([]), dtype=float, name=name)
+    count = int(meta["count"])
+    ts = np.memmap(os.path.join(store_dir, TS_FILE), dtype=np.int64, mode="r", shape=(count,))
+    values = np.memmap(os.path.join(store_dir, VALUES_FILE), dtype=np.dtype(meta["dtype"]), mode="r", shape=(count,))
+    i = 0
+    if start is not None:
+        # Recherche dichotomique du watermark : coût O(log n + nouveaux points)
+        i = int(np.searchsorted(ts, pd.Timestamp(start).value, side="right"))
+    index = pd.DatetimeIndex(np.asarray(ts[i:]).view("datetime64[ns]"))
+    return pd.Series(np.array(values[i:]), index=index, name=name)
+
+def tail_store(store_dir: str, n: int = 1) -> pd.Series:
+    meta = read_meta(store_dir)
+    if meta is None or meta["count"] == 0:
+        return read_store(store_dir)
+    count = int(meta["count"])
+    ts = np.memmap(os.path.join(store_dir, TS_FILE), dtype=np.int64, mode="r", shape=(count,))
+    return read_store(store_dir, start=pd.Timestamp(int(ts[max(count - n - 1, 0)])) if count > n else None)
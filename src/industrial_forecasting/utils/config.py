@@ -1,3 +1,4 @@
+import numpy as np
 import yaml
 from types import SimpleNamespace
 
@@ -12,3 +13,8 @@ def load_config(path="config.yaml"):
         return d
 
     return dict_to_namespace(cfg)
+
+def get_dtype(cfg) -> np.dtype:
+    # Précision flottante du pipeline (data.precision : float32 | float64, float64 par défaut)
+    data = getattr(cfg, "data", None)
+    return np.dtype(getattr(data, "precision", None) or "float64")
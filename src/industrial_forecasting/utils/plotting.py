@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+def decimate_for_plot(df: pd.DataFrame, width_px: int, columns=None) -> pd.DataFrame:
+    """Réduit le DataFrame à ~2 points par colonne de pixels (min/max par tranche, type M4).
+
+    Le tracé obtenu est visuellement identique à celui de la série complète
+    (extrêmes conservés) mais coûte O(largeur) au lieu de O(n) à dessiner.
+    """
+    n = len(df)
+    width_px = max(int(width_px), 1)
+    if n <= 4 * width_px:
+        return df
+    columns = list(columns or df.select_dtypes("number").columns)
+    k = int(np.ceil(n / width_px))
+    n_full = (n // k) * k
+    keep = [np.array([0, n - 1])]
+    for col in columns:
+        v = df[col].to_numpy(dtype=float)
+        # NaN neutralisés pour argmin/argmax ; une tranche par colonne de pixels
+        blocks_min = np.where(np.isnan(v[:n_full]), np.inf, v[:n_full]).reshape(-1, k)
+        blocks_max = np.where(np.isnan(v[:n_full]), -np.inf, v[:n_full]).reshape(-1, k)
+        offsets = np.arange(0, n_full, k)
+        keep.append(offsets + blocks_min.argmin(axis=1))
+        keep.append(offsets + blocks_max.argmax(axis=1))
+        if n_full < n:
+            rest = v[n_full:]
+            if not np.isnan(rest).all():
+                keep.append(n_full + np.array([np.nanargmin(rest), np.nanargmax(rest)]))
+    return df.iloc[np.unique(np.concatenate(keep))]
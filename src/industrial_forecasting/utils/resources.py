@@ -0,0 +1,95 @@
+"""Budget de cœurs par processus : threads torch, BLAS (numpy / statsmodels) et joblib (sklearn).
+
+Par défaut chaque bibliothèque prend « tous les cœurs » ; avec plusieurs scripts ou workers
+en parallèle la machine sature (sur-souscription). Le budget (section ``resources`` de
+config.yaml) est découpé entre les workers d'un pool ; chaque processus applique sa part et
+la transmet à ses enfants par variables d'environnement (``IF_CORE_BUDGET`` + variables
+OMP/MKL/OpenBLAS, lues au démarrage des sous-processus).
+"""
+import os
+import sys
+
+BUDGET_ENV = "IF_CORE_BUDGET"
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+                   "VECLIB_MAXIMUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+# Budget appliqué au processus courant (lu par fit_detector pour n_jobs)
+_current = {"cores": None, "blas": None, "torch": None, "joblib": 1}
+
+def available_cores(cfg=None) -> int:
+    # Cœurs utilisables : affinité CPU, plafonnée par le budget hérité du parent et la config
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    inherited = os.environ.get(BUDGET_ENV)
+    if inherited:
+        cores = min(cores, int(inherited))
+    total = getattr(getattr(cfg, "resources", None), "total_cores", None)
+    if total:
+        cores = min(cores, int(total))
+    return max(cores, 1)
+
+def thread_budget(cfg=None, n_workers: int = 1) -> dict:
+    """Répartit les cœurs entre ``n_workers`` workers concurrents ; threads par worker."""
+    res = getattr(cfg, "resources", None)
+    cores = max(available_cores(cfg) // max(int(n_workers), 1), 1)
+    return {
+        "cores": cores,
+        "blas": int(getattr(res, "blas_threads", None) or cores),
+        "torch": int(getattr(res, "torch_threads", None) or cores),
+        "joblib": int(getattr(res, "joblib_jobs", None) or cores),
+    }
+
+def pool_size(cfg=None, workers: int = None) -> int:
+    # Taille de pool bornée par le nombre de cœurs disponibles
+    return max(1, min(int(workers or available_cores(cfg)), available_cores(cfg)))
+
+def apply_budget(budget: dict) -> dict:
+    """Applique le budget au processus courant (et à ses futurs enfants via l'environnement)."""
+    os.environ[BUDGET_ENV] = str(budget["cores"])
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(budget["blas"])
+    # numpy est déjà importé : les variables ne suffisent plus, threadpoolctl agit à chaud
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(limits=budget["blas"])
+    except ImportError:
+        pass
+    os.environ["LOKY_MAX_CPU_COUNT"] = str(budget["joblib"])
+    if "torch" in sys.modules:
+        import torch
+        torch.set_num_threads(budget["torch"])
+    _current.update(budget)
+    return budget
+
+def joblib_jobs() -> int:
+    return int(_current["joblib"] or 1)
+
+def describe_budget(n_workers: int = 1) -> str:
+    # Diagnostic : réglages effectifs relus auprès de chaque bibliothèque
+    lines = [f"Ressources : {_current['cores']} cœur(s) pour ce processus"
+             + (f" ({n_workers} workers)" if n_workers > 1 else "")]
+    try:
+        from threadpoolctl import threadpool_info
+        pools = threadpool_info()
+        blas = ", ".join(f"{p['internal_api']}={p['num_threads']}" for p in pools) or "aucun pool détecté"
+    except ImportError:
+        blas = f"{_current['blas']} (threadpoolctl absent : limite effective aux sous-processus)"
+    lines.append(f"  BLAS/OpenMP : {blas}")
+    if "torch" in sys.modules:
+        import torch
+        lines.append(f"  torch       : {torch.get_num_threads()} threads intra-op")
+    lines.append(f"  joblib      : n_jobs={joblib_jobs()}")
+    return "\n".join(lines)
+
+def setup_resources(cfg=None, n_workers: int = 1) -> dict:
+    """Point d'entrée des scripts : calcule, applique et (optionnellement) affiche le budget."""
+    budget = apply_budget(thread_budget(cfg, n_workers))
+    if getattr(getattr(cfg, "resources", None), "diagnostics", True):
+        print(describe_budget(n_workers))
+    return budget
+
+def worker_init(budget: dict):
+    # initializer des pools de processus : chaque worker applique sa part du budget
+    apply_budget(budget)
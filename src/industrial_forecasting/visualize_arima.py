@@ -3,32 +3,39 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 from industrial_forecasting.utils.config import load_config
+from industrial_forecasting.utils.plotting import decimate_for_plot
 
-def plot_sarima_forecast(cfg):
+# Au-delà, les marqueurs ne sont plus lisibles et ralentissent fortement le rendu
+MAX_POINTS_WITH_MARKERS = 500
+
+def plot_sarima_forecast(cfg, show=True, out_path=None, dpi=300):
     # Chargement des données
     df = pd.read_csv(cfg.data.forecast, parse_dates=True, index_col=0)
     
-    print(f"Type de l'index : {type(df.index)}")
-    print(f"Index : {df.index}")
     print(f"Plage temporelle : {df.index.min()} à {df.index.max()}")
     print(f"Nombre de points : {len(df)}")
     
     # Graphique amélioré avec les informations temporelles
-    plt.figure(figsize=(14, 8))
+    figsize = (14, 8)
+    plt.figure(figsize=figsize)
+    
+    # Décimation à la largeur en pixels (les métriques restent calculées sur tous les points)
+    df_plot = decimate_for_plot(df, figsize[0] * dpi, ["y_true", "y_pred"])
+    markers = len(df_plot) <= MAX_POINTS_WITH_MARKERS
     
     # Tracer les séries
-    plt.plot(df.index, df["y_true"], 
+    plt.plot(df_plot.index, df_plot["y_true"], 
              label="Valeurs réelles", 
              linewidth=2.5,
              color='#2E86AB',
-             marker='o', markersize=2, alpha=0.8)
+             marker='o' if markers else None, markersize=2, alpha=0.8)
     
-    plt.plot(df.index, df["y_pred"], 
+    plt.plot(df_plot.index, df_plot["y_pred"], 
              label="Prédictions SARIMA", 
              linestyle="--", 
              linewidth=2.5,
              color='#A23B72',
-             marker='s', markersize=2)
+             marker='s' if markers else None, markersize=2)
     
     # Personnalisation avancée
     plt.title("Prédictions SARIMA vs Valeurs Réelles\n(Données horaires du 23/03/2014 au 28/05/2014)", 
@@ -56,15 +63,17 @@ def plot_sarima_forecast(cfg):
     
     plt.tight_layout()
     
-    out_path = getattr(cfg.data, "image_png_sarimax", "forecast_sarimax.png")
-    plt.savefig(out_path, dpi=300, bbox_inches='tight')
+    out_path = out_path or getattr(cfg.data, "image_png_sarimax", "forecast_sarimax.png")
+    plt.savefig(out_path, dpi=dpi, bbox_inches='tight')
     print(f" Graphique amélioré sauvegardé → {out_path}")
     
     print(f"\n Métriques de performance :")
     print(f"   MAE: {mae:.3f}")
     print(f"   RMSE: {rmse:.3f}")
     
-    plt.show()
+    if show:
+        plt.show()
+    plt.close()
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
@@ -0,0 +1,89 @@
+"""Rendu headless et parallèle des graphiques de prévision (backend Agg, aucune fenêtre ouverte)."""
+import matplotlib
+matplotlib.use("Agg")
+
+import contextlib, glob, io, os, time
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import matplotlib.pyplot as plt
+from industrial_forecasting.utils.config import load_config
+from industrial_forecasting.utils.plotting import decimate_for_plot
+from industrial_forecasting.utils.resources import pool_size, thread_budget, worker_init
+from industrial_forecasting.visualize_arima import plot_sarima_forecast
+from industrial_forecasting.visualize_lstm import plot_lstm_forecast
+from industrial_forecasting.visualize_prophet import plot_lstm_forecast as plot_prophet_forecast
+
+# Graphiques par modèle : (fonction, clé du CSV de prévision dans cfg.data, nom du PNG)
+MODEL_PLOTS = {
+    "arima": (plot_sarima_forecast, "forecast", "forecast_sarimax.png"),
+    "lstm": (plot_lstm_forecast, "forecast_path_lstm", "forecast_lstm.png"),
+    "prophet": (plot_prophet_forecast, "forecast_path_prophet", "forecast_prophet.png"),
+}
+
+def plot_forecast_csv(csv_path, out_path, title=None, dpi=100, figsize=(12, 6)):
+    # Graphique générique réel vs prédit pour une série de la flotte
+    df = pd.read_csv(csv_path, parse_dates=True, index_col=0)
+    cols = [c for c in ("y_true", "y_pred") if c in df.columns]
+    df = decimate_for_plot(df, figsize[0] * dpi, cols)
+    fig, ax = plt.subplots(figsize=figsize)
+    for col, label, style in (("y_true", "Valeurs réelles", "-"), ("y_pred", "Prédictions", "--")):
+        if col in cols:
+            ax.plot(df.index, df[col], label=label, linestyle=style, linewidth=1.5)
+    ax.set_title(title or os.path.splitext(os.path.basename(csv_path))[0])
+    ax.set_xlabel("Temps")
+    ax.set_ylabel("Valeur")
+    ax.legend()
+    fig.savefig(out_path, dpi=dpi)
+    plt.close(fig)
+
+def _render(job):
+    kind, params = job
+    t0 = time.perf_counter()
+    # Les fonctions visualize_* sont bavardes : leur sortie est absorbée dans les workers
+    with contextlib.redirect_stdout(io.StringIO()):
+        if kind == "fleet":
+            plot_forecast_csv(**params)
+        else:
+            plot_fn = MODEL_PLOTS[kind][0]
+            plot_fn(load_config(params["config"]), show=False, out_path=params["out_path"], dpi=params["dpi"])
+    return params["out_path"], time.perf_counter() - t0
+
+def build_jobs(cfg_path, out_dir, dpi=100, fleet_glob=None):
+    cfg = load_config(cfg_path)
+    jobs = []
+    for kind, (_, key, png) in MODEL_PLOTS.items():
+        csv_path = getattr(cfg.data, key, None)
+        if csv_path and os.path.exists(csv_path):
+            jobs.append((kind, {"config": cfg_path, "out_path": os.path.join(out_dir, png), "dpi": dpi}))
+    if fleet_glob:
+        fleet_dir = os.path.join(out_dir, "fleet")
+        os.makedirs(fleet_dir, exist_ok=True)
+        for csv_path in sorted(glob.glob(fleet_glob)):
+            name = os.path.splitext(os.path.basename(csv_path))[0]
+            jobs.append(("fleet", {"csv_path": csv_path, "out_path": os.path.join(fleet_dir, f"{name}.png"), "dpi": dpi}))
+    return jobs
+
+def render_all(jobs, workers=None, cfg=None):
+    if not jobs:
+        return []
+    # Cœurs partagés entre les workers (BLAS d'un worker limité à sa part)
+    workers = pool_size(cfg, workers)
+    budget = thread_budget(cfg, workers)
+    chunksize = max(1, len(jobs) // (workers * 4))
+    print(f"Pool : {workers} workers × {budget['cores']} cœur(s)")
+    with ProcessPoolExecutor(max_workers=workers, initializer=worker_init, initargs=(budget,)) as pool:
+        return list(pool.map(_render, jobs, chunksize=chunksize))
+
+def main(cfg_path, out_dir="reports/figures", workers=None, dpi=None, fleet_glob=None):
+    cfg = load_config(cfg_path)
+    dpi = dpi or getattr(getattr(cfg, "visualization", None), "dpi", 100)
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = build_jobs(cfg_path, out_dir, dpi=dpi, fleet_glob=fleet_glob)
+    t0 = time.perf_counter()
+    results = render_all(jobs, workers, cfg)
+    elapsed = time.perf_counter() - t0
+    for out_path, secs in results[:10]:
+        print(f" {out_path} ({secs:.2f} s)")
+    if len(results) > 10:
+        print(f" ... et {len(results) - 10} autres")
+    print(f"{len(results)} graphiques rendus en {elapsed:.2f} s → {out_dir}")
@@ -2,11 +2,15 @@ import argparse
 import pandas as pd
 import matplotlib.pyplot as plt
 from industrial_forecasting.utils.config import load_config
+from industrial_forecasting.utils.plotting import decimate_for_plot
 
-def plot_lstm_forecast(cfg):
+def plot_lstm_forecast(cfg, show=True, out_path=None, dpi=100):
     df = pd.read_csv(cfg.data.forecast_path_lstm, parse_dates=True, index_col=0)
 
-    plt.figure(figsize=(12, 6))
+    figsize = (12, 6)
+    plt.figure(figsize=figsize)
+    # Décimation à la largeur en pixels : rendu identique, coût O(largeur)
+    df = decimate_for_plot(df, figsize[0] * dpi, ["y_true", "y_pred"])
     plt.plot(df["y_true"], label="Valeurs réelles", linewidth=2)
     plt.plot(df["y_pred"], label="Prédictions LSTM", linestyle="--")
     plt.title("Prédictions vs Réalité (LSTM)")
@@ -14,10 +18,12 @@ def plot_lstm_forecast(cfg):
     plt.ylabel("Valeur")
     plt.legend()
     
-    out_path = getattr(cfg.data, "image_png_lstm", "forecast_lstm.png")
-    plt.savefig(out_path)
+    out_path = out_path or getattr(cfg.data, "image_png_lstm", "forecast_lstm.png")
+    plt.savefig(out_path, dpi=dpi)
     print(f" Graphique sauvegardé → {out_path}")
-    plt.show()
+    if show:
+        plt.show()
+    plt.close()
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()